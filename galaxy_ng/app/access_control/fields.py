@@ -132,9 +132,16 @@ class MyPermissionsField(serializers.Serializer):
         else:
             obj = original_obj
 
+        # the permissions of a model are the same for every object of a page
+        model_perms = self.context.setdefault("model_permissions", {})
+        if type(obj) not in model_perms:
+            model_perms[type(obj)] = [
+                "{}.{}".format(perm.content_type.app_label, perm.codename)
+                for perm in get_perms_for_model(type(obj)).select_related("content_type")
+            ]
+
         my_perms = []
-        for perm in get_perms_for_model(type(obj)).all():
-            codename = "{}.{}".format(perm.content_type.app_label, perm.codename)
+        for codename in model_perms[type(obj)]:
             if user.has_perm(codename) or user.has_perm(codename, obj):
                 my_perms.append(codename)
 
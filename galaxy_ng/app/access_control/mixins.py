@@ -1,3 +1,6 @@
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
 from django.core.exceptions import BadRequest
 from django.utils.translation import gettext_lazy as _
@@ -10,15 +13,52 @@ from pulpcore.plugin.util import (
     get_groups_with_perms_attached_roles,
     get_users_with_perms_attached_roles,
 )
+from pulpcore.plugin.models.role import GroupRole, UserRole
 
 from django_lifecycle import hook
 
 
+def prefetch_object_roles(objects):
+    """Fetch the groups and users properties of objects of the same model in two queries.
+
+    Serializing many objects otherwise runs the role queries of each object.
+    """
+    objects = list(objects)
+    if not objects:
+        return
+
+    ctype = ContentType.objects.get_for_model(objects[0], for_concrete_model=True)
+    role_filter = {
+        "content_type": ctype,
+        "object_id__in": [str(obj.pk) for obj in objects],
+        "role__permissions__content_type": ctype,
+    }
+
+    groups = defaultdict(lambda: defaultdict(set))
+    for group_role in GroupRole.objects.filter(**role_filter).select_related("group", "role"):
+        groups[group_role.object_id][group_role.group].add(group_role.role.name)
+
+    users = defaultdict(lambda: defaultdict(set))
+    for user_role in UserRole.objects.filter(**role_filter).select_related("user", "role"):
+        users[user_role.object_id][user_role.user].add(user_role.role.name)
+
+    for obj in objects:
+        obj._prefetched_groups = {
+            group: list(roles) for group, roles in groups[str(obj.pk)].items()
+        }
+        obj._prefetched_users = {
+            user: list(roles) for user, roles in users[str(obj.pk)].items()
+        }
+
+
 class GroupModelPermissionsMixin:
     _groups = None
+    _prefetched_groups = None
 
     @property
     def groups(self):
+        if self._prefetched_groups is not None:
+            return self._prefetched_groups
         return get_groups_with_perms_attached_roles(
             self, include_model_permissions=False, for_concrete_model=True)
 
@@ -66,9 +106,12 @@ class GroupModelPermissionsMixin:
 
 class UserModelPermissionsMixin:
     _users = None
+    _prefetched_users = None
 
     @property
     def users(self):
+        if self._prefetched_users is not None:
+            return self._prefetched_users
         return get_users_with_perms_attached_roles(
             self, include_model_permissions=False, for_concrete_model=True, with_group_users=False)
 
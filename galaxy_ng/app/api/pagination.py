@@ -0,0 +1,234 @@
+"""Opt-in keyset (cursor) pagination.
+
+Passing ``?cursor=`` to a list endpoint using one of these paginators
+switches it from LIMIT/OFFSET to keyset pagination: each page is fetched
+with a WHERE clause on the sort columns plus the primary key of the last
+row of the previous page, so deep pages cost the same as the first one.
+The ``next`` link carries the opaque cursor for the following page; the
+mode is forward only so ``previous`` and ``last`` are always null.
+
+In cursor mode the count is the planner estimate by default, which is read
+from the table statistics instead of scanning every row. It can be requested
+exactly with ``?count=exact`` or skipped with ``?count=none``. Requests
+without ``cursor`` keep the offset behaviour and exact count.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import gettext_lazy as _
+from pulp_ansible.app.galaxy.v3.pagination import LimitOffsetPagination
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+COUNT_EXACT = "exact"
+COUNT_ESTIMATE = "estimate"
+COUNT_NONE = "none"
+
+
+def estimate_count(queryset):
+    """Return the planner row estimate for a queryset without executing it."""
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KeysetPaginationMixin:
+    """Adds the keyset mode to a DRF paginator, see the module docstring."""
+
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    default_keyset_count = COUNT_ESTIMATE
+    invalid_cursor_message = _("Invalid cursor")
+
+    keyset = False
+
+    def get_keyset_page_size(self, request):
+        raise NotImplementedError
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            return super().paginate_queryset(queryset, request, view=view)
+
+        self.keyset = True
+        self.request = request
+        self.page_size = self.get_keyset_page_size(request)
+        self.ordering = self.get_keyset_ordering(queryset)
+        self.count = self.get_keyset_count(queryset, request)
+
+        position = self.decode_cursor(request.query_params[self.cursor_query_param])
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(position))
+
+        # fetch one extra row to know if there is a next page
+        rows = list(queryset.order_by(*self.ordering)[:self.page_size + 1])
+        self.next_position = None
+        if len(rows) > self.page_size:
+            rows = rows[:self.page_size]
+            self.next_position = [self._get_value(rows[-1], field) for field in self.ordering]
+        return rows
+
+    def get_keyset_ordering(self, queryset):
+        """The queryset ordering with the primary key appended as tie breaker."""
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not all(isinstance(field, str) for field in ordering):
+            raise ValidationError(_("Cursor pagination is not supported for this ordering."))
+
+        pk_name = queryset.model._meta.pk.name
+        if not any(field.lstrip("-") in ("pk", pk_name) for field in ordering):
+            ordering.append(pk_name)
+        return ordering
+
+    def get_keyset_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param, self.default_keyset_count)
+        if mode == COUNT_EXACT:
+            return queryset.count()
+        if mode == COUNT_ESTIMATE:
+            return estimate_count(queryset)
+        if mode == COUNT_NONE:
+            return None
+        raise ValidationError(
+            _("'{param}' must be one of {choices}").format(
+                param=self.count_query_param,
+                choices=[COUNT_EXACT, COUNT_ESTIMATE, COUNT_NONE],
+            )
+        )
+
+    def get_keyset_filter(self, position):
+        """Build the WHERE clause selecting the rows after the cursor position.
+
+        For an ordering (a, -b, pk) this is:
+        a > x OR (a = x AND b < y) OR (a = x AND b = y AND pk > z)
+        PostgreSQL sorts NULLs last ascending and first descending.
+        """
+        after = Q(pk__in=[])
+        equal = Q()
+        for field, value in zip(self.ordering, position, strict=True):
+            descending = field.startswith("-")
+            field = field.lstrip("-")
+            if value is None:
+                greater = Q(**{f"{field}__isnull": False}) if descending else Q(pk__in=[])
+                same = Q(**{f"{field}__isnull": True})
+            else:
+                greater = Q(**{f"{field}__{'lt' if descending else 'gt'}": value})
+                if not descending:
+                    greater |= Q(**{f"{field}__isnull": True})
+                same = Q(**{field: value})
+            after |= equal & greater
+            equal &= same
+        return after
+
+    def encode_cursor(self, position):
+        # DjangoJSONEncoder truncates datetimes to milliseconds, which would
+        # compare the tie breaker against a rounded value, so they are kept
+        # at full precision and tagged to be parsed back by decode_cursor
+        position = [
+            {"dt": value.isoformat()} if isinstance(value, datetime) else value
+            for value in position
+        ]
+        data = json.dumps({"o": self.ordering, "p": position}, cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def _decode_value(self, value):
+        if not isinstance(value, dict):
+            return value
+        parsed = parse_datetime(value["dt"])
+        if parsed is None:
+            raise ValueError(value)
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def decode_cursor(self, cursor):
+        """Return the position encoded in the cursor, an empty cursor is the first page."""
+        if not cursor:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            ordering = data["o"]
+            position = [self._decode_value(value) for value in data["p"]]
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        # the ordering changed between requests
+        if ordering != self.ordering or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def get_keyset_url(self):
+        return self.request.build_absolute_uri()
+
+    def get_keyset_next_link(self):
+        if self.next_position is None:
+            return None
+        return replace_query_param(
+            self.get_keyset_url(), self.cursor_query_param, self.encode_cursor(self.next_position)
+        )
+
+    def get_keyset_first_link(self):
+        return replace_query_param(self.get_keyset_url(), self.cursor_query_param, "")
+
+    @staticmethod
+    def _get_value(row, field):
+        field = field.lstrip("-")
+        if isinstance(row, dict):
+            if field == "pk":
+                field = "id"
+            return row[field]
+        return getattr(row, field)
+
+
+class KeysetPageNumberPagination(KeysetPaginationMixin, PageNumberPagination):
+    """PageNumberPagination with the opt-in keyset mode."""
+
+    def get_keyset_page_size(self, request):
+        return self.get_page_size(request)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response({
+            "count": self.count,
+            "next": self.get_keyset_next_link(),
+            "previous": None,
+            "results": data,
+        })
+
+
+class KeysetLimitOffsetPagination(KeysetPaginationMixin, LimitOffsetPagination):
+    """The v3 LimitOffsetPagination with the opt-in keyset mode."""
+
+    def get_keyset_page_size(self, request):
+        self.limit = self.get_limit(request)
+        return self.limit
+
+    def get_keyset_url(self):
+        # the v3 links are relative
+        return self.request.get_full_path()
+
+    def get_paginated_data(self, data):
+        if not self.keyset:
+            return super().get_paginated_data(data)
+        first = remove_query_param(self.get_keyset_first_link(), self.offset_query_param)
+        return {
+            "meta": {"count": self.count},
+            "links": {
+                "first": first,
+                "previous": None,
+                "next": self.get_keyset_next_link(),
+                "last": None,
+            },
+            "data": data,
+        }
@@ -1,14 +1,18 @@
 import logging
 
+from collections import defaultdict
+
 from pulp_ansible.app.models import (
     AnsibleDistribution,
     CollectionVersion,
+    CollectionVersionSignature,
 )
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 import semantic_version
 
 from .base import Serializer
+from galaxy_ng.app.access_control.mixins import prefetch_object_roles
 from galaxy_ng.app.api.v3.serializers.namespace import NamespaceSummarySerializer
 from galaxy_ng.app.models import Namespace
 
@@ -44,10 +48,21 @@ class ContentSerializer(Serializer):
 
 
 class RequestDistroMixin:
-    """This provides _get_current_distro() to all serializers that inherit from it."""
+    """This provides _get_current_distro() to all serializers that inherit from it.
+
+    Nested serializers share the context of the request, the distribution is
+    looked up once and kept there. The signatures of the collection versions
+    in the distribution are read from the context too when a page of
+    collections prefetched them, see CollectionPageListSerializer.
+    """
 
     def _get_current_distro(self):
         """Get current distribution from request information."""
+        if "current_distro" not in self.context:
+            self.context["current_distro"] = self._lookup_current_distro()
+        return self.context["current_distro"]
+
+    def _lookup_current_distro(self):
         request = self.context.get("request")
         try:
             # on URLS like _ui/v1/repo/rh-certified/namespace/name and
@@ -67,10 +82,24 @@ class RequestDistroMixin:
             # A bare /_ui/v1/collection-versions/ is not scoped to a single distro
             return None
 
-        distro = AnsibleDistribution.objects.get(base_path=path)
+        distro = AnsibleDistribution.objects.select_related("repository").get(base_path=path)
 
         return distro
 
+    def _get_signatures_queryset(self):
+        signatures = CollectionVersionSignature.objects.select_related("signing_service")
+        distro = self._get_current_distro()
+        if distro:
+            signatures = signatures.filter(repositories=distro.repository)
+        return signatures
+
+    def _get_signatures(self, obj):
+        """Returns the signatures of a collection version in the current distribution."""
+        prefetched = self.context.get("prefetched_signatures")
+        if prefetched is not None and obj.pk in prefetched:
+            return prefetched[obj.pk]
+        return list(self._get_signatures_queryset().filter(signed_collection=obj))
+
 
 class CollectionMetadataSerializer(RequestDistroMixin, Serializer):
     dependencies = serializers.JSONField()
@@ -91,14 +120,8 @@ class CollectionMetadataSerializer(RequestDistroMixin, Serializer):
     @extend_schema_field(serializers.ListField(child=serializers.DictField()))
     def get_signatures(self, obj):
         """Returns signature info for each signature."""
-        distro = self._get_current_distro()
-        if not distro:
-            signatures = obj.signatures.all()
-        else:
-            signatures = obj.signatures.filter(repositories=distro.repository)
-
         data = []
-        for signature in signatures:
+        for signature in self._get_signatures(obj):
             sig = {}
             sig["signature"] = signature.data
             sig["pubkey_fingerprint"] = signature.pubkey_fingerprint
@@ -119,11 +142,11 @@ class CollectionVersionSignStateMixin(RequestDistroMixin):
     @extend_schema_field(serializers.CharField())
     def get_sign_state(self, obj):
         """Returns the state of the signature."""
-        distro = self._get_current_distro()
-        if not distro:
-            signature_count = obj.signatures.count()
+        prefetched = self.context.get("prefetched_signatures")
+        if prefetched is not None and obj.pk in prefetched:
+            signature_count = len(prefetched[obj.pk])
         else:
-            signature_count = obj.signatures.filter(repositories=distro.repository).count()
+            signature_count = self._get_signatures_queryset().filter(signed_collection=obj).count()
 
         return "unsigned" if signature_count == 0 else "signed"
 
@@ -174,11 +197,46 @@ class CollectionVersionSummarySerializer(CollectionVersionSignStateMixin, Serial
     sign_state = serializers.SerializerMethodField()
 
 
-class _CollectionSerializer(Serializer):
+class CollectionPageListSerializer(RequestDistroMixin, serializers.ListSerializer):
+    """Serializes a page of collections with a constant number of queries.
+
+    The namespaces of the page, with their roles, and the signatures of its
+    collection versions in the current distribution are fetched in bulk and
+    stored in the context shared with the nested serializers.
+    """
+
+    def to_representation(self, data):
+        versions = list(data)
+
+        namespaces = {
+            namespace.name: namespace
+            for namespace in Namespace.objects.filter(
+                name__in={version.namespace for version in versions}
+            ).select_related("last_created_pulp_metadata").prefetch_related("links")
+        }
+        prefetch_object_roles(namespaces.values())
+        self.context["prefetched_namespaces"] = namespaces
+
+        signatures = defaultdict(list)
+        for signature in self._get_signatures_queryset().filter(
+            signed_collection__in=[version.pk for version in versions]
+        ):
+            signatures[signature.signed_collection_id].append(signature)
+        self.context["prefetched_signatures"] = {
+            version.pk: signatures[version.pk] for version in versions
+        }
+
+        return super().to_representation(versions)
+
+
+class _CollectionSerializer(RequestDistroMixin, Serializer):
     """ Serializer for pulp_ansible CollectionViewSet.
     Uses CollectionVersion object to serialize associated Collection data.
     """
 
+    class Meta(Serializer.Meta):
+        list_serializer_class = CollectionPageListSerializer
+
     id = serializers.UUIDField(source='pk')
     namespace = serializers.SerializerMethodField()
     name = serializers.CharField()
@@ -187,7 +245,9 @@ class _CollectionSerializer(Serializer):
 
     @extend_schema_field(NamespaceSummarySerializer)
     def get_namespace(self, obj):
-        namespace = Namespace.objects.get(name=obj.namespace)
+        namespace = self.context.get("prefetched_namespaces", {}).get(obj.namespace)
+        if namespace is None:
+            namespace = Namespace.objects.get(name=obj.namespace)
         return NamespaceSummarySerializer(namespace, context=self.context).data
 
 
@@ -212,8 +272,7 @@ class CollectionDetailSerializer(_CollectionSerializer):
 
     @extend_schema_field(CollectionVersionSummarySerializer(many=True))
     def get_all_versions(self, obj):
-        path = self.context['request'].parser_context['kwargs']['distro_base_path']
-        distro = AnsibleDistribution.objects.get(base_path=path)
+        distro = self._get_current_distro()
         repository_version = distro.repository.latest_version()
         versions_in_repo = CollectionVersion.objects.filter(
             pk__in=repository_version.content,
@@ -5,6 +5,7 @@ from rest_framework import status
 
 from drf_spectacular.utils import extend_schema
 
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext_lazy as _
 
@@ -16,6 +17,7 @@ from galaxy_ng.app.api import base as api_base
 from galaxy_ng.app.access_control import access_policy
 from galaxy_ng.app import models
 from galaxy_ng.app import tasks
+from galaxy_ng.app.tasks.index_registry import DEFAULT_INDEX_BATCH_SIZE
 
 
 class IndexRegistryEEView(api_base.APIView):
@@ -50,8 +52,12 @@ class IndexRegistryEEView(api_base.APIView):
             tasks.index_execution_environments_from_redhat_registry,
             kwargs={
                 "registry_pk": registry.pk,
-                "request_data": request_data
+                "request_data": request_data,
+                "batch_size": settings.get(
+                    "GALAXY_CONTAINER_INDEX_BATCH_SIZE", DEFAULT_INDEX_BATCH_SIZE
+                ),
             },
+            exclusive_resources=["/api/v3/distributions/"],
         )
 
         return OperationPostponedResponse(result, self.request)
@@ -1,12 +1,58 @@
-from galaxy_ng.app.access_control import access_policy
-from random import sample
+from random import randint
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Min
 from rest_framework.response import Response
 from pulp_ansible.app.models import CollectionVersion, AnsibleDistribution
+
+from galaxy_ng.app.access_control import access_policy
+from galaxy_ng.app.constants import (
+    LANDING_PAGE_COUNTS_CACHE_KEY,
+    LANDING_PAGE_COUNTS_CACHE_TIMEOUT,
+)
 from galaxy_ng.app.models import Namespace
 from galaxy_ng.app import settings
 from galaxy_ng.app.api import base as api_base
 
 
+def get_landing_page_counts(repository_version):
+    """Returns the counts shown on the landing page, cached per repository version.
+
+    The cache is per process: saving or deleting a namespace only drops the
+    counts of the process doing it (see signals/handlers.py), the other
+    processes refresh theirs after LANDING_PAGE_COUNTS_CACHE_TIMEOUT seconds.
+    """
+    repository_version_pk = str(repository_version.pk)
+    counts = cache.get(LANDING_PAGE_COUNTS_CACHE_KEY)
+    if counts is None or counts["repository_version"] != repository_version_pk:
+        counts = {
+            "repository_version": repository_version_pk,
+            "collection_count": CollectionVersion.objects.filter(
+                pk__in=repository_version.content,
+                ansible_crossrepositorycollectionversionindex__is_highest=True
+            ).count(),
+            **Namespace.objects.aggregate(
+                partner_count=Count("pk"), min_partner_pk=Min("pk"), max_partner_pk=Max("pk")
+            ),
+        }
+        cache.set(LANDING_PAGE_COUNTS_CACHE_KEY, counts, timeout=LANDING_PAGE_COUNTS_CACHE_TIMEOUT)
+    return counts
+
+
+def sample_namespace(min_pk, max_pk):
+    """Pick a random namespace with a primary key lookup instead of loading the table.
+
+    The namespace following a random primary key is returned, wrapping
+    around to the first one, so the pick is only roughly uniform: a
+    namespace following a gap in the primary keys is picked more often.
+    """
+    pk = randint(min_pk, max_pk)
+    return (
+        Namespace.objects.filter(pk__gte=pk).order_by("pk").first()
+        or Namespace.objects.order_by("pk").first()
+    )
+
+
 class LandingPageView(api_base.APIView):
     permission_classes = [access_policy.LandingPageAccessPolicy]
     action = "retrieve"
@@ -16,17 +62,18 @@ class LandingPageView(api_base.APIView):
 
         distro = AnsibleDistribution.objects.get(base_path=golden_name)
         repository_version = distro.repository.latest_version()
-        collection_count = CollectionVersion.objects.filter(
-            pk__in=repository_version.content,
-            ansible_crossrepositorycollectionversionindex__is_highest=True
-        ).count()
-
-        partner_count = Namespace.objects.count()
+        counts = get_landing_page_counts(repository_version)
+        collection_count = counts["collection_count"]
+        partner_count = counts["partner_count"]
 
         # If there are no partners dont show the recommendation for it
         recommendations = {}
+        namespace = None
         if partner_count > 0:
-            namespace = sample(list(Namespace.objects.all()), 1)[0]
+            # the cached bounds may be stale, the sample wraps around to the first
+            # namespace, only an emptied table skips the recommendation
+            namespace = sample_namespace(counts["min_partner_pk"], counts["max_partner_pk"])
+        if namespace is not None:
             recommendations = {
                 "recs": [
                     {
@@ -1,32 +1,22 @@
 from django.contrib.postgres.search import SearchQuery
 from django.db.models import (
-    Exists,
     F,
     FloatField,
     Func,
-    JSONField,
-    OuterRef,
     Q,
-    Subquery,
     Value,
 )
-from django.db.models.fields.json import KT
-from django.db.models.functions import Coalesce
+from django.db.models.functions import Cast
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter, extend_schema
-from pulp_ansible.app.models import (
-    AnsibleCollectionDeprecated,
-    CollectionDownloadCount,
-    CollectionVersion,
-)
 from rest_framework import mixins
 from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny
 
 from galaxy_ng.app.api import base as api_base
+from galaxy_ng.app.api.pagination import KeysetLimitOffsetPagination
 from galaxy_ng.app.api.ui.v1.serializers import SearchResultsSerializer
-from galaxy_ng.app.api.v1.models import LegacyRole
-from galaxy_ng.app.models.namespace import Namespace
+from galaxy_ng.app.models.search import SearchDocument
 
 FILTER_PARAMS = [
     "keywords",
@@ -43,6 +33,7 @@ SORTABLE_FIELDS = ["name", "namespace_name", "download_count", "last_updated", "
 SORTABLE_FIELDS += [f"-{item}" for item in SORTABLE_FIELDS]
 DEFAULT_SEARCH_TYPE = "websearch"  # websearch,sql
 QUERYSET_VALUES = [
+    "id",
     "namespace_avatar",
     "content_list",
     "deprecated",
@@ -66,6 +57,7 @@ class SearchListView(api_base.GenericViewSet, mixins.ListModelMixin):
 
     permission_classes = [AllowAny]
     serializer_class = SearchResultsSerializer
+    pagination_class = KeysetLimitOffsetPagination
 
     @extend_schema(
         parameters=[
@@ -84,6 +76,11 @@ class SearchListView(api_base.GenericViewSet, mixins.ListModelMixin):
             OpenApiParameter("tags", many=True),
             OpenApiParameter("platform"),
             OpenApiParameter("order_by", enum=SORTABLE_FIELDS),
+            OpenApiParameter(
+                "cursor",
+                description="Use keyset pagination, pass an empty value for the first page",
+            ),
+            OpenApiParameter("count", enum=["exact", "estimate", "none"]),
         ]
     )
     def list(self, *args, **kwargs):
@@ -120,6 +117,10 @@ class SearchListView(api_base.GenericViewSet, mixins.ListModelMixin):
 
         Pagination is based on `limit` and `offset` parameters.
 
+        Passing `cursor` (empty for the first page) switches to keyset pagination,
+        follow `links:next` to get the following pages. In this mode `meta:count`
+        is an estimate unless `count=exact` is passed, or null with `count=none`.
+
         ## Results
 
         Results are embedded in the pagination serializer including
@@ -147,7 +148,7 @@ class SearchListView(api_base.GenericViewSet, mixins.ListModelMixin):
         return super().list(*args, **kwargs)
 
     def get_queryset(self):
-        """Returns the UNION ALL from CollectionVersion and LegacyRole"""
+        """Returns the search documents of collections and roles"""
         request = self.request
         self.filter_params = self.get_filter_params(request)
         self.sort = self.get_sorting_param(request)
@@ -155,7 +156,7 @@ class SearchListView(api_base.GenericViewSet, mixins.ListModelMixin):
         return qs
 
     def get_search_results(self, filter_params, sort):
-        """Validates filter_params, builds each queryset and then unionize and apply filters."""
+        """Validates filter_params, builds the documents queryset and then apply filters."""
         type_ = filter_params.get("type", "").lower()
         if type_ not in ("role", "collection", ""):
             raise ValidationError("'type' must be ['collection', 'role']")
@@ -168,11 +169,9 @@ class SearchListView(api_base.GenericViewSet, mixins.ListModelMixin):
         if keywords and search_type == "websearch":
             query = SearchQuery(keywords, search_type="websearch")
 
-        collections = self.get_collection_queryset(query=query)
-        roles = self.get_role_queryset(query=query)
+        documents = self.get_document_queryset(query=query)
         result_qs = self.filter_and_sort(
-            collections,
-            roles,
+            documents,
             filter_params,
             sort,
             type_,
@@ -201,81 +200,32 @@ class SearchListView(api_base.GenericViewSet, mixins.ListModelMixin):
             raise ValidationError("'order_by=relevance' works only with 'search_type=websearch'")
         return sort
 
-    def get_collection_queryset(self, query=None):
-        """Build the CollectionVersion queryset from annotations."""
-        deprecated_qs = AnsibleCollectionDeprecated.objects.filter(
-            namespace=OuterRef("namespace"), name=OuterRef("name")
-        )
-        download_count_qs = CollectionDownloadCount.objects.filter(
-            namespace=OuterRef("namespace"), name=OuterRef("name")
-        )
-        namespace_qs = Namespace.objects.filter(name=OuterRef("namespace"))
+    def get_document_queryset(self, query=None):
+        """Build the SearchDocument queryset annotated with the relevance.
 
+        Documents are maintained by `galaxy_ng.app.utils.search` so the
+        request only reads one indexed table instead of the union of
+        collection versions and roles.
+        """
         relevance = Value(0)
         if query:
-            relevance = Func(
-                F("search_vector"),
-                query,
-                RANK_NORMALIZATION,
-                function="ts_rank",
-                output_field=FloatField(),
-            )
-
-        # The order of the fields here is important, must match the role_queryset
-        qs = (
-            CollectionVersion.objects.annotate(
-                namespace_name=F("namespace"),
-                description_text=F("description"),
-                platform_names=Value([], JSONField()),  # There is no platforms for collections
-                tag_names=F("tags"),
-                content_type=Value("collection"),
-                last_updated=F("timestamp_of_interest"),
-                deprecated=Exists(deprecated_qs),
-                download_count=Coalesce(
-                    Subquery(download_count_qs.values("download_count")[:1]), Value(0)
+            # ts_rank returns a real, the cast keeps the value exact when the
+            # keyset cursor sends it back as a double precision parameter
+            relevance = Cast(
+                Func(
+                    F("search"),
+                    query,
+                    RANK_NORMALIZATION,
+                    function="ts_rank",
+                    output_field=FloatField(),
                 ),
-                latest_version=F("version"),
-                content_list=F("contents"),
-                namespace_avatar=Subquery(namespace_qs.values("_avatar_url")),
-                search=F("search_vector"),
-                relevance=relevance,
+                FloatField(),
             )
-            .values(*QUERYSET_VALUES)
-            .filter(ansible_crossrepositorycollectionversionindex__is_highest=True)
-        )
-        return qs
-
-    def get_role_queryset(self, query=None):
-        """Build the LegacyRole queryset from annotations."""
-        relevance = Value(0)
-        if query:
-            relevance = Func(
-                F("search"),
-                query,
-                RANK_NORMALIZATION,
-                function="ts_rank",
-                output_field=FloatField(),
-            )
-        # The order of the fields here is important, must match the collection_queryset
-        qs = LegacyRole.objects.annotate(
-            namespace_name=F("namespace__name"),
-            description_text=KT("full_metadata__description"),
-            platform_names=F("full_metadata__platforms"),
-            tag_names=F("full_metadata__tags"),
-            content_type=Value("role"),
-            last_updated=F("created"),
-            deprecated=Value(False),  # there is no deprecation for roles
-            download_count=Coalesce(F("legacyroledownloadcount__count"), Value(0)),
-            latest_version=KT("full_metadata__versions__-1__version"),
-            content_list=Value([], JSONField()),  # There is no contents for roles
-            namespace_avatar=F("namespace__namespace___avatar_url"),  # v3 namespace._avatar_url
-            search=F("legacyrolesearchvector__search_vector"),
-            relevance=relevance,
-        ).values(*QUERYSET_VALUES)
+        qs = SearchDocument.objects.annotate(relevance=relevance).values(*QUERYSET_VALUES)
         return qs
 
-    def filter_and_sort(self, collections, roles, filter_params, sort, type_="", query=None):
-        """Apply filters individually on each queryset and then combine to sort."""
+    def filter_and_sort(self, documents, filter_params, sort, type_="", query=None):
+        """Apply filters on the documents queryset and sort."""
         facets = {}
         if deprecated := filter_params.get("deprecated"):
             if deprecated.lower() not in ("true", "false"):
@@ -285,24 +235,23 @@ class SearchListView(api_base.GenericViewSet, mixins.ListModelMixin):
             facets["name__iexact"] = name
         if namespace := filter_params.get("namespace"):
             facets["namespace_name__iexact"] = namespace
+        if type_.lower() in ("role", "collection"):
+            facets["content_type"] = type_.lower()
         if facets:
-            collections = collections.filter(**facets)
-            roles = roles.filter(**facets)
+            documents = documents.filter(**facets)
 
         if tags := filter_params.get("tags"):
             tag_filter = Q()
             for tag in tags:
                 tag_filter &= Q(tag_names__icontains=tag)
-            collections = collections.filter(tag_filter)
-            roles = roles.filter(tag_filter)
+            documents = documents.filter(tag_filter)
 
         if platform := filter_params.get("platform"):
-            roles = roles.filter(full_metadata__platforms__icontains=platform)
-            collections = collections.filter(platform_names=platform)  # never match but required
+            # There is no platforms for collections so only roles can match
+            documents = documents.filter(platform_names__icontains=platform)
 
         if query:
-            collections = collections.filter(search=query)
-            roles = roles.filter(search=query)
+            documents = documents.filter(search=query)
         elif keywords := filter_params.get("keywords"):
             query = (
                 Q(name__icontains=keywords)
@@ -311,16 +260,9 @@ class SearchListView(api_base.GenericViewSet, mixins.ListModelMixin):
                 | Q(tag_names__icontains=keywords)
                 | Q(platform_names__icontains=keywords)
             )
-            collections = collections.filter(query)
-            roles = roles.filter(query)
-
-        if type_.lower() == "role":
-            qs = roles.order_by(*sort)
-        elif type_.lower() == "collection":
-            qs = collections.order_by(*sort)
-        else:
-            qs = collections.union(roles, all=True).order_by(*sort)
-        return qs
+            documents = documents.filter(query)
+
+        return documents.order_by(*sort)
 
 
 def test():
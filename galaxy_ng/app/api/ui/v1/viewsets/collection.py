@@ -1,4 +1,4 @@
-from django.db.models import Exists, OuterRef, Q, Value, F, Func, CharField
+from django.db.models import Q, Value, F
 from django.db.models import When, Case
 from django.core.exceptions import ObjectDoesNotExist
 from django.http import Http404
@@ -10,7 +10,6 @@ from drf_spectacular.utils import extend_schema
 from pulp_ansible.app.galaxy.v3 import views as pulp_ansible_galaxy_views
 from pulp_ansible.app import viewsets as pulp_ansible_viewsets
 from pulp_ansible.app.models import (
-    AnsibleCollectionDeprecated,
     AnsibleDistribution,
     CollectionVersion,
     Collection,
@@ -20,12 +19,12 @@ from pulp_ansible.app.models import CollectionImport as PulpCollectionImport
 from rest_framework import mixins
 from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
-import semantic_version
 
 from galaxy_ng.app.api import base as api_base
 from galaxy_ng.app.access_control import access_policy
 from galaxy_ng.app.api.ui.v1 import serializers, versioning
 from galaxy_ng.app.api.v3.serializers.sync import CollectionRemoteSerializer
+from galaxy_ng.app.utils.versions import version_range_q
 
 
 class CollectionByCollectionVersionFilter(pulp_ansible_viewsets.CollectionVersionFilter):
@@ -76,60 +75,47 @@ class CollectionViewSet(
         if path is None:
             raise Http404(_("Distribution base path is required"))
 
-        base_versions_query = CollectionVersion.objects.filter(pk__in=self._distro_content)
-
-        # Build a dict to be used by the annotation filter at the end of the method
-        collection_versions = {}
-        for collection_id, version in base_versions_query.values_list("collection_id", "version"):
-            value = collection_versions.get(str(collection_id))
-            if not value or semantic_version.Version(version) > semantic_version.Version(value):
-                collection_versions[str(collection_id)] = version
-
-        deprecated_query = AnsibleCollectionDeprecated.objects.filter(
-            namespace=OuterRef("namespace"),
-            name=OuterRef("name"),
-            pk__in=self._distro_content,
+        distro = get_object_or_404(
+            AnsibleDistribution.objects.only("repository_id", "repository_version_id"),
+            base_path=path,
         )
 
-        if not collection_versions.items():
-            return CollectionVersion.objects.none().annotate(
+        # pulp_ansible indexes the collection versions of every distributed repository,
+        # a distribution pointing at a repository uses the index of its latest version.
+        if distro.repository_version_id:
+            index_filter = Q(
+                ansible_crossrepositorycollectionversionindex__repository_version_id=(
+                    distro.repository_version_id
+                )
+            )
+        elif distro.repository_id:
+            index_filter = Q(
+                ansible_crossrepositorycollectionversionindex__repository_id=distro.repository_id,
+                ansible_crossrepositorycollectionversionindex__repository_version__isnull=True,
+            )
+        else:
+            index_filter = Q(pk__in=[])
+
+        # The index flags the highest version of each collection in the repository,
+        # so collections are returned only once and only for their highest version.
+        return (
+            CollectionVersion.objects
+            .filter(index_filter, ansible_crossrepositorycollectionversionindex__is_highest=True)
+            .select_related("collection")
+            .annotate(
                 # AAH-122: annotated filterable fields must exist in all the returned querysets
                 #          in order for filters to work.
-                deprecated=Exists(deprecated_query),
-                sign_state=Value("unsigned"),
-            )
-
-        # The main queryset to be annotated
-        version_qs = base_versions_query.select_related("collection")
-
-        # AAH-1484 - replacing `Q(collection__id, version)` with this annotation
-        # This builds `61505561-f806-4ddd-8f53-c403f0ec04ed:3.2.9` for each row.
-        # this is done to be able to filter at the end of this method and
-        # return collections only once and only for its highest version.
-        version_identifier_expression = Func(
-            F("collection__pk"), Value(":"), F("version"),
-            function="concat",
-            output_field=CharField(),
-        )
-
-        version_qs = version_qs.annotate(
-            deprecated=Exists(deprecated_query),
-            version_identifier=version_identifier_expression,
-            sign_state=Case(
-                When(signatures__pk__in=self._distro_content, then=Value("signed")),
-                default=Value("unsigned"),
+                deprecated=F("ansible_crossrepositorycollectionversionindex__is_deprecated"),
+                sign_state=Case(
+                    When(
+                        ansible_crossrepositorycollectionversionindex__is_signed=True,
+                        then=Value("signed"),
+                    ),
+                    default=Value("unsigned"),
+                ),
             )
         )
 
-        # AAH-1484 - filtering by version_identifier
-        version_qs = version_qs.filter(
-            version_identifier__in=[
-                ":".join([pk, version]) for pk, version in collection_versions.items()
-            ]
-        )
-
-        return version_qs
-
     def get_object(self):
         """Return CollectionVersion object, latest or via query param 'version'."""
         version = self.request.query_params.get('version', None)
@@ -187,12 +173,7 @@ class CollectionVersionFilter(filterset.FilterSet):
 
     def version_range_filter(self, queryset, name, value):
         try:
-            s = semantic_version.SimpleSpec(value)
-            full_version_list = [
-                semantic_version.Version(v) for v in queryset.values_list('version', flat=True)]
-            version_list = [str(v) for v in s.filter(full_version_list)]
-
-            return queryset.filter(version__in=version_list)
+            return queryset.filter(version_range_q(value))
         except ValueError:
             raise ValidationError(_('{} must be a valid semantic version range.').format(name))
 
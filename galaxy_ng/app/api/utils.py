@@ -6,6 +6,8 @@ from typing import NamedTuple
 from django.utils.translation import gettext_lazy as _
 from django.http import Http404
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.db.models import OuterRef, Subquery, TextField
+from django.db.models.functions import Cast
 
 from rest_framework import serializers
 from pulpcore.plugin import models as pulp_models
@@ -143,11 +145,14 @@ class RemoteSyncTaskField(serializers.Field):
         super().__init__(*args, **kwargs, read_only=True)
 
     def to_representation(self, remote):
-        # Query the database for sync tasks that reserve the given remote's PK
-        task = pulp_models.Task.objects.filter(
-            reserved_resources_record__icontains=remote.pk,
-            name__icontains="sync"
-        ).order_by('-pulp_last_updated').first()
+        if hasattr(remote, "_prefetched_last_sync_task"):
+            task = remote._prefetched_last_sync_task
+        else:
+            # Query the database for sync tasks that reserve the given remote's PK
+            task = pulp_models.Task.objects.filter(
+                reserved_resources_record__icontains=remote.pk,
+                name__icontains="sync"
+            ).order_by('-pulp_last_updated').first()
 
         if not task:
             return {}
@@ -161,6 +166,27 @@ class RemoteSyncTaskField(serializers.Field):
             }
 
 
+def prefetch_last_sync_tasks(remotes):
+    """Fetch the last sync task of each remote for RemoteSyncTaskField in two queries."""
+    remotes = list(remotes)
+    last_sync_tasks = pulp_models.Remote.objects.filter(
+        pk__in=[remote.pk for remote in remotes]
+    ).annotate(
+        last_sync_task=Subquery(
+            pulp_models.Task.objects.filter(
+                reserved_resources_record__icontains=Cast(OuterRef("pk"), TextField()),
+                name__icontains="sync",
+            ).order_by("-pulp_last_updated").values("pk")[:1]
+        )
+    ).values_list("pk", "last_sync_task")
+    last_sync_tasks = dict(last_sync_tasks)
+    tasks = pulp_models.Task.objects.in_bulk(
+        [task_pk for task_pk in last_sync_tasks.values() if task_pk is not None]
+    )
+    for remote in remotes:
+        remote._prefetched_last_sync_task = tasks.get(last_sync_tasks.get(remote.pk))
+
+
 class GetObjectByIdMixin:
     """
     Replace pulp_id (pk) with id, so Swagger UI shows {id} in browsable API
@@ -1,5 +1,6 @@
 from django.db.models import Q
 from django.db.models import Case, Value, When
+from django.db.models.fields.json import KT
 from django_filters import filters
 from django_filters.rest_framework import filterset
 
@@ -7,7 +8,7 @@ from galaxy_ng.app.models.auth import User
 from galaxy_ng.app.api.v1.models import LegacyNamespace
 from galaxy_ng.app.api.v1.models import LegacyRole
 from galaxy_ng.app.api.v1.models import LegacyRoleImport
-from galaxy_ng.app.utils.rbac import get_v3_namespace_owners
+from galaxy_ng.app.utils.rbac import get_v3_namespaces_owned_by_username
 
 
 class LegacyNamespaceFilter(filterset.FilterSet):
@@ -38,20 +39,8 @@ class LegacyNamespaceFilter(filterset.FilterSet):
 
     def owner_filter(self, queryset, name, value):
         # find the owner on the linked v3 namespace
-
-        # FIXME(jctanner): this is terribly slow
-        pks = []
-        for ns1 in LegacyNamespace.objects.all():
-            if not ns1.namespace:
-                continue
-            ns3 = ns1.namespace
-            owners = get_v3_namespace_owners(ns3)
-            if value in [x.username for x in owners]:
-                pks.append(ns1.id)
-
-        queryset = queryset.filter(id__in=pks)
-
-        return queryset
+        owned = get_v3_namespaces_owned_by_username(value)
+        return queryset.filter(namespace__in=owned.values("pk"))
 
     def provider_filter(self, queryset, name, value):
         return queryset.filter(namespace__name=value)
@@ -76,17 +65,38 @@ class LegacyUserFilter(filterset.FilterSet):
         return queryset.filter(username=username)
 
 
+def _roles_matching_keyword(keyword):
+    """
+    Ids of the roles with the keyword in their namespace, name or description.
+
+    Each branch of the union is served by its own trigram index, an OR
+    across the namespace join would make postgres scan every role instead.
+    """
+    by_name = LegacyRole.objects.filter(name__contains=keyword).values("pk")
+    by_description = (
+        LegacyRole.objects.alias(description=KT("full_metadata__description"))
+        .filter(description__contains=keyword)
+        .values("pk")
+    )
+    by_namespace = LegacyRole.objects.filter(namespace__name__contains=keyword).values("pk")
+    return by_name.union(by_description, by_namespace)
+
+
 class LegacyRoleFilterOrdering(filters.OrderingFilter):
     def filter(self, qs, value):
         if value is not None and any(v in ["download_count", "-download_count"] for v in value):
             order = "-" if "-download_count" in value else ""
 
-            return qs.annotate(
-                download_count=Case(
-                    When(legacyroledownloadcount=None, then=Value(0)),
-                    default="legacyroledownloadcount__count",
+            # the roles viewset already annotates the count
+            if "download_count" not in qs.query.annotations:
+                qs = qs.annotate(
+                    download_count=Case(
+                        When(legacyroledownloadcount=None, then=Value(0)),
+                        default="legacyroledownloadcount__count",
+                    )
                 )
-            ).order_by(f"{order}download_count")
+
+            return qs.order_by(f"{order}download_count")
 
         return super().filter(qs, value)
 
@@ -140,11 +150,7 @@ class LegacyRoleFilter(filterset.FilterSet):
         keywords = self.request.query_params.getlist('keywords')
 
         for keyword in keywords:
-            queryset = queryset.filter(
-                Q(namespace__name__contains=keyword)
-                | Q(name__contains=keyword)
-                | Q(full_metadata__description__contains=keyword)
-            )
+            queryset = queryset.filter(pk__in=_roles_matching_keyword(keyword))
 
         return queryset
 
@@ -153,11 +159,7 @@ class LegacyRoleFilter(filterset.FilterSet):
         keywords = self.request.query_params.getlist('autocomplete')
 
         for keyword in keywords:
-            queryset = queryset.filter(
-                Q(namespace__name__contains=keyword)
-                | Q(name__contains=keyword)
-                | Q(full_metadata__description__contains=keyword)
-            )
+            queryset = queryset.filter(pk__in=_roles_matching_keyword(keyword))
 
         return queryset
 
@@ -204,26 +206,11 @@ class LegacyRoleImportFilter(filterset.FilterSet):
             'state'
         ]
 
-    def _filter_by_enc_kwarg(self, queryset, key, value):
-        task_pks = []
-        related_qs = (
-            queryset.select_related('task')
-            .only('task_id', 'task__enc_kwargs')
-            .iterator(chunk_size=1000)
-        )
-        for obj in related_qs:
-            if not obj.task:
-                continue
-            kwargs = obj.task.enc_kwargs or {}
-            if kwargs.get(key) == value:
-                task_pks.append(obj.task_id)
-        return queryset.filter(task_id__in=task_pks)
-
     def github_user_filter(self, queryset, name, value):
-        return self._filter_by_enc_kwarg(queryset, 'github_user', value)
+        return queryset.filter(github_user=value)
 
     def github_repo_filter(self, queryset, name, value):
-        return self._filter_by_enc_kwarg(queryset, 'github_repo', value)
+        return queryset.filter(github_repo=value)
 
     def state_filter(self, queryset, name, value):
         if value.lower() == 'success':
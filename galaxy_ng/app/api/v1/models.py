@@ -1,6 +1,8 @@
 from django.db import models
+from django.db.models.fields.json import KT, KeyTransform
+from django.db.models.functions import Upper
 from django.contrib.postgres.search import SearchVectorField
-from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.indexes import GinIndex, OpClass
 
 from galaxy_ng.app.models import Namespace
 from galaxy_ng.app.models.auth import User
@@ -112,6 +114,21 @@ class LegacyNamespace(models.Model):
         editable=True
     )
 
+    class Meta:
+        # trigram indexes back the substring and case insensitive
+        # filters used by the role keywords and autocomplete searches
+        indexes = (
+            GinIndex(
+                fields=["name"],
+                opclasses=["gin_trgm_ops"],
+                name="galaxy_legacyns_name_trgm",
+            ),
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="galaxy_legacyns_uname_trgm",
+            ),
+        )
+
     def __repr__(self):
         return f'<LegacyNamespace: {self.name}>'
 
@@ -170,6 +187,25 @@ class LegacyRole(models.Model):
 
     tags = models.ManyToManyField(LegacyRoleTag, editable=False, related_name="legacyrole")
 
+    class Meta:
+        # expression indexes on the full_metadata keys used by the
+        # filters, so they don't have to scan every json blob
+        indexes = (
+            GinIndex(
+                fields=["name"],
+                opclasses=["gin_trgm_ops"],
+                name="galaxy_legacyrole_name_trgm",
+            ),
+            GinIndex(
+                OpClass(KT("full_metadata__description"), name="gin_trgm_ops"),
+                name="galaxy_legacyrole_desc_trgm",
+            ),
+            GinIndex(
+                KeyTransform("tags", "full_metadata"),
+                name="galaxy_legacyrole_tags_gin",
+            ),
+        )
+
     def __repr__(self):
         return f'<LegacyRole: {self.namespace.name}.{self.name}>'
 
@@ -187,6 +223,24 @@ class LegacyRoleDownloadCount(models.Model):
     count = models.IntegerField(default=0)
 
 
+class LegacyRoleSyncCheckpoint(models.Model):
+    """
+    The last upstream page fully written by a legacy role sync.
+
+    A sync restarted with the same parameters continues from the page
+    after it, the checkpoint is removed once the sync completes.
+    """
+
+    sync_key = models.CharField(max_length=64, unique=True, editable=False)
+    params = models.JSONField(default=dict, editable=False)
+    page = models.IntegerField(default=0)
+    synced_roles = models.IntegerField(default=0)
+    modified = models.DateTimeField(auto_now=True)
+
+    def __repr__(self):
+        return f'<LegacyRoleSyncCheckpoint: {self.params} page:{self.page}>'
+
+
 class LegacyRoleSearchVector(models.Model):
     role = models.OneToOneField(
         LegacyRole,
@@ -213,6 +267,12 @@ class LegacyRoleImport(models.Model):
     )
     messages = models.JSONField(default=list, editable=False)
 
+    # copied from the task kwargs when the import is dispatched,
+    # the kwargs are encrypted and can't be filtered in the database.
+    github_user = models.CharField(max_length=256, null=True, db_index=True, editable=False)
+    github_repo = models.CharField(max_length=256, null=True, db_index=True, editable=False)
+    github_reference = models.CharField(max_length=256, null=True, editable=False)
+
     class Meta:
         ordering = ["task__pulp_created"]
 
@@ -61,7 +61,12 @@ class LegacyNamespacesSerializer(serializers.ModelSerializer):
 
         owners = []
         if obj.namespace:
-            owner_objects = get_v3_namespace_owners(obj.namespace)
+            # the list view resolves owners for the whole page up front
+            owners_map = self.context.get('v3_namespace_owners')
+            if owners_map is not None:
+                owner_objects = owners_map.get(obj.namespace_id, [])
+            else:
+                owner_objects = get_v3_namespace_owners(obj.namespace)
             owners = [{'id': x.id, 'username': x.username} for x in owner_objects]
 
         # link the v1 namespace to the v3 namespace so that users
@@ -368,6 +373,9 @@ class LegacyRoleSerializer(serializers.ModelSerializer):
         }
 
     def get_download_count(self, obj):
+        # LegacyRolesViewSet annotates the count onto the queryset
+        if hasattr(obj, 'download_count'):
+            return obj.download_count or 0
         counter = LegacyRoleDownloadCount.objects.filter(legacyrole=obj).first()
         if counter:
             return counter.count
@@ -1,15 +1,19 @@
 import contextlib
 import copy
 import datetime
+import hashlib
+import json
 import logging
 import os
 import subprocess
+import time
 import traceback
 import tempfile
 from urllib.parse import urlparse
 import uuid
 
 from django.db import transaction
+from django.utils import timezone
 
 from ansible.module_utils.compat.version import LooseVersion
 
@@ -19,6 +23,7 @@ from galaxy_importer.legacy_role import import_legacy_role
 from galaxy_ng.app.models.auth import User
 from galaxy_ng.app.models import Namespace
 from galaxy_ng.app.utils.galaxy import upstream_role_iterator
+from galaxy_ng.app.utils import search as search_index
 from galaxy_ng.app.utils.legacy import process_namespace
 from galaxy_ng.app.utils.namespaces import generate_v3_namespace_from_attributes
 from galaxy_ng.app.utils.rbac import get_v3_namespace_owners
@@ -27,6 +32,7 @@ from galaxy_ng.app.api.v1.models import LegacyNamespace
 from galaxy_ng.app.api.v1.models import LegacyRole
 from galaxy_ng.app.api.v1.models import LegacyRoleDownloadCount
 from galaxy_ng.app.api.v1.models import LegacyRoleImport
+from galaxy_ng.app.api.v1.models import LegacyRoleSyncCheckpoint
 from galaxy_ng.app.api.v1.utils import sort_versions
 from galaxy_ng.app.api.v1.utils import parse_version_tag
 
@@ -327,7 +333,14 @@ def legacy_role_import(
     if task:
         v1_task_id = uuid_to_int(str(task.pulp_id))
         task_id = task.pulp_id
-        import_model, _ = LegacyRoleImport.objects.get_or_create(task_id=task_id)
+        import_model, _ = LegacyRoleImport.objects.get_or_create(
+            task_id=task_id,
+            defaults={
+                'github_user': github_user,
+                'github_repo': github_repo,
+                'github_reference': github_reference,
+            },
+        )
 
     logger.info(f'Starting import: task_id={v1_task_id}, pulp_id={task_id}')
     logger.info('')
@@ -566,6 +579,74 @@ def legacy_role_import(
     logger.info('Import completed')
 
 
+def get_legacy_sync_checkpoint(params):
+    """Get or create the checkpoint of a legacy sync run with these parameters."""
+    sync_key = hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    checkpoint, _ = LegacyRoleSyncCheckpoint.objects.get_or_create(
+        sync_key=sync_key, defaults={'params': params}
+    )
+    return checkpoint
+
+
+def bulk_upsert_legacy_roles(batch):
+    """
+    Write a batch of synced roles and their download counts.
+
+    :param batch:
+        A list of (legacy namespace, role name, full_metadata, download count).
+
+    Existing roles are looked up with a single query and only written when
+    their metadata changed, new roles are bulk created and the download
+    counts are upserted in one statement. Returns the synced role ids.
+    """
+    if not batch:
+        return []
+
+    existing = LegacyRole.objects.filter(
+        namespace__in={namespace for namespace, _, _, _ in batch},
+        name__in={name for _, name, _, _ in batch},
+    )
+    roles = {(role.namespace_id, role.name): role for role in existing}
+
+    to_create = []
+    to_update = {}
+    counts = {}
+    now = timezone.now()
+    for namespace, name, full_metadata, download_count in batch:
+        rkey = (namespace.pk, name)
+        role = roles.get(rkey)
+        if role is None:
+            logger.debug(f'SYNC create initial role for {rkey}')
+            role = LegacyRole(namespace=namespace, name=name, full_metadata=full_metadata)
+            roles[rkey] = role
+            to_create.append(role)
+        elif dict(role.full_metadata) != full_metadata:
+            role.full_metadata = full_metadata
+            role.modified = now
+            if role.pk is not None:
+                to_update[role.pk] = role
+        counts[rkey] = download_count
+
+    with transaction.atomic():
+        LegacyRole.objects.bulk_create(to_create)
+        LegacyRole.objects.bulk_update(list(to_update.values()), ['full_metadata', 'modified'])
+        LegacyRoleDownloadCount.objects.bulk_create(
+            [
+                LegacyRoleDownloadCount(legacyrole=roles[rkey], count=count)
+                for rkey, count in counts.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['legacyrole'],
+            update_fields=['count'],
+        )
+
+        # bulk writes skip the post_save signals
+        role_ids = [roles[rkey].pk for rkey in counts]
+        search_index.schedule_search_document_refresh(roles=role_ids)
+
+    return role_ids
+
+
 def legacy_sync_from_upstream(
     baseurl=None,
     github_user=None,
@@ -585,12 +666,18 @@ def legacy_sync_from_upstream(
         Allow the client to reduce the set of synced roles by the role name.
     :param limit:
         Allow the client to reduce the total number of synced roles.
+    :param start_page:
+        Start from this upstream page instead of the saved checkpoint.
 
     This is conceptually similar to the pulp_ansible/app/tasks/roles.py:synchronize
     function but has more robust handling and better schema matching. Although
     not considered something we'd be normally running on a production hosted
     galaxy instance, it is necessary for mirroring the roles into that future
     system until it is ready to deprecate the old instance.
+
+    Roles are written one upstream page at a time, along with a checkpoint
+    of the page, so a sync restarted with the same parameters continues
+    after the last written page.
     """
 
     logger.debug(
@@ -605,8 +692,40 @@ def legacy_sync_from_upstream(
     if limit is not None:
         limit = int(limit)
 
-    # index of all roles
-    rmap = {}
+    checkpoint = get_legacy_sync_checkpoint({
+        'baseurl': baseurl,
+        'github_user': github_user,
+        'role_name': role_name,
+        'limit': limit,
+    })
+    if start_page is None and checkpoint.page:
+        start_page = checkpoint.page + 1
+        logger.info(
+            f'SYNC resuming after page {checkpoint.page},'
+            + f' {checkpoint.synced_roles} roles already synced'
+        )
+
+    # roles of the current page, written once the page is complete
+    batch = []
+    started = time.monotonic()
+    synced = 0
+
+    def flush(page=None):
+        nonlocal batch, synced
+        with transaction.atomic():
+            bulk_upsert_legacy_roles(batch)
+            synced += len(batch)
+            checkpoint.synced_roles += len(batch)
+            if page is not None:
+                checkpoint.page = page
+            checkpoint.save()
+        batch = []
+
+        elapsed = time.monotonic() - started
+        logger.info(
+            f'SYNC page {checkpoint.page}: {synced} roles in {elapsed:.1f}s'
+            + f' ({synced / elapsed if elapsed else 0:.1f} roles/s)'
+        )
 
     iterator_kwargs = {
         'baseurl': baseurl,
@@ -614,6 +733,7 @@ def legacy_sync_from_upstream(
         'role_name': role_name,
         'limit': limit,
         'start_page': start_page,
+        'on_page_done': flush,
     }
     for ns_data, rdata, rversions in upstream_role_iterator(**iterator_kwargs):
 
@@ -629,7 +749,6 @@ def legacy_sync_from_upstream(
 
         logger.info(f'POPULATE {github_user}.{role_name}')
 
-        rkey = (github_user, role_name)
         remote_id = rdata['id']
         role_versions = rversions[:]
         github_repo = rdata['github_repo']
@@ -654,16 +773,6 @@ def legacy_sync_from_upstream(
         role_type = rdata.get('role_type', 'ANS')
         role_download_count = rdata.get('download_count', 0)
 
-        if rkey not in rmap:
-            logger.debug(f'SYNC create initial role for {rkey}')
-            this_role, _ = LegacyRole.objects.get_or_create(
-                namespace=namespace,
-                name=role_name
-            )
-            rmap[rkey] = this_role
-        else:
-            this_role = rmap[rkey]
-
         new_full_metadata = {
             'upstream_id': remote_id,
             'role_type': role_type,
@@ -693,14 +802,13 @@ def legacy_sync_from_upstream(
         new_full_metadata['versions'] = normalize_versions(new_full_metadata['versions'])
         new_full_metadata['versions'] = sort_versions(new_full_metadata['versions'])
 
-        if dict(this_role.full_metadata) != new_full_metadata:
-            with transaction.atomic():
-                this_role.full_metadata = new_full_metadata
-                this_role.save()
+        batch.append((namespace, role_name, new_full_metadata, role_download_count))
 
-        with transaction.atomic():
-            counter, _ = LegacyRoleDownloadCount.objects.get_or_create(legacyrole=this_role)
-            counter.count = role_download_count
-            counter.save()
+    # the remaining roles when the limit stopped the sync mid page
+    if batch:
+        flush()
+
+    # the sync completed, the next one starts over
+    checkpoint.delete()
 
     logger.debug('STOP LEGACY SYNC!')
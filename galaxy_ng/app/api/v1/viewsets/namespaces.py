@@ -11,10 +11,11 @@ from rest_framework import viewsets
 from rest_framework import mixins
 from rest_framework import exceptions
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
 
 from galaxy_ng.app.access_control.access_policy import LegacyAccessPolicy
+from galaxy_ng.app.api.pagination import KeysetPageNumberPagination
 from galaxy_ng.app.utils.rbac import get_v3_namespace_owners
+from galaxy_ng.app.utils.rbac import get_v3_namespace_owners_map
 from galaxy_ng.app.utils.rbac import add_user_to_v3_namespace
 from galaxy_ng.app.utils.rbac import remove_user_from_v3_namespace
 
@@ -43,7 +44,7 @@ GALAXY_AUTHENTICATION_CLASSES = perform_import(
 logger = logging.getLogger(__name__)
 
 
-class LegacyNamespacesSetPagination(PageNumberPagination):
+class LegacyNamespacesSetPagination(KeysetPageNumberPagination):
     page_size = 100
     page_size_query_param = 'page_size'
     max_page_size = 1000
@@ -74,7 +75,7 @@ class LegacyNamespacesViewSet(
     TODO: allow mapping to a real namespace
     """
 
-    queryset = LegacyNamespace.objects.all().order_by('id')
+    queryset = LegacyNamespace.objects.select_related('namespace').order_by('id')
     pagination_class = LegacyNamespacesSetPagination
     serializer_class = LegacyNamespacesSerializer
 
@@ -84,6 +85,22 @@ class LegacyNamespacesViewSet(
     permission_classes = [LegacyAccessPolicy]
     authentication_classes = GALAXY_AUTHENTICATION_CLASSES
 
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            # resolve the owners of every namespace in the page at once
+            # so the serializer doesn't query for them row by row
+            self._v3_namespace_owners = get_v3_namespace_owners_map(
+                [ns.namespace_id for ns in page]
+            )
+        return page
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if hasattr(self, '_v3_namespace_owners'):
+            context['v3_namespace_owners'] = self._v3_namespace_owners
+        return context
+
     @transaction.atomic
     def destroy(self, request, pk=None):
         return super().destroy(self, request, pk)
@@ -2,6 +2,7 @@ import logging
 
 from django.conf import settings
 from django.db import transaction
+from django.db.models.functions import Coalesce
 from django.db.utils import InternalError as DatabaseInternalError
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
@@ -11,9 +12,9 @@ from rest_framework import viewsets
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.settings import perform_import
-from rest_framework.pagination import PageNumberPagination
 
 from galaxy_ng.app.access_control.access_policy import LegacyAccessPolicy
+from galaxy_ng.app.api.pagination import KeysetPageNumberPagination
 
 from galaxy_ng.app.api.v1.tasks import (
     legacy_role_import,
@@ -48,7 +49,7 @@ GALAXY_AUTHENTICATION_CLASSES = perform_import(
 logger = logging.getLogger(__name__)
 
 
-class LegacyRolesSetPagination(PageNumberPagination):
+class LegacyRolesSetPagination(KeysetPageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 1000
@@ -57,7 +58,13 @@ class LegacyRolesSetPagination(PageNumberPagination):
 class LegacyRolesViewSet(viewsets.ModelViewSet):
     """A list of legacy roles."""
 
-    queryset = LegacyRole.objects.all().order_by('created')
+    # the serializer reads the download count and both namespaces for
+    # every row, so fetch them along with the role in the same query.
+    queryset = (
+        LegacyRole.objects.select_related('namespace__namespace')
+        .annotate(download_count=Coalesce('legacyroledownloadcount__count', 0))
+        .order_by('created')
+    )
     ordering = ('created')
     filter_backends = (DjangoFilterBackend,)
     filterset_class = LegacyRoleFilter
@@ -270,6 +277,16 @@ class LegacyRoleImportsViewSet(viewsets.ModelViewSet, LegacyTasksMixin):
 
         task_id, pulp_id = self.legacy_dispatch(legacy_role_import, kwargs=kwargs)
 
+        # keep the filterable kwargs in plain columns, the task ones are encrypted
+        LegacyRoleImport.objects.update_or_create(
+            task_id=pulp_id,
+            defaults={
+                'github_user': kwargs['github_user'],
+                'github_repo': kwargs['github_repo'],
+                'github_reference': kwargs.get('github_reference'),
+            },
+        )
+
         return Response({
             'results': [{
                 'id': task_id,
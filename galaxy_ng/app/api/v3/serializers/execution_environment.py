@@ -1,10 +1,11 @@
-import json
-
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
 from rest_framework import serializers
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field
 
 from pulpcore.plugin.util import get_users_with_perms
+from pulpcore.plugin.models.role import UserRole
 from pulpcore.plugin.serializers import IdentityField
 
 from pulp_container.app import models as container_models
@@ -12,6 +13,8 @@ from pulpcore.plugin import models as core_models
 
 from galaxy_ng.app import models
 from galaxy_ng.app.access_control.fields import MyPermissionsField
+from galaxy_ng.app.api.utils import prefetch_last_sync_tasks
+from galaxy_ng.app.utils.config_blobs import get_config_blob_json
 
 from galaxy_ng.app.api.ui.v1 import serializers as ui_serializers
 
@@ -61,11 +64,82 @@ class ContainerNamespaceSerializer(serializers.ModelSerializer):
 
     @extend_schema_field(serializers.ListField)
     def get_owners(self, namespace):
+        prefetched = self.context.get("prefetched_owners")
+        if prefetched is not None and namespace.pk in prefetched:
+            return prefetched[namespace.pk]
         return get_users_with_perms(
             namespace, with_group_users=False, for_concrete_model=True
         ).values_list("username", flat=True)
 
 
+def _get_namespace_owners(namespaces):
+    """Returns the owners of each namespace, keyed by namespace pk, in one query.
+
+    Same users as get_users_with_perms(namespace, with_group_users=False,
+    for_concrete_model=True): users with a role on the namespace, on its domain
+    or on all the container namespaces.
+    """
+    ctype = ContentType.objects.get_for_model(
+        models.ContainerNamespace, for_concrete_model=True
+    )
+    user_roles = UserRole.objects.filter(
+        Q(object_id=None, domain__isnull=True)
+        | Q(domain__in={namespace.pulp_domain_id for namespace in namespaces})
+        | Q(content_type=ctype, object_id__in=[str(namespace.pk) for namespace in namespaces]),
+        role__permissions__content_type=ctype,
+    ).values_list("user__username", "object_id", "domain_id").distinct()
+
+    global_owners = set()
+    domain_owners = {}
+    object_owners = {}
+    for username, object_id, domain_id in user_roles:
+        if domain_id is not None:
+            domain_owners.setdefault(domain_id, set()).add(username)
+        elif object_id is None:
+            global_owners.add(username)
+        else:
+            object_owners.setdefault(object_id, set()).add(username)
+
+    return {
+        namespace.pk: sorted(
+            global_owners
+            | domain_owners.get(namespace.pulp_domain_id, set())
+            | object_owners.get(str(namespace.pk), set())
+        )
+        for namespace in namespaces
+    }
+
+
+class ContainerRepositoryListSerializer(serializers.ListSerializer):
+    """Serializes a page of container repositories with a constant number of queries.
+
+    The remotes of the repositories, with their last sync task, and the
+    owners of the namespaces are fetched in bulk and stored in the context
+    shared with the nested serializers. The latest version number and sign
+    state of the repositories are annotated by ContainerRepositoryViewSet.
+    """
+
+    def to_representation(self, data):
+        distros = list(data)
+
+        remote_ids = {
+            distro.repository.remote_id
+            for distro in distros
+            if distro.repository and distro.repository.remote_id
+        }
+        remotes = list(
+            container_models.ContainerRemote.objects.filter(pk__in=remote_ids)
+            .select_related("registry__registry")
+        )
+        prefetch_last_sync_tasks(remotes)
+        self.context["prefetched_remotes"] = {remote.pk: remote for remote in remotes}
+
+        namespaces = {distro.namespace for distro in distros if distro.namespace}
+        self.context["prefetched_owners"] = _get_namespace_owners(namespaces)
+
+        return super().to_representation(distros)
+
+
 class ContainerRepositorySerializer(serializers.ModelSerializer):
     pulp = serializers.SerializerMethodField()
     namespace = ContainerNamespaceSerializer()
@@ -81,6 +155,7 @@ class ContainerRepositorySerializer(serializers.ModelSerializer):
     # hosted by other registries.
     class Meta:
         model = models.ContainerDistribution
+        list_serializer_class = ContainerRepositoryListSerializer
         read_only_fields = (
             "id",
             "pulp_href",
@@ -115,19 +190,31 @@ class ContainerRepositorySerializer(serializers.ModelSerializer):
     def get_pulp(self, distro):
         repo = distro.repository
         remote = None
-        if repo.remote:
-            remote = ui_serializers.ContainerRemoteSerializer(
-                repo.remote.cast(), context=self.context).data
-
-        sign_state = (repo.content.filter(
-            pulp_type="container.signature"
-        ).count() > 0 and "signed") or "unsigned"
+        if repo.remote_id:
+            prefetched_remotes = self.context.get("prefetched_remotes", {})
+            if repo.remote_id in prefetched_remotes:
+                remote = prefetched_remotes[repo.remote_id]
+            else:
+                remote = repo.remote.cast()
+            remote = ui_serializers.ContainerRemoteSerializer(remote, context=self.context).data
+
+        # annotated by ContainerRepositoryViewSet
+        if hasattr(distro, "repository_is_signed"):
+            is_signed = distro.repository_is_signed
+        else:
+            is_signed = repo.content.filter(pulp_type="container.signature").exists()
+        sign_state = "signed" if is_signed else "unsigned"
+
+        if hasattr(distro, "repository_version_number"):
+            version = distro.repository_version_number
+        else:
+            version = repo.latest_version().number
 
         return {
             "repository": {
                 "id": repo.pk,
                 "pulp_type": repo.pulp_type,
-                "version": repo.latest_version().number,
+                "version": version,
                 "name": repo.name,
                 "description": repo.description,
                 "created_at": repo.pulp_created,
@@ -237,15 +324,46 @@ class ContainerManifestSerializer(serializers.ModelSerializer):
 class ContainerManifestDetailSerializer(ContainerManifestSerializer):
     @extend_schema_field(OpenApiTypes.OBJECT)
     def get_config_blob(self, obj):
-        with obj.config_blob._artifacts.first().file.open() as f:
-            config_json = json.load(f)
-
         return {
             "digest": obj.config_blob.digest,
-            "data": config_json,
+            "data": get_config_blob_json(obj.config_blob),
         }
 
 
+class ContainerRepositoryHistoryListSerializer(serializers.ListSerializer):
+    """Serializes a page of repository versions with a constant number of queries.
+
+    The digests of the manifests and the names and digests of the tags added
+    or removed by the versions are fetched in two queries, keyed by content
+    pk, and stored in the context for ContainerRepositoryHistorySerializer.
+    """
+
+    def to_representation(self, data):
+        versions = list(data)
+
+        content_pks = {"container.manifest": set(), "container.tag": set()}
+        for version in versions:
+            for membership in (
+                *version.added_memberships.all(), *version.removed_memberships.all()
+            ):
+                if membership.content.pulp_type in content_pks:
+                    content_pks[membership.content.pulp_type].add(membership.content_id)
+
+        self.context["prefetched_manifest_digests"] = dict(
+            container_models.Manifest.objects.filter(
+                pk__in=content_pks["container.manifest"]
+            ).values_list("pk", "digest")
+        )
+        self.context["prefetched_tags"] = {
+            pk: (name, digest)
+            for pk, name, digest in container_models.Tag.objects.filter(
+                pk__in=content_pks["container.tag"]
+            ).values_list("pk", "name", "tagged_manifest__digest")
+        }
+
+        return super().to_representation(versions)
+
+
 class ContainerRepositoryHistorySerializer(serializers.ModelSerializer):
     id = serializers.UUIDField(source='pulp_id')
     added = serializers.SerializerMethodField()
@@ -255,6 +373,7 @@ class ContainerRepositoryHistorySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = core_models.RepositoryVersion
+        list_serializer_class = ContainerRepositoryHistoryListSerializer
         fields = ("id", "added", "removed", "number", "created_at", "updated_at")
 
     @extend_schema_field(serializers.ListField(child=serializers.JSONField()))
@@ -273,14 +392,24 @@ class ContainerRepositoryHistorySerializer(serializers.ModelSerializer):
             "tag_name": None,
         }
 
-        # TODO(jerabekjiri): Figure out if there is a way to prefetch Manifest and Tag objects
+        manifest_digests = self.context.get("prefetched_manifest_digests", {})
+        tags = self.context.get("prefetched_tags", {})
+
         if content.pulp_type == "container.manifest":
-            manifest = container_models.Manifest.objects.get(pk=content.pk)
-            return_data["manifest_digest"] = manifest.digest
+            if content.pk in manifest_digests:
+                return_data["manifest_digest"] = manifest_digests[content.pk]
+            else:
+                manifest = container_models.Manifest.objects.get(pk=content.pk)
+                return_data["manifest_digest"] = manifest.digest
         elif content.pulp_type == "container.tag":
-            tag = container_models.Tag.objects.select_related("tagged_manifest").get(pk=content.pk)
-            return_data["manifest_digest"] = tag.tagged_manifest.digest
-            return_data["tag_name"] = tag.name
+            if content.pk in tags:
+                return_data["tag_name"], return_data["manifest_digest"] = tags[content.pk]
+            else:
+                tag = container_models.Tag.objects.select_related("tagged_manifest").get(
+                    pk=content.pk
+                )
+                return_data["manifest_digest"] = tag.tagged_manifest.digest
+                return_data["tag_name"] = tag.name
 
         return return_data
 
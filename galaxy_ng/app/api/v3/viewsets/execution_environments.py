@@ -1,7 +1,7 @@
 import logging
 
 from django.core import exceptions
-from django.db.models import Count, Prefetch, Q
+from django.db.models import Count, Exists, OuterRef, Prefetch, Q, Subquery
 from django.shortcuts import get_object_or_404
 from django_filters import filters
 from django_filters.rest_framework import DjangoFilterBackend, filterset
@@ -113,7 +113,21 @@ class TagFilter(filterset.FilterSet):
 
 
 class ContainerRepositoryViewSet(api_base.ModelViewSet):
-    queryset = models.ContainerDistribution.objects.all().select_related('namespace')
+    queryset = models.ContainerDistribution.objects.all().select_related(
+        'namespace', 'repository'
+    ).annotate(
+        repository_version_number=Subquery(
+            core_models.RepositoryVersion.objects.filter(
+                repository=OuterRef('repository_id'), complete=True
+            ).order_by('-number').values('number')[:1]
+        ),
+        repository_is_signed=Exists(
+            core_models.RepositoryContent.objects.filter(
+                repository=OuterRef('repository_id'),
+                content__pulp_type='container.signature',
+            )
+        ),
+    )
     serializer_class = serializers.ContainerRepositorySerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RepositoryFilter
@@ -193,17 +207,17 @@ class ContainerRepositoryHistoryViewSet(ContainerContentBaseViewset):
         # The ui only cares about repo versions where tags and manifests are added.
         # Pulp container revs the repo version each time any blobs are added, so
         # this filters out any repo versions where tags and manifests are unchanged.
+        changed_memberships = core_models.RepositoryContent.objects.filter(
+            content__pulp_type__in=allowed_content_types
+        )
         return (
-            repo.versions.annotate(
-                # Count the number of added/removed manifests and tags and use
-                # the result to filter out any versions where tags and manifests
-                # are unchanged.
-                added_count=Count('added_memberships', filter=Q(
-                    added_memberships__content__pulp_type__in=allowed_content_types)),
-                removed_count=Count('removed_memberships', filter=Q(
-                    removed_memberships__content__pulp_type__in=allowed_content_types))
+            # Filter out any versions where tags and manifests are unchanged.
+            # EXISTS stops at the first membership instead of counting the
+            # memberships added times the memberships removed by a version.
+            repo.versions.filter(
+                Exists(changed_memberships.filter(version_added=OuterRef('pk')))
+                | Exists(changed_memberships.filter(version_removed=OuterRef('pk')))
             )
-            .filter(Q(added_count__gt=0) | Q(removed_count__gt=0))
             .prefetch_related(
                 Prefetch(
                     'added_memberships',
@@ -31,3 +31,39 @@ collection_artifact_download_successes = Counter(
     "galaxy_api_collection_artifact_download_successes",
     "count of successful collection artifact downloads"
 )
+
+dynamic_settings_cache_hits = Counter(
+    "galaxy_dynamic_settings_cache_hits",
+    "count of dynamic settings reads served from the process cache"
+)
+
+dynamic_settings_cache_revalidations = Counter(
+    "galaxy_dynamic_settings_cache_revalidations",
+    "count of dynamic settings reads revalidated against the redis version key"
+)
+
+dynamic_settings_cache_misses = Counter(
+    "galaxy_dynamic_settings_cache_misses",
+    "count of dynamic settings reads that fetched the whole redis hash"
+)
+
+dynamic_settings_cache_invalidations = Counter(
+    "galaxy_dynamic_settings_cache_invalidations",
+    "count of dynamic settings changes applied to the process cache from redis pub/sub"
+)
+
+config_blob_cache_hits = Counter(
+    "galaxy_config_blob_cache_hits",
+    "count of container config blobs read from the process or the shared cache",
+    ["cache"]
+)
+
+config_blob_cache_misses = Counter(
+    "galaxy_config_blob_cache_misses",
+    "count of container config blobs read from storage"
+)
+
+config_blob_cache_evictions = Counter(
+    "galaxy_config_blob_cache_evictions",
+    "count of parsed container config blobs evicted from the process cache"
+)
@@ -270,6 +270,10 @@ PERMISSIONS = {
 
 AAP_VERSION_FILE_PATH = '/etc/ansible-automation-platform/VERSION'
 
+LANDING_PAGE_COUNTS_CACHE_KEY = 'galaxy_landing_page_counts'
+# seconds the landing page counts are cached by each process
+LANDING_PAGE_COUNTS_CACHE_TIMEOUT = 60
+
 ROLE_DESCRIPTION = {
     # Core roles from pulpcore
     "core.compositecontentguard_creator": "Create composite content guards.",
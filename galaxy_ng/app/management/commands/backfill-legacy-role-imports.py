@@ -0,0 +1,55 @@
+from gettext import gettext as _
+import uuid
+
+import django_guid
+from django.core.management.base import BaseCommand
+
+from galaxy_ng.app.api.v1.models import LegacyRoleImport
+
+FIELDS = ["github_user", "github_repo", "github_reference"]
+
+
+class Command(BaseCommand):
+    """
+    Django management command for copying the github_user, github_repo and
+    github_reference task kwargs onto the LegacyRoleImport rows missing them.
+    The task kwargs are encrypted so '/api/v1/imports/' can only filter on the copies.
+    """
+
+    help = _("Populate the github fields of legacy role imports from their task kwargs.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help=_("Number of imports updated per query."),
+        )
+
+    def handle(self, *args, **options):
+        # Set logging correlation ID for this management command
+        # (not auto-generated like in HTTP requests)
+        django_guid.set_guid(str(uuid.uuid4()))
+        batch_size = options["batch_size"]
+
+        total = 0
+        batch = []
+        qs = (
+            LegacyRoleImport.objects.filter(github_user__isnull=True)
+            .select_related("task")
+            .only("task_id", "task__enc_kwargs")
+        )
+        for obj in qs.iterator(chunk_size=batch_size):
+            kwargs = obj.task.enc_kwargs or {}
+            for field in FIELDS:
+                setattr(obj, field, kwargs.get(field))
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                LegacyRoleImport.objects.bulk_update(batch, FIELDS)
+                total += len(batch)
+                batch = []
+        if batch:
+            LegacyRoleImport.objects.bulk_update(batch, FIELDS)
+            total += len(batch)
+
+        self.stdout.write(f"Successfully backfilled {total} legacy role imports.")
@@ -20,6 +20,10 @@ class Command(BaseCommand):
             '--ship', dest='ship', action='store_true',
             help='Enable to ship metrics to the Red Hat Cloud'
         )
+        parser.add_argument(
+            '--full-sync', dest='full-sync', action='store_true',
+            help='Export all the rows instead of the ones changed since the last collection'
+        )
 
     def handle(self, *args, **options):
         """Handle command"""
@@ -34,7 +38,8 @@ class Command(BaseCommand):
         collector = Collector(
             collector_module=automation_analytics_data,
             collection_type=Collector.MANUAL_COLLECTION if opt_ship else Collector.DRY_RUN,
-            logger=logger
+            logger=logger,
+            full_sync=options.get('full-sync', False),
         )
 
         tgzfiles = collector.gather()
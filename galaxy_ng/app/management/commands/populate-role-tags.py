@@ -3,6 +3,7 @@ import uuid
 
 import django_guid
 from django.core.management.base import BaseCommand
+from django.db import transaction
 
 from galaxy_ng.app.api.v1.models import LegacyRole, LegacyRoleTag
 
@@ -21,13 +22,15 @@ class Command(BaseCommand):
         django_guid.set_guid(str(uuid.uuid4()))
         created_tags = []
         roles = LegacyRole.objects.all()
-        for role in roles:
-            for name in role.full_metadata["tags"]:
-                tag, created = LegacyRoleTag.objects.get_or_create(name=name)
-                tag.legacyrole.add(role)
-
-                if created:
-                    created_tags.append(tag)
+        # tag counts are refreshed once, when the transaction commits
+        with transaction.atomic():
+            for role in roles:
+                for name in role.full_metadata["tags"]:
+                    tag, created = LegacyRoleTag.objects.get_or_create(name=name)
+                    tag.legacyrole.add(role)
+
+                    if created:
+                        created_tags.append(tag)
 
         self.stdout.write(
             "Successfully populated {} tags "
@@ -0,0 +1,32 @@
+from gettext import gettext as _
+import uuid
+
+import django_guid
+from django.core.management.base import BaseCommand
+
+from galaxy_ng.app.utils.search import rebuild_search_documents
+
+
+class Command(BaseCommand):
+    """
+    Django management command for rebuilding the documents behind '_ui/v1/search/'.
+    Documents are kept up to date by signal handlers, this command is only
+    needed to repair the index or after bulk changes that bypass signals.
+    """
+
+    help = _("Rebuild the 'SearchDocument' table from collections and legacy roles.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help=_("Number of documents inserted per query."),
+        )
+
+    def handle(self, *args, **options):
+        # Set logging correlation ID for this management command
+        # (not auto-generated like in HTTP requests)
+        django_guid.set_guid(str(uuid.uuid4()))
+        total = rebuild_search_documents(batch_size=options["batch_size"])
+        self.stdout.write(f"Successfully rebuilt {total} search documents.")
@@ -0,0 +1,32 @@
+from gettext import gettext as _
+import uuid
+
+import django_guid
+from django.core.management.base import BaseCommand
+
+from galaxy_ng.app.utils.tags import rebuild_tag_counts
+
+
+class Command(BaseCommand):
+    """
+    Django management command for rebuilding the counts behind '_ui/v1/tags/collections/'
+    and '_ui/v1/tags/roles/'. Counts are kept up to date by signal handlers, this command
+    is only needed to repair them or after bulk changes that bypass signals.
+    """
+
+    help = _("Rebuild the 'TagCount' table from collection versions and legacy role tags.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help=_("Number of tags inserted per query."),
+        )
+
+    def handle(self, *args, **options):
+        # Set logging correlation ID for this management command
+        # (not auto-generated like in HTTP requests)
+        django_guid.set_guid(str(uuid.uuid4()))
+        total = rebuild_tag_counts(batch_size=options["batch_size"])
+        self.stdout.write(f"Successfully rebuilt {total} tag counts.")
@@ -1,16 +1,29 @@
-import datetime
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
 import requests
+from requests.adapters import HTTPAdapter
 
 from django.core.management.base import BaseCommand
 from django.db import transaction
+from django.utils import timezone
 from pulp_ansible.app.models import Collection, CollectionDownloadCount
 
+from galaxy_ng.app.utils import search as search_index
+
 
 log = logging.getLogger(__name__)
 
 
 DEFAULT_UPSTREAM = 'https://galaxy.ansible.com'
+DEFAULT_WORKERS = 8
+
+# don't try to resync something that changed less than a day ago
+RESYNC_INTERVAL = timedelta(days=1)
+PROGRESS_INTERVAL = 100
+REQUEST_TIMEOUT = 60
+BATCH_SIZE = 1000
 
 SKIPLIST = [
     'larrymou9',
@@ -18,6 +31,33 @@ SKIPLIST = [
 ]
 
 
+def fetch_download_count(session, upstream, namespace, name):
+    """Returns the upstream download count of a collection, None when it can't be read."""
+    detail_url = upstream + '/api/internal/ui/repo-or-collection-detail/'
+    try:
+        drr = session.get(
+            detail_url,
+            params={'namespace': namespace, 'name': name},
+            timeout=REQUEST_TIMEOUT,
+        )
+        ds = drr.json()
+    except (requests.RequestException, ValueError) as e:
+        log.error(f'\t{namespace}.{name}: {e}')
+        return None
+
+    if 'data' not in ds:
+        log.error(ds)
+        return None
+    if 'collection' not in ds['data']:
+        log.error(ds['data'].keys())
+        return None
+
+    cid = ds['data']['collection']['id']
+    dcount = ds['data']['collection']['download_count']
+    log.debug(f'\t{cid} {namespace}.{name} downloads:{dcount}')
+    return dcount
+
+
 class Command(BaseCommand):
 
     def add_arguments(self, parser):
@@ -30,71 +70,106 @@ class Command(BaseCommand):
         parser.add_argument(
             '--force', action='store_true', help='sync all counts and ignore last update'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=DEFAULT_WORKERS,
+            help=f"number of concurrent requests to the upstream [{DEFAULT_WORKERS}]"
+        )
 
     def handle(self, *args, **options):
         log.info(f"Processing upstream download counts from {options['upstream']}")
         upstream = options['upstream']
         limit = options['limit']
-
-        now = datetime.datetime.now()  # noqa: DTZ005
-
-        collection_count = 0
-        collection_total = Collection.objects.count()
-        for collection in Collection.objects.all().order_by('pulp_created'):
-
-            namespace = collection.namespace
-            name = collection.name
-            collection_count += 1
-
-            log.info(f'{collection_total}|{collection_count} {namespace}.{name}')
-
-            if limit and collection_count > limit:
-                break
-
-            if namespace in SKIPLIST:
+        workers = max(options['workers'], 1)
+
+        now = timezone.now()
+
+        collections = Collection.objects.order_by('pulp_created').values_list('namespace', 'name')
+        if limit:
+            collections = collections[:limit]
+
+        counters = {
+            (counter.namespace, counter.name): counter
+            for counter in CollectionDownloadCount.objects.all()
+        }
+
+        to_sync = []
+        skipped = 0
+        for namespace, name in collections:
+            counter = counters.get((namespace, name))
+            if namespace in SKIPLIST or (
+                counter is not None
+                and not options['force']
+                and counter.pulp_last_updated is not None
+                and now - counter.pulp_last_updated < RESYNC_INTERVAL
+            ):
+                skipped += 1
                 continue
-
-            # optimization: don't try to resync something that changed less than a day ago
-            counter = CollectionDownloadCount.objects.filter(namespace=namespace, name=name).first()
-            if counter is not None and not options['force']:
-                delta = (now - counter.pulp_last_updated.replace(tzinfo=None)).total_seconds()
-                if (delta / 60) < (24 * 60 * 60):
+            to_sync.append((namespace, name))
+
+        log.info(f'Fetching {len(to_sync)} download counts, skipped {skipped} collections')
+
+        created = []
+        updated = []
+        failed = 0
+        with requests.Session() as session, ThreadPoolExecutor(max_workers=workers) as executor:
+            adapter = HTTPAdapter(pool_maxsize=workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+
+            futures = {
+                executor.submit(fetch_download_count, session, upstream, namespace, name): (
+                    namespace,
+                    name,
+                )
+                for namespace, name in to_sync
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                namespace, name = futures[future]
+                dcount = future.result()
+                if done % PROGRESS_INTERVAL == 0 or done == len(futures):
+                    log.info(f'{len(futures)}|{done} download counts fetched')
+
+                if dcount is None:
+                    failed += 1
                     continue
 
-            detail_url = (
-                upstream
-                + f'/api/internal/ui/repo-or-collection-detail/?namespace={namespace}&name={name}'
-            )
-            log.info('\t' + detail_url)
-            drr = requests.get(detail_url)
-            ds = drr.json()
-            if 'data' not in ds:
-                log.error(ds)
-                continue
-            if 'collection' not in ds['data']:
-                log.error(ds['data'].keys())
-                continue
-
-            cid = ds['data']['collection']['id']
-            dcount = ds['data']['collection']['download_count']
-            log.info(f'\t{cid} {namespace}.{name} downloads:{dcount}')
-
-            if counter is None:
-                log.info(f'\tcreate downloadcount for {namespace}.{name} with value of {dcount}')
-                with transaction.atomic():
-                    counter = CollectionDownloadCount(
+                counter = counters.get((namespace, name))
+                if counter is None:
+                    log.info(
+                        f'\tcreate downloadcount for {namespace}.{name} with value of {dcount}'
+                    )
+                    created.append(CollectionDownloadCount(
                         namespace=namespace,
                         name=name,
                         download_count=dcount
+                    ))
+                elif counter.download_count < dcount:
+                    log.info(
+                        f'\tupdate downloadcount for {namespace}.{name}'
+                        + f' from {counter.download_count} to {dcount}'
                     )
-                    counter.save()
-                continue
-
-            if counter.download_count < dcount:
-                log.info(
-                    f'\tupdate downloadcount for {namespace}.{name}'
-                    + f' from {counter.download_count} to {dcount}'
-                )
-                with transaction.atomic():
                     counter.download_count = dcount
-                    continue
+                    # bulk_update() doesn't set auto_now fields
+                    counter.pulp_last_updated = now
+                    updated.append(counter)
+
+        with transaction.atomic():
+            CollectionDownloadCount.objects.bulk_create(created, batch_size=BATCH_SIZE)
+            CollectionDownloadCount.objects.bulk_update(
+                updated, ['download_count', 'pulp_last_updated'], batch_size=BATCH_SIZE
+            )
+
+        # the bulk writes don't send the post_save signals that keep the
+        # search documents in sync
+        changed = [(counter.namespace, counter.name) for counter in created + updated]
+        for start in range(0, len(changed), BATCH_SIZE):
+            search_index.update_collection_download_counts(changed[start:start + BATCH_SIZE])
+
+        summary = (
+            f'Synced download counts of {len(to_sync)} collections: {len(created)} created, '
+            f'{len(updated)} updated, {failed} failed, {skipped} skipped'
+        )
+        log.info(summary)
+        self.stdout.write(summary)
@@ -1,7 +1,9 @@
 import os
+from django.conf import settings
 from django.db import connection
-from insights_analytics_collector import CsvFileSplitter, register
+from insights_analytics_collector import register
 import galaxy_ng.app.metrics_collection.common_data as data
+from galaxy_ng.app.metrics_collection.csv_collection import CsvFileSplitter
 
 
 @register("config", "1.0", description="General platform configuration.", config=True)
@@ -16,9 +18,10 @@ def instance_info(since, **kwargs):
 
 @register("collections", "1.0", format="csv", description="Data on ansible_collection")
 def collections(since, full_path, until, **kwargs):
-    query = data.collections_query()
-
-    return export_to_csv(full_path, "collections", query)
+    query, params = data.changed_between(
+        data.collections_query(), "pulp_last_updated", since, until
+    )
+    return export_to_csv(full_path, "collections", query, params)
 
 
 @register(
@@ -28,8 +31,9 @@ def collections(since, full_path, until, **kwargs):
     description="Data on ansible_collectionversion",
 )
 def collection_versions(since, full_path, until, **kwargs):
+    # Always a full sync: is_highest comes from the cross repository index,
+    # it changes without updating the pulp_last_updated of the version.
     query = data.collection_versions_query()
-
     return export_to_csv(full_path, "collection_versions", query)
 
 
@@ -61,10 +65,11 @@ def collection_tags(since, full_path, **kwargs):
     format="csv",
     description="Data on ansible_collectionversionsignature",
 )
-def collection_version_signatures(since, full_path, **kwargs):
-    query = data.collection_version_signatures_query()
-
-    return export_to_csv(full_path, "collection_version_signatures", query)
+def collection_version_signatures(since, full_path, until=None, **kwargs):
+    query, params = data.changed_between(
+        data.collection_version_signatures_query(), "pulp_last_updated", since, until
+    )
+    return export_to_csv(full_path, "collection_version_signatures", query, params)
 
 
 @register(
@@ -73,9 +78,11 @@ def collection_version_signatures(since, full_path, **kwargs):
     format="csv",
     description="Data on core_signingservice"
 )
-def signing_services(since, full_path, **kwargs):
-    query = data.signing_services_query()
-    return export_to_csv(full_path, "signing_services", query)
+def signing_services(since, full_path, until=None, **kwargs):
+    query, params = data.changed_between(
+        data.signing_services_query(), "pulp_last_updated", since, until
+    )
+    return export_to_csv(full_path, "signing_services", query, params)
 
 
 @register(
@@ -85,8 +92,11 @@ def signing_services(since, full_path, **kwargs):
     description="Data from ansible_downloadlog"
 )
 def collection_download_logs(since, full_path, until, **kwargs):
-    query = data.collection_downloads_query()
-    return export_to_csv(full_path, "collection_download_logs", query)
+    # download logs are never updated, only new rows are exported
+    query, params = data.changed_between(
+        data.collection_downloads_query(), "pulp_created", since, until
+    )
+    return export_to_csv(full_path, "collection_download_logs", query, params)
 
 
 @register(
@@ -96,29 +106,35 @@ def collection_download_logs(since, full_path, until, **kwargs):
     description="Data from ansible_collectiondownloadcount"
 )
 def collection_download_counts(since, full_path, until, **kwargs):
-    query = data.collection_download_counts_query()
-    return export_to_csv(full_path, "collection_download_counts", query)
+    query, params = data.changed_between(
+        data.collection_download_counts_query(), "pulp_last_updated", since, until
+    )
+    return export_to_csv(full_path, "collection_download_counts", query, params)
 
 
 def _get_csv_splitter(file_path, max_data_size=209715200):
-    return CsvFileSplitter(filespec=file_path, max_file_size=max_data_size)
+    return CsvFileSplitter(
+        filespec=file_path,
+        max_file_size=max_data_size,
+        compression=settings.GALAXY_METRICS_COLLECTION_CSV_COMPRESSION,
+    )
 
 
-def export_to_csv(full_path, file_name, query):
+def export_to_csv(full_path, file_name, query, params=None):
     copy_query = f"""COPY (
     {query}
     ) TO STDOUT WITH CSV HEADER
     """
-    return _simple_csv(full_path, file_name, copy_query, max_data_size=209715200)
+    return _simple_csv(full_path, file_name, copy_query, params, max_data_size=209715200)
 
 
-def _simple_csv(full_path, file_name, query, max_data_size=209715200):
+def _simple_csv(full_path, file_name, query, params=None, max_data_size=209715200):
     file_path = _get_file_path(full_path, file_name)
     tfile = _get_csv_splitter(file_path, max_data_size)
 
-    with connection.cursor() as cursor, cursor.copy(query) as copy:
+    with connection.cursor() as cursor, cursor.copy(query, params) as copy:
         while data := copy.read():
-            tfile.write(str(data, 'utf8'))
+            tfile.write(data)
 
     return tfile.file_list()
 
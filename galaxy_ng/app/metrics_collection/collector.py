@@ -1,11 +1,87 @@
 from django.db import connection
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import timedelta
 from insights_analytics_collector import Collector as BaseCollector
 
+from galaxy_ng.app.metrics_collection.common_data import FULL_SYNC_SINCE
+from galaxy_ng.app.metrics_collection.csv_collection import CollectionCSV
+from galaxy_ng.app.models import MetricsCollectionState
+
 
 class Collector(BaseCollector):
+    """Collector persisting its watermarks in MetricsCollectionState.
+
+    Each collection exports only the rows changed since its last shipped
+    gathering. The first gathering, a gathering after more than 4 weeks
+    (the longest interval the collector handles) or a `full_sync` one
+    exports the whole tables instead. The last gather time is saved even
+    when shipping fails, so CollectionCSV also falls back to a full export
+    for each collection without a recent shipped entry.
+    """
+
+    # name of the MetricsCollectionState row, no watermarks when None
+    state_name = None
+
+    def __init__(self, *args, full_sync=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.full_sync = full_sync
+
     def _is_valid_license(self):
         return True
 
     @staticmethod
     def db_connection():
         return connection
+
+    @staticmethod
+    def _collection_csv_class():
+        return CollectionCSV
+
+    def _state(self):
+        if self.state_name is None:
+            return None
+        return MetricsCollectionState.objects.filter(collector=self.state_name).first()
+
+    def _calculate_collection_interval(self, since, until):
+        super()._calculate_collection_interval(since, until)
+
+        if since is None:
+            last_gather = self._last_gathering()
+            horizon = self.gather_until - timedelta(weeks=4)
+            if last_gather is None or last_gather < horizon:
+                self.gather_since = FULL_SYNC_SINCE
+        if self.full_sync:
+            self.gather_since = FULL_SYNC_SINCE
+
+    def _last_gathering(self):
+        state = self._state()
+        return state.last_gather if state else None
+
+    def _load_last_gathered_entries(self):
+        state = self._state()
+        if state is None:
+            return {}
+        return {
+            key: parse_datetime(value) if isinstance(value, str) else value
+            for key, value in state.last_gathered_entries.items()
+        }
+
+    def _save_last_gathered_entries(self, last_gathered_entries):
+        if self.state_name is None:
+            return
+        MetricsCollectionState.objects.update_or_create(
+            collector=self.state_name,
+            defaults={
+                "last_gathered_entries": {
+                    key: value.isoformat() if value else None
+                    for key, value in last_gathered_entries.items()
+                }
+            },
+        )
+
+    def _save_last_gather(self):
+        if self.state_name is None:
+            return
+        MetricsCollectionState.objects.update_or_create(
+            collector=self.state_name, defaults={"last_gather": self.gather_until}
+        )
@@ -1,3 +1,4 @@
+from datetime import UTC, datetime
 import os
 import requests
 import logging
@@ -9,6 +10,26 @@ from pulpcore.plugin.models import system_id
 
 logger = logging.getLogger("metrics_collection.export_data")
 
+# `since` of a full sync, the collectors export whole tables instead of changes.
+FULL_SYNC_SINCE = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def changed_between(query, column, since, until):
+    """Restrict a collection query to the rows with `column` in (since, until].
+
+    Returns the query and its parameters, no parameters when all the rows
+    are exported (no `since` or a full sync).
+    """
+    if since is None or since <= FULL_SYNC_SINCE:
+        return query, None
+
+    params = {"since": since}
+    where = f'"{column}" > %(since)s'
+    if until is not None:
+        params["until"] = until
+        where += f' AND "{column}" <= %(until)s'
+    return f"SELECT * FROM ({query}) AS changed WHERE {where}", params
+
 
 def api_status():
     status_path = 'pulp/api/v3/status/'
@@ -0,0 +1,165 @@
+import gzip
+import os
+
+from django.utils.timezone import timedelta
+from insights_analytics_collector import CollectionCSV as BaseCollectionCSV, Package
+
+from galaxy_ng.app.metrics_collection.common_data import FULL_SYNC_SINCE
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+# Size of the buffer in front of each file, the only data held in memory.
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+class CsvFileSplitter:
+    """Helper for writing the output of `COPY ... TO STDOUT WITH CSV HEADER`
+    into multiple files split by size.
+
+    Unlike insights_analytics_collector.CsvFileSplitter the data is written
+    as the bytes received from the database, without decoding it. A new file,
+    starting with the CSV header, is only opened at the end of a row, so rows
+    (and multi-byte characters) are never split between files.
+
+    Files can be compressed on the fly with gzip or zstd (requires the
+    zstandard package), `max_file_size` then applies to the compressed size.
+    """
+
+    def __init__(self, filespec, max_file_size=Package.MAX_DATA_SIZE, compression=None):
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unsupported CSV compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("zstd CSV compression requires the zstandard package")
+
+        self.filespec = filespec
+        self.max_file_size = max_file_size
+        self.compression = compression
+        self.files = []
+        self.header = b""
+        self.header_complete = False
+        # quoted fields can contain newlines, they don't end a row
+        self.in_quotes = False
+        self.counter = 0
+        self.next_size_check = 0
+        self.rawfile = None
+        self.currentfile = None
+        self.cycle_file()
+
+    def cycle_file(self):
+        """Closes current file, opens new one and writes CSV header"""
+        self._close_file()
+        fname = "{}_split{}{}".format(
+            self.filespec, len(self.files), COMPRESSION_SUFFIXES[self.compression]
+        )
+        self.rawfile = open(fname, "wb", buffering=WRITE_BUFFER_SIZE)  # noqa: SIM115
+        if self.compression == "gzip":
+            self.currentfile = gzip.GzipFile(
+                fileobj=self.rawfile, mode="wb", compresslevel=6, mtime=0
+            )
+        elif self.compression == "zstd":
+            self.currentfile = zstandard.ZstdCompressor().stream_writer(
+                self.rawfile, closefd=False
+            )
+        else:
+            self.currentfile = self.rawfile
+        self.files.append(fname)
+
+        self.counter = 0
+        # compressed files are smaller, their size is only checked once
+        # the uncompressed data reaches the limit
+        self.next_size_check = self.max_file_size
+        if self.header_complete:
+            self.currentfile.write(self.header)
+            self.counter = len(self.header)
+
+    def file_list(self):
+        """Returns list of written files"""
+        self._close_file()
+        # Check for an empty dump
+        if self.counter <= len(self.header):
+            os.remove(self.files.pop())
+        # If we only have one file, remove the suffix
+        if len(self.files) == 1:
+            filename = self.files.pop()
+            new_filename = filename.replace("_split0", "")
+            os.rename(filename, new_filename)
+            self.files.append(new_filename)
+        return self.files
+
+    def write(self, data):
+        """Writes to file and creates new one if file exceeds threshold at the end of a row"""
+        data = bytes(data)
+        if not self.header_complete:
+            end = data.find(b"\n")
+            self.header += data if end < 0 else data[:end + 1]
+            self.header_complete = end >= 0
+
+        in_quotes = self.in_quotes != bool(data.count(b'"') % 2)
+        if self.counter + len(data) >= self.next_size_check:
+            end = self._row_end(data, max(self.next_size_check - self.counter, 0))
+            if end:
+                self._write(data[:end])
+                data = data[end:]
+                if self.size() >= self.max_file_size:
+                    self.cycle_file()
+                else:
+                    self.next_size_check = self.counter + WRITE_BUFFER_SIZE
+        self._write(data)
+        self.in_quotes = in_quotes
+
+    def size(self):
+        """Size of the current file"""
+        return self.rawfile.tell() if self.compression else self.counter
+
+    def _write(self, data):
+        self.currentfile.write(data)
+        self.counter += len(data)
+
+    def _row_end(self, data, start):
+        """Returns the offset after the first newline ending a row in data[start:], 0 if none"""
+        in_quotes = self.in_quotes != bool(data.count(b'"', 0, start) % 2)
+        while (pos := data.find(b"\n", start)) >= 0:
+            if data.count(b'"', start, pos) % 2:
+                in_quotes = not in_quotes
+            if not in_quotes:
+                return pos + 1
+            start = pos + 1
+        return 0
+
+    def _close_file(self):
+        if self.currentfile is not None:
+            self.currentfile.close()
+        if self.rawfile is not None and not self.rawfile.closed:
+            self.rawfile.close()
+
+
+class CollectionCSV(BaseCollectionCSV):
+    """CSV collection naming its tarball entries after the compression of its files.
+
+    A collection that was never shipped, or not in the last 4 weeks, exports
+    its whole table, even when other collections of the same gathering only
+    export their changes.
+    """
+
+    def _gather_since(self):
+        since = super()._gather_since()
+        horizon = self.collector.gather_until - timedelta(weeks=4)
+        if self.collector.gather_since is None and (
+            self.last_gathered_entry is None or self.last_gathered_entry < horizon
+        ):
+            return FULL_SYNC_SINCE
+        return since
+
+    def _save_gathering(self, data):
+        super()._save_gathering(data)
+        for collection in [self, *self.sub_collections]:
+            if collection.data_filepath is None:
+                continue
+            for suffix in COMPRESSION_SUFFIXES.values():
+                if suffix and collection.data_filepath.endswith(suffix):
+                    collection.filename = f"{self.key}.{self.data_type}{suffix}"
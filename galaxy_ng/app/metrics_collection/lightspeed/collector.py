@@ -4,9 +4,14 @@ from galaxy_ng.app.metrics_collection.lightspeed.package import Package
 
 
 class Collector(BaseCollector):
-    def __init__(self, collection_type, collector_module, logger):
+    state_name = "lightspeed"
+
+    def __init__(self, collection_type, collector_module, logger, full_sync=False):
         super().__init__(
-            collection_type=collection_type, collector_module=collector_module, logger=logger
+            collection_type=collection_type,
+            collector_module=collector_module,
+            logger=logger,
+            full_sync=full_sync,
         )
 
     @staticmethod
@@ -25,19 +30,3 @@ class Collector(BaseCollector):
 
     def _is_shipping_configured(self):
         return True
-
-    def _last_gathering(self):
-        # doing a full scan database dump
-        return None
-
-    def _load_last_gathered_entries(self):
-        # doing a full scan database dump
-        return {}
-
-    def _save_last_gathered_entries(self, last_gathered_entries):
-        # doing a full scan database dump
-        pass
-
-    def _save_last_gather(self):
-        # doing a full scan database dump
-        pass
@@ -1,8 +1,10 @@
 import os
+from django.conf import settings
 from django.db import connection
 
-from insights_analytics_collector import CsvFileSplitter, register
+from insights_analytics_collector import register
 import galaxy_ng.app.metrics_collection.common_data as data
+from galaxy_ng.app.metrics_collection.csv_collection import CsvFileSplitter
 
 
 @register("config", "1.0", description="General platform configuration.", config=True)
@@ -31,19 +33,20 @@ def instance_info(since, **kwargs):
 
 @register("ansible_collection_table", "1.0", format="csv", description="Data on ansible_collection")
 def ansible_collection_table(since, full_path, until, **kwargs):
-    source_query = """
-        COPY (
+    query, params = data.changed_between(
+        """
             SELECT "ansible_collection"."pulp_id",
                    "ansible_collection"."pulp_created",
                    "ansible_collection"."pulp_last_updated",
                    "ansible_collection"."namespace",
                    "ansible_collection"."name"
             FROM "ansible_collection"
-        )
-        TO STDOUT WITH CSV HEADER
-    """
-
-    return _simple_csv(full_path, "ansible_collection", source_query)
+        """,
+        "pulp_last_updated",
+        since,
+        until,
+    )
+    return _simple_csv(full_path, "ansible_collection", _copy_query(query), params)
 
 
 @register(
@@ -56,7 +59,8 @@ def ansible_collectionversion_table(since, full_path, until, **kwargs):
     # Note: is_highest was moved from CollectionVersion to CrossRepositoryCollectionVersionIndex
     # in pulp_ansible. We join to that table to get the is_highest value.
     # Note: tags is now an ArrayField on CollectionVersion (no longer a separate through table)
-    source_query = """COPY (
+    # Always a full sync: is_highest changes without updating pulp_last_updated.
+    query = """
             SELECT "ansible_collectionversion"."content_ptr_id",
                    "core_content"."pulp_created",
                    "core_content"."pulp_last_updated",
@@ -77,9 +81,8 @@ def ansible_collectionversion_table(since, full_path, until, **kwargs):
                 "ansible_collectionversion"."content_ptr_id" =
                 "ansible_crossrepositorycollectionversionindex"."collection_version_id"
                 )
-        ) TO STDOUT WITH CSV HEADER
-    """
-    return _simple_csv(full_path, "ansible_collectionversion", source_query)
+        """
+    return _simple_csv(full_path, "ansible_collectionversion", _copy_query(query))
 
 
 @register(
@@ -169,20 +172,28 @@ def container_tag_table(since, full_path, until, **kwargs):
     "galaxy_legacynamespace", "1.0", format="csv", description="Data on galaxy_legacynamespace"
 )
 def galaxy_legacynamespace_table(since, full_path, until, **kwargs):
-    source_query = """COPY (SELECT
+    query, params = data.changed_between(
+        """SELECT
             id, created, modified, name, company, avatar_url, description, namespace_id
-            FROM galaxy_legacynamespace
-        ) TO STDOUT WITH CSV HEADER"""
-    return _simple_csv(full_path, "galaxy_legacynamespace", source_query)
+            FROM galaxy_legacynamespace""",
+        "modified",
+        since,
+        until,
+    )
+    return _simple_csv(full_path, "galaxy_legacynamespace", _copy_query(query), params)
 
 
 @register("galaxy_legacyrole", "1.0", format="csv", description="Data on galaxy_legacyrole")
 def galaxy_legacyrole_table(since, full_path, until, **kwargs):
-    source_query = """COPY (SELECT
+    query, params = data.changed_between(
+        """SELECT
             id, created, modified, name, full_metadata, namespace_id
-            FROM galaxy_legacyrole
-        ) TO STDOUT WITH CSV HEADER"""
-    return _simple_csv(full_path, "galaxy_legacyrole", source_query)
+            FROM galaxy_legacyrole""",
+        "modified",
+        since,
+        until,
+    )
+    return _simple_csv(full_path, "galaxy_legacyrole", _copy_query(query), params)
 
 
 @register(
@@ -195,16 +206,24 @@ def galaxy_aiindexdenylist_table(since, full_path, until, **kwargs):
 
 
 def _get_csv_splitter(file_path, max_data_size=209715200):
-    return CsvFileSplitter(filespec=file_path, max_file_size=max_data_size)
+    return CsvFileSplitter(
+        filespec=file_path,
+        max_file_size=max_data_size,
+        compression=settings.GALAXY_METRICS_COLLECTION_CSV_COMPRESSION,
+    )
+
+
+def _copy_query(query):
+    return f"COPY ({query}) TO STDOUT WITH CSV HEADER"
 
 
-def _simple_csv(full_path, file_name, query, max_data_size=209715200):
+def _simple_csv(full_path, file_name, query, params=None, max_data_size=209715200):
     file_path = _get_file_path(full_path, file_name)
     tfile = _get_csv_splitter(file_path, max_data_size)
 
-    with connection.cursor() as cursor, cursor.copy(query) as copy:
+    with connection.cursor() as cursor, cursor.copy(query, params) as copy:
         while data := copy.read():
-            tfile.write(str(data, 'utf8'))
+            tfile.write(data)
 
     return tfile.file_list()
 
@@ -0,0 +1,100 @@
+import logging
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+logger = logging.getLogger(__name__)
+
+
+def build_search_documents(apps, schema_editor):
+    # Uses the live builder querysets, the same code as the
+    # rebuild-search-index management command.
+    # Elidable — will be removed on squashmigrations.
+    from galaxy_ng.app.utils.search import rebuild_search_documents
+
+    try:
+        rebuild_search_documents()
+    except Exception:
+        logger.exception(
+            "Failed to build the search index. "
+            "Run 'django-admin rebuild-search-index' manually."
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("galaxy", "0060_handle_container_image_data"),
+        ("ansible", "0066_collectionremote_sync_highest_versions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "content_type",
+                    models.CharField(
+                        choices=[("collection", "Collection"), ("role", "Role")], max_length=16
+                    ),
+                ),
+                ("namespace_name", models.CharField(max_length=64)),
+                ("name", models.CharField(max_length=64)),
+                ("description_text", models.TextField(null=True)),
+                ("latest_version", models.CharField(max_length=128, null=True)),
+                ("namespace_avatar", models.CharField(max_length=256, null=True)),
+                ("content_list", models.JSONField(default=list)),
+                ("tag_names", models.JSONField(default=list)),
+                ("platform_names", models.JSONField(default=list)),
+                ("deprecated", models.BooleanField(default=False)),
+                ("download_count", models.BigIntegerField(default=0)),
+                ("last_updated", models.DateTimeField(null=True)),
+                ("search", django.contrib.postgres.search.SearchVectorField(null=True)),
+                (
+                    "collection",
+                    models.OneToOneField(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_document",
+                        to="ansible.collection",
+                    ),
+                ),
+                (
+                    "role",
+                    models.OneToOneField(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_document",
+                        to="galaxy.legacyrole",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    django.contrib.postgres.indexes.GinIndex(
+                        fields=["search"], name="galaxy_sear_search_7b6f35_gin"
+                    ),
+                    models.Index(
+                        fields=["content_type", "-download_count"],
+                        name="galaxy_sear_content_8f9701_idx",
+                    ),
+                    models.Index(
+                        fields=["namespace_name", "name"], name="galaxy_sear_namespa_d50ad4_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(
+            build_search_documents,
+            reverse_code=migrations.RunPython.noop,
+            elidable=True,
+        ),
+    ]
@@ -0,0 +1,60 @@
+import django.contrib.postgres.indexes
+import django.db.models.fields.json
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("galaxy", "0061_searchdocument"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="legacynamespace",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"], name="galaxy_legacyns_name_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="legacynamespace",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+                ),
+                name="galaxy_legacyns_uname_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="legacyrole",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"], name="galaxy_legacyrole_name_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="legacyrole",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.fields.json.KeyTextTransform("description", "full_metadata"),
+                    name="gin_trgm_ops",
+                ),
+                name="galaxy_legacyrole_desc_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="legacyrole",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.db.models.fields.json.KeyTransform("tags", "full_metadata"),
+                name="galaxy_legacyrole_tags_gin",
+            ),
+        ),
+        # The indexes are built from the existing rows, gather statistics
+        # on the new expressions so the planner picks them right away.
+        migrations.RunSQL(
+            "ANALYZE galaxy_legacynamespace, galaxy_legacyrole",
+            reverse_sql=migrations.RunSQL.noop,
+            elidable=True,
+        ),
+    ]
@@ -0,0 +1,57 @@
+from django.db import migrations, models
+
+
+def backfill_github_fields(apps, schema_editor):
+    # Also available as the backfill-legacy-role-imports management command.
+    LegacyRoleImport = apps.get_model("galaxy", "LegacyRoleImport")
+
+    batch = []
+    qs = (
+        LegacyRoleImport.objects.filter(github_user__isnull=True)
+        .select_related("task")
+        .only("task_id", "task__enc_kwargs")
+    )
+    for obj in qs.iterator(chunk_size=1000):
+        kwargs = obj.task.enc_kwargs or {}
+        obj.github_user = kwargs.get("github_user")
+        obj.github_repo = kwargs.get("github_repo")
+        obj.github_reference = kwargs.get("github_reference")
+        batch.append(obj)
+        if len(batch) >= 1000:
+            LegacyRoleImport.objects.bulk_update(
+                batch, ["github_user", "github_repo", "github_reference"]
+            )
+            batch = []
+    if batch:
+        LegacyRoleImport.objects.bulk_update(
+            batch, ["github_user", "github_repo", "github_reference"]
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("galaxy", "0062_legacy_role_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="legacyroleimport",
+            name="github_user",
+            field=models.CharField(db_index=True, editable=False, max_length=256, null=True),
+        ),
+        migrations.AddField(
+            model_name="legacyroleimport",
+            name="github_repo",
+            field=models.CharField(db_index=True, editable=False, max_length=256, null=True),
+        ),
+        migrations.AddField(
+            model_name="legacyroleimport",
+            name="github_reference",
+            field=models.CharField(editable=False, max_length=256, null=True),
+        ),
+        migrations.RunPython(
+            backfill_github_fields,
+            reverse_code=migrations.RunPython.noop,
+            elidable=True,
+        ),
+    ]
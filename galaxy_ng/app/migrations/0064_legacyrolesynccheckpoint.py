@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("galaxy", "0063_legacyroleimport_github_fields"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LegacyRoleSyncCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("sync_key", models.CharField(editable=False, max_length=64, unique=True)),
+                ("params", models.JSONField(default=dict, editable=False)),
+                ("page", models.IntegerField(default=0)),
+                ("synced_roles", models.IntegerField(default=0)),
+                ("modified", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
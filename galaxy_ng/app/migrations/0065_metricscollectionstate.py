@@ -0,0 +1,58 @@
+from django.db import migrations, models
+
+# The metrics collectors export the rows changed since their last run,
+# index the timestamps they filter on. Created concurrently so the big
+# download log and content tables aren't locked meanwhile.
+#
+# The download log, content, collection and download count tables are
+# owned by pulpcore and pulp_ansible, their indexes live outside the
+# schema those apps manage. A later upstream migration dropping or
+# rebuilding one of these tables loses its index, it has to be created
+# again by a new migration here (or moved upstream).
+INDEXES = (
+    ("galaxy_downloadlog_created_idx", "ansible_downloadlog", "pulp_created"),
+    ("galaxy_content_last_updated_idx", "core_content", "pulp_last_updated"),
+    ("galaxy_collection_last_updated_idx", "ansible_collection", "pulp_last_updated"),
+    (
+        "galaxy_downloadcount_last_updated_idx",
+        "ansible_collectiondownloadcount",
+        "pulp_last_updated",
+    ),
+    ("galaxy_legacyns_modified_idx", "galaxy_legacynamespace", "modified"),
+    ("galaxy_legacyrole_modified_idx", "galaxy_legacyrole", "modified"),
+)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("galaxy", "0064_legacyrolesynccheckpoint"),
+        # the indexed upstream tables in the shape these migrations leave them
+        ("core", "0145_domainize_import_export"),
+        ("ansible", "0066_collectionremote_sync_highest_versions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MetricsCollectionState",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("collector", models.CharField(max_length=64, unique=True)),
+                ("last_gather", models.DateTimeField(null=True)),
+                ("last_gathered_entries", models.JSONField(default=dict)),
+            ],
+        ),
+        *(
+            migrations.RunSQL(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({column})",
+                reverse_sql=f"DROP INDEX CONCURRENTLY IF EXISTS {name}",
+            )
+            for name, table, column in INDEXES
+        ),
+    ]
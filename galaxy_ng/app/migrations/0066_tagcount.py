@@ -0,0 +1,77 @@
+import logging
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+logger = logging.getLogger(__name__)
+
+
+def build_tag_counts(apps, schema_editor):
+    # Uses the live builder querysets, the same code as the
+    # rebuild-tag-counts management command.
+    # Elidable — will be removed on squashmigrations.
+    from galaxy_ng.app.utils.tags import rebuild_tag_counts
+
+    try:
+        rebuild_tag_counts()
+    except Exception:
+        logger.exception(
+            "Failed to build the tag counts. "
+            "Run 'django-admin rebuild-tag-counts' manually."
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("galaxy", "0065_metricscollectionstate"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TagCount",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "content_type",
+                    models.CharField(
+                        choices=[("collection", "Collection"), ("role", "Role")], max_length=16
+                    ),
+                ),
+                ("name", models.CharField(max_length=64)),
+                ("count", models.IntegerField(default=0)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["content_type", "-count"], name="galaxy_tagc_content_7d90c7_idx"
+                    ),
+                    django.contrib.postgres.indexes.GinIndex(
+                        fields=["name"], name="galaxy_tagcount_name_trgm", opclasses=["gin_trgm_ops"]
+                    ),
+                    django.contrib.postgres.indexes.GinIndex(
+                        django.contrib.postgres.indexes.OpClass(
+                            django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+                        ),
+                        name="galaxy_tagcount_uname_trgm",
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("content_type", "name"), name="galaxy_tagcount_unique_name"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(
+            build_tag_counts,
+            reverse_code=migrations.RunPython.noop,
+            elidable=True,
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations
+
+# The version_range filter of the UI collection versions compiles to
+# predicates on the version components of a collection, see
+# galaxy_ng.app.utils.versions. Created concurrently so the collection
+# versions table isn't locked meanwhile.
+#
+# The collection versions table is owned by pulp_ansible, the index lives
+# outside the schema it manages. A later pulp_ansible migration dropping
+# or rebuilding the table loses the index, it has to be created again by
+# a new migration here (or moved upstream).
+INDEX_NAME = "galaxy_collectionversion_semver_idx"
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("galaxy", "0066_tagcount"),
+        # the indexed table in the shape this migration leaves it
+        ("ansible", "0066_collectionremote_sync_highest_versions"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} ON ansible_collectionversion "
+            "(namespace, name, version_major, version_minor, version_patch)",
+            reverse_sql=f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}",
+        ),
+    ]
@@ -9,9 +9,12 @@ from .container import (
     ContainerRegistryRemote,
     ContainerRegistryRepos,
 )
+from .metrics import MetricsCollectionState
 from .namespace import Namespace, NamespaceLink
 from .organization import Organization, Team
+from .search import SearchDocument
 from .synclist import SyncList
+from .tags import TagCount
 
 __all__ = (
     # aiindex
@@ -26,15 +29,21 @@ __all__ = (
     "ContainerRegistryRepos",
     # auth
     "Group",
+    # metrics
+    "MetricsCollectionState",
     # namespace
     "Namespace",
     "NamespaceLink",
     # organization
     "Organization",
+    # search
+    "SearchDocument",
     # config
     "Setting",
     # synclist
     "SyncList",
+    # tags
+    "TagCount",
     "Team",
     "User",
 )
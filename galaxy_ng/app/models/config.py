@@ -46,6 +46,16 @@ Updating Cache:
 
     Setting.update_cache()
 
+    # Each process keeps a copy of the cache for GALAXY_SETTINGS_LOCAL_CACHE_TTL
+    # seconds (default 5), after that it checks the version key bumped by
+    # every cache update and only re-reads the cache when it changed.
+
+    # Every cache update is also published on the GALAXY_SETTINGS_CHANNEL
+    # Redis channel, each process subscribes to it and refreshes only the
+    # changed keys of its copy, so the copy is kept for up to
+    # GALAXY_SETTINGS_LOCAL_CACHE_MAX_AGE seconds (default 60) instead.
+    # Set GALAXY_SETTINGS_PUBSUB_ENABLED=false to only rely on the version key.
+
 """
 
 import logging
@@ -155,22 +165,26 @@ class Setting(LifecycleModelMixin, models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     @classmethod
-    def update_cache(cls):
-        from galaxy_ng.app.tasks.settings_cache import update_setting_cache  # noqa
+    def update_cache(cls, keys=None):
+        from galaxy_ng.app.tasks.settings_cache import (  # noqa
+            local_db_cache,
+            update_setting_cache,
+        )
 
-        update_setting_cache(cls.as_dict())
+        local_db_cache.clear()
+        update_setting_cache(cls.as_dict(), keys=keys)
 
     @hook(AFTER_CREATE, on_commit=True)
     def _hook_update_create(self):
-        """After create update the whole cache"""
-        self.update_cache()
+        """After create update the cached key"""
+        self.update_cache(keys=[self.key])
         logger.debug(
             "Settings cache updated - create - %s[%s]:%s", self.key, self.version, self.value
         )
 
     @hook(AFTER_DELETE, on_commit=True)
     def _hook_delete_cache(self):
-        self.update_cache()
+        self.update_cache(keys=[self.key])
         logger.debug(
             "Settings cache updated delete - %s[%s]:%s", self.key, self.version, self.value
         )
@@ -259,14 +273,14 @@ class Setting(LifecycleModelMixin, models.Model):
     @transaction.atomic
     def delete_latest_version(cls, key):
         result = cls.objects.filter(key=key).latest("version").delete()
-        cls.update_cache()
+        cls.update_cache(keys=[key])
         return result
 
     @classmethod
     @transaction.atomic
     def delete_all_versions(cls, key):
         result = cls.objects.filter(key=key).delete()
-        cls.update_cache()
+        cls.update_cache(keys=[key])
         return result
 
     def __str__(self):
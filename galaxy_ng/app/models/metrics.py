@@ -0,0 +1,18 @@
+from django.db import models
+
+
+class MetricsCollectionState(models.Model):
+    """Watermarks of the metrics collection exports.
+
+    One row per collector (automation analytics, lightspeed) with the end
+    of its last successful gathering and the end of the last exported
+    interval of each collection, so the next run only exports the rows
+    changed since then.
+    """
+
+    collector = models.CharField(max_length=64, unique=True)
+    last_gather = models.DateTimeField(null=True)
+    last_gathered_entries = models.JSONField(default=dict)
+
+    def __str__(self):
+        return f"{self.collector} last gathered {self.last_gather}"
@@ -0,0 +1,57 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+
+CONTENT_TYPES = (
+    ("collection", "Collection"),
+    ("role", "Role"),
+)
+
+
+class SearchDocument(models.Model):
+    """A precomputed row of the unified collection and role search.
+
+    There is one document per collection, built from its highest
+    distributed version, and one per legacy role. The field names
+    match the values the /_ui/v1/search/ endpoint returns so the view
+    can filter and sort this table directly.
+
+    Documents are refreshed from signal handlers when collections are
+    imported or deprecated, when download counts change and when roles
+    are saved. The `rebuild-search-index` management command rebuilds
+    the whole table.
+    """
+
+    content_type = models.CharField(choices=CONTENT_TYPES, max_length=16)
+    collection = models.OneToOneField(
+        "ansible.Collection",
+        null=True,
+        on_delete=models.CASCADE,
+        related_name="search_document",
+    )
+    role = models.OneToOneField(
+        "galaxy.LegacyRole",
+        null=True,
+        on_delete=models.CASCADE,
+        related_name="search_document",
+    )
+
+    namespace_name = models.CharField(max_length=64)
+    name = models.CharField(max_length=64)
+    description_text = models.TextField(null=True)
+    latest_version = models.CharField(max_length=128, null=True)
+    namespace_avatar = models.CharField(max_length=256, null=True)
+    content_list = models.JSONField(default=list)
+    tag_names = models.JSONField(default=list)
+    platform_names = models.JSONField(default=list)
+    deprecated = models.BooleanField(default=False)
+    download_count = models.BigIntegerField(default=0)
+    last_updated = models.DateTimeField(null=True)
+    search = SearchVectorField(null=True)
+
+    class Meta:
+        indexes = (
+            GinIndex(fields=["search"]),
+            models.Index(fields=["content_type", "-download_count"]),
+            models.Index(fields=["namespace_name", "name"]),
+        )
@@ -0,0 +1,40 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import models
+from django.db.models.functions import Upper
+
+from galaxy_ng.app.models.search import CONTENT_TYPES
+
+
+class TagCount(models.Model):
+    """A precomputed tag of the /_ui/v1/tags/collections/ and /_ui/v1/tags/roles/ lists.
+
+    Collection tags count the highest distributed collection versions using
+    them, role tags count the legacy roles linked to them.
+
+    Counts are refreshed from signal handlers when collection versions are
+    added to or removed from repositories and when role tags change. The
+    `rebuild-tag-counts` management command rebuilds the whole table.
+    """
+
+    content_type = models.CharField(choices=CONTENT_TYPES, max_length=16)
+    name = models.CharField(max_length=64)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=["content_type", "name"], name="galaxy_tagcount_unique_name"
+            ),
+        )
+        indexes = (
+            models.Index(fields=["content_type", "-count"]),
+            GinIndex(
+                fields=["name"], name="galaxy_tagcount_name_trgm", opclasses=["gin_trgm_ops"]
+            ),
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"), name="galaxy_tagcount_uname_trgm"
+            ),
+        )
+
+    def __str__(self):
+        return f"{self.content_type} tag {self.name} ({self.count})"
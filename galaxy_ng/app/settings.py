@@ -446,6 +446,14 @@ AUTHENTICATION_BACKEND_PRESETS_DATA = {
 # Enable the api/$PREFIX/v1 api for legacy roles.
 GALAXY_ENABLE_LEGACY_ROLES = False
 
+# Crawling of an upstream galaxy by the sync commands and legacy role syncs:
+# number of concurrent fetches, requests per second per host (0 disables
+# the limit), and initial and maximum seconds of the retry backoff
+GALAXY_UPSTREAM_FETCH_WORKERS = 8
+GALAXY_UPSTREAM_RATE_LIMIT = 20
+GALAXY_UPSTREAM_BACKOFF = 1
+GALAXY_UPSTREAM_MAX_BACKOFF = 60
+
 SOCIAL_AUTH_GITHUB_BASE_URL = os.environ.get('SOCIAL_AUTH_GITHUB_BASE_URL', 'https://github.com')
 SOCIAL_AUTH_GITHUB_API_URL = os.environ.get('SOCIAL_AUTH_GITHUB_API_URL', 'https://api.github.com')
 SOCIAL_AUTH_GITHUB_KEY = os.environ.get('SOCIAL_AUTH_GITHUB_KEY')
@@ -474,11 +482,38 @@ GALAXY_METRICS_COLLECTION_REDHAT_USERNAME = None
 GALAXY_METRICS_COLLECTION_REDHAT_PASSWORD = None
 # RH account's org id (required for x-rh-identity auth type)
 GALAXY_METRICS_COLLECTION_ORG_ID = None
+# Compression of the exported CSV files: None, "gzip" or "zstd" (needs zstandard)
+GALAXY_METRICS_COLLECTION_CSV_COMPRESSION = None
+
+# Size in bytes of the container config blobs parsed and cached by each process,
+# the least recently used blobs are evicted first
+GALAXY_CONFIG_BLOB_CACHE_MAX_SIZE = 32 * 1024 * 1024
+
+# Seconds the container config blobs are kept in redis, shared between processes
+GALAXY_CONFIG_BLOB_CACHE_TTL = 60 * 60 * 24
+
+# Number of container repositories of a registry synced at the same time
+GALAXY_CONTAINER_REGISTRY_SYNC_CONCURRENCY = 4
+
+# Number of catalog entries indexed at once when indexing a container registry
+GALAXY_CONTAINER_INDEX_BATCH_SIZE = 100
 
 # When set to True will enable the DYNAMIC settings feature
 # Individual allowed dynamic keys are set on ./dynamic_settings.py
 GALAXY_DYNAMIC_SETTINGS = False
 
+# Seconds each process keeps its copy of the dynamic settings when it can't
+# be notified of their changes, or when they are read from the database
+GALAXY_SETTINGS_LOCAL_CACHE_TTL = 5
+
+# Publish the dynamic settings changes through redis pub/sub, so each process
+# refreshes only the changed keys
+GALAXY_SETTINGS_PUBSUB_ENABLED = True
+
+# Seconds each process keeps its copy of the dynamic settings while it is
+# notified of their changes, in case a notification is missed
+GALAXY_SETTINGS_LOCAL_CACHE_MAX_AGE = 60
+
 # DJANGO ANSIBLE BASE RESOURCES REGISTRY SETTINGS
 ANSIBLE_BASE_RESOURCE_CONFIG_MODULE = "galaxy_ng.app.api.resource_api"
 ANSIBLE_BASE_ORGANIZATION_MODEL = "galaxy.Organization"
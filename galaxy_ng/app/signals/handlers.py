@@ -11,22 +11,31 @@ import logging
 from django.dispatch import receiver
 from django.db.models.signals import post_save
 from django.db.models.signals import post_delete
+from django.db.models.signals import pre_delete
 from django.db.models.signals import m2m_changed
 from django.db.models import CharField, Value
 from django.db.models.functions import Concat
 from django.contrib.auth.models import Group
 from django.conf import settings
+from django.core.cache import cache
 from rest_framework.exceptions import ValidationError
 from django.apps import apps
 from django.utils.translation import gettext_lazy as _
 from pulp_ansible.app.models import (
+    AnsibleCollectionDeprecated,
     AnsibleDistribution,
     AnsibleRepository,
     Collection,
+    CollectionDownloadCount,
+    CollectionVersion,
     AnsibleNamespaceMetadata,
+    CrossRepositoryCollectionVersionIndex,
 )
-from galaxy_ng.app.constants import ROLE_DESCRIPTION
+from galaxy_ng.app.api.v1.models import LegacyRole, LegacyRoleDownloadCount, LegacyRoleTag
+from galaxy_ng.app.constants import LANDING_PAGE_COUNTS_CACHE_KEY, ROLE_DESCRIPTION
 from galaxy_ng.app.models import Namespace, User, Team
+from galaxy_ng.app.utils import search as search_index
+from galaxy_ng.app.utils import tags as tag_counts
 from galaxy_ng.app.migrations._dab_rbac import copy_roles_to_role_definitions
 from pulpcore.plugin.models import ContentRedirectContentGuard
 
@@ -119,6 +128,110 @@ def associate_namespace_metadata(sender, instance, created, **kwargs):
         _update_metadata()
 
 
+# ___ SEARCH INDEX ___
+
+@receiver(post_save, sender=CrossRepositoryCollectionVersionIndex)
+@receiver(post_delete, sender=CrossRepositoryCollectionVersionIndex)
+def refresh_search_document_on_index_change(sender, instance, **kwargs):
+    """The highest version of a collection may have changed."""
+    search_index.schedule_search_document_refresh(
+        collection_version_ids=[instance.collection_version_id]
+    )
+
+
+@receiver(post_delete, sender=CollectionVersion)
+def refresh_search_document_on_collection_version_delete(sender, instance, **kwargs):
+    search_index.schedule_search_document_refresh(
+        collections=[(instance.namespace, instance.name)]
+    )
+
+
+@receiver(post_save, sender=AnsibleCollectionDeprecated)
+@receiver(post_delete, sender=AnsibleCollectionDeprecated)
+def refresh_search_document_on_deprecation(sender, instance, **kwargs):
+    search_index.schedule_search_document_refresh(
+        collections=[(instance.namespace, instance.name)]
+    )
+
+
+@receiver(post_save, sender=CollectionDownloadCount)
+def update_search_document_collection_download_count(sender, instance, **kwargs):
+    search_index.update_collection_download_count(instance.namespace, instance.name)
+
+
+@receiver(post_save, sender=LegacyRole)
+def refresh_search_document_on_role_save(sender, instance, **kwargs):
+    search_index.schedule_search_document_refresh(roles=[instance.pk])
+
+
+@receiver(post_save, sender=LegacyRoleDownloadCount)
+def update_search_document_role_download_count(sender, instance, **kwargs):
+    search_index.update_role_download_count(instance.legacyrole_id, instance.count)
+
+
+@receiver(post_save, sender=Namespace)
+def update_search_document_namespace_avatar(sender, instance, **kwargs):
+    search_index.update_namespace_avatar(instance)
+
+
+@receiver(post_save, sender=Namespace)
+@receiver(post_delete, sender=Namespace)
+def invalidate_landing_page_counts(sender, instance, created=True, **kwargs):
+    """Drop the landing page counts cached by this process, see get_landing_page_counts()."""
+    if created:
+        cache.delete(LANDING_PAGE_COUNTS_CACHE_KEY)
+
+
+# ___ TAG COUNTS ___
+
+@receiver(post_save, sender=CrossRepositoryCollectionVersionIndex)
+@receiver(post_delete, sender=CrossRepositoryCollectionVersionIndex)
+def refresh_tag_counts_on_index_change(sender, instance, **kwargs):
+    """A version was added to or removed from a repository, or stopped being the highest."""
+    tag_counts.schedule_tag_count_refresh(
+        collection_version_ids=[instance.collection_version_id]
+    )
+
+
+@receiver(post_delete, sender=CollectionVersion)
+def refresh_tag_counts_on_collection_version_delete(sender, instance, **kwargs):
+    tag_counts.schedule_tag_count_refresh(collection_tags=instance.tags or [])
+
+
+@receiver(m2m_changed, sender=LegacyRole.tags.through)
+def refresh_tag_counts_on_role_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if reverse:
+        # the roles of a tag changed, e.g. tag.legacyrole.add(role)
+        tag_ids = [instance.pk]
+    elif action == "pre_clear":
+        tag_ids = list(instance.tags.values_list("pk", flat=True))
+    else:
+        tag_ids = pk_set
+    tag_counts.schedule_tag_count_refresh(role_tag_ids=tag_ids)
+
+
+@receiver(pre_delete, sender=LegacyRole)
+def refresh_tag_counts_on_role_delete(sender, instance, **kwargs):
+    tag_counts.schedule_tag_count_refresh(
+        role_tag_ids=list(instance.tags.values_list("pk", flat=True))
+    )
+
+
+@receiver(post_save, sender=LegacyRoleTag)
+def refresh_tag_counts_on_role_tag_create(sender, instance, created, **kwargs):
+    """List new tags with a count of 0 until a role uses them."""
+    if created:
+        tag_counts.schedule_tag_count_refresh(role_tags=[instance.name])
+
+
+@receiver(post_delete, sender=LegacyRoleTag)
+def refresh_tag_counts_on_role_tag_delete(sender, instance, **kwargs):
+    tag_counts.schedule_tag_count_refresh(role_tags=[instance.name])
+
+
 # ___ DAB RBAC ___
 
 # These roles should NOT sync to Pulp
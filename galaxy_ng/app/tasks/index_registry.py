@@ -3,6 +3,7 @@ import logging
 from urllib.parse import quote, urlencode
 
 from django.core import exceptions
+from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 from django.http.request import HttpRequest
 
@@ -21,6 +22,8 @@ log = logging.getLogger(__name__)
 
 CATALOG_API = "https://catalog.redhat.com/api/containers/v1/repositories"
 
+DEFAULT_INDEX_BATCH_SIZE = 100
+
 
 class CouldNotCreateContainerError(Exception):
     def __init__(self, remote_name, error=""):
@@ -30,6 +33,15 @@ class CouldNotCreateContainerError(Exception):
         super().__init__(self.message)
 
 
+class CouldNotIndexContainersError(Exception):
+    def __init__(self, errors):
+        self.errors = errors
+        self.message = _("Failed to index {count} containers. {errors}").format(
+            count=len(errors), errors=" ".join(str(error) for error in errors)
+        )
+        super().__init__(self.message)
+
+
 def _get_request(request_data):
     request = HttpRequest()
 
@@ -62,6 +74,29 @@ def _update_distro_readme_and_description(distro, container_data):
     distro.save()
 
 
+def _create_remote_container(container_data, registry_pk, request):
+    """Create the remote, repository and distribution of a container, returns the distribution."""
+    serializer = serializers.ContainerRemoteSerializer(
+        data={
+            "name": container_data['name'],
+            "upstream_name": container_data['name'],
+            "registry": str(registry_pk)
+        }, context={"request": request}
+    )
+
+    try:
+        serializer.is_valid(raise_exception=True)
+    except ValidationError as e:
+        raise CouldNotCreateContainerError(
+            container_data['name'],
+            error=str(e)
+        )
+    serializer.create(serializer.validated_data)
+
+    return container_models.ContainerDistribution.objects.get(
+        base_path=container_data['name'])
+
+
 def create_or_update_remote_container(container_data, registry_pk, request_data):
     # check if a distro matching the base name exists
     remote_repo_type = container_models.ContainerRepository.get_pulp_type()
@@ -100,30 +135,121 @@ def create_or_update_remote_container(container_data, registry_pk, request_data)
     except exceptions.ObjectDoesNotExist:
         # If no distributions match the selected container, create one.
         request = _get_request(request_data)
-        serializer = serializers.ContainerRemoteSerializer(
-            data={
-                "name": container_data['name'],
-                "upstream_name": container_data['name'],
-                "registry": str(registry_pk)
-            }, context={"request": request}
-        )
+        distro = _create_remote_container(container_data, registry_pk, request)
 
+        _update_distro_readme_and_description(distro, container_data)
+
+
+def _bulk_update_distro_readmes_and_descriptions(distros_and_data):
+    """Same as _update_distro_readme_and_description for many distributions in two queries."""
+    models.ContainerDistroReadme.objects.bulk_create(
+        [
+            models.ContainerDistroReadme(container=distro, text=container_data['readme'])
+            for distro, container_data in distros_and_data
+        ],
+        update_conflicts=True,
+        unique_fields=["container"],
+        update_fields=["text", "updated"],
+    )
+
+    distros = []
+    for distro, container_data in distros_and_data:
+        distro.description = container_data['description']
+        distros.append(distro)
+    container_models.ContainerDistribution.objects.bulk_update(distros, ["description"])
+
+
+def _index_error(errors, container_data, error):
+    if not isinstance(error, CouldNotCreateContainerError):
+        error = CouldNotCreateContainerError(container_data['name'], error=str(error))
+    log.error(error.message)
+    errors.append(error.message)
+
+
+def index_remote_containers(containers, registry_pk, request):
+    """Create or update the remote containers of a chunk of catalog entries.
+
+    Behaves like create_or_update_remote_container for each entry. The existing
+    distributions and their registries are resolved with two queries, and the
+    readmes and descriptions are written in bulk. Each container is created in
+    its own savepoint and the errors of each entry are returned instead of
+    raised, so one bad container doesn't fail the others.
+    """
+    remote_repo_type = container_models.ContainerRepository.get_pulp_type()
+
+    distros = {
+        distro.base_path: distro
+        for distro in container_models.ContainerDistribution.objects.filter(
+            base_path__in=[container_data['name'] for container_data in containers]
+        ).select_related("repository")
+    }
+    remote_registries = dict(
+        models.ContainerRegistryRepos.objects.filter(
+            repository_remote__in=[
+                distro.repository.remote_id
+                for distro in distros.values()
+                if distro.repository and distro.repository.remote_id
+            ]
+        ).values_list("repository_remote", "registry")
+    )
+
+    to_update = []
+    errors = []
+    for container_data in containers:
+        distro = distros.get(container_data['name'])
         try:
-            serializer.is_valid(raise_exception=True)
-        except ValidationError as e:
-            raise CouldNotCreateContainerError(
-                container_data['name'],
-                error=str(e)
-            )
-        serializer.create(serializer.validated_data)
+            if distro is None:
+                with transaction.atomic():
+                    distro = _create_remote_container(container_data, registry_pk, request)
+            else:
+                repo = distro.repository
+                if (
+                    repo is None
+                    or repo.pulp_type != remote_repo_type
+                    or repo.remote_id is None
+                ):
+                    raise CouldNotCreateContainerError(
+                        container_data['name'],
+                        error=_("A local container with this name already exists.")
+                    )
+                if repo.remote_id not in remote_registries:
+                    raise CouldNotCreateContainerError(
+                        container_data['name'],
+                        error=_(
+                            "A remote container with this name already exists, "
+                            "but is not associated with any registry.")
+                    )
+                # containers of other registries are left untouched
+                if remote_registries[repo.remote_id] != registry_pk:
+                    continue
+        except Exception as e:
+            _index_error(errors, container_data, e)
+            continue
+
+        to_update.append((distro, container_data))
 
-        distro = container_models.ContainerDistribution.objects.get(
-            base_path=container_data['name'])
+    try:
+        with transaction.atomic():
+            _bulk_update_distro_readmes_and_descriptions(to_update)
+    except Exception:
+        # find the failing entries, the others still get their readme
+        for distro, container_data in to_update:
+            try:
+                with transaction.atomic():
+                    _update_distro_readme_and_description(distro, container_data)
+            except Exception as e:
+                _index_error(errors, container_data, e)
+    return errors
 
-        _update_distro_readme_and_description(distro, container_data)
 
+def index_execution_environments_from_redhat_registry(registry_pk, request_data, batch_size=None):
+    """Index the execution environments of the Red Hat catalog.
 
-def index_execution_environments_from_redhat_registry(registry_pk, request_data):
+    By default each catalog entry is created or updated by its own task. With
+    a batch_size, the entries are indexed in chunks of batch_size by this task,
+    which must then be dispatched with the "/api/v3/distributions/" exclusive
+    resource. The errors of all the entries are raised at the end.
+    """
     registry = models.ContainerRegistryRemote.objects.get(pk=registry_pk)
     remotes = []
 
@@ -150,6 +276,18 @@ def index_execution_environments_from_redhat_registry(registry_pk, request_data)
             else:
                 break
 
+    if batch_size:
+        request = _get_request(request_data)
+        errors = []
+        for start in range(0, len(remotes), batch_size):
+            errors += index_remote_containers(
+                remotes[start:start + batch_size], registry.pk, request
+            )
+        log.info(f"Indexed {len(remotes) - len(errors)} of {len(remotes)} containers")
+        if errors:
+            raise CouldNotIndexContainersError(errors)
+        return
+
     for remote in remotes:
         # create a subtask for each remote, so that if one fails, we can throw a usable error
         # message for the user to look at and prevent the rest of the repositories from failing.
@@ -12,7 +12,7 @@ SIGNING_SERVICE_NAME = getattr(settings, "GALAXY_COLLECTION_SIGNING_SERVICE", "a
 AUTO_SIGN = getattr(settings, "GALAXY_AUTO_SIGN_COLLECTIONS", False)
 
 
-def auto_approve(src_repo_pk, cv_pk, ns_pk=None):
+def auto_approve(src_repo_pk, cv_pk=None, ns_pk=None, cv_pk_list=None, ns_pk_list=None):
     published_repos = AnsibleRepository.objects.filter(pulp_labels__pipeline="approved")
     published_pks = list(published_repos.values_list("pk", flat=True))
 
@@ -21,9 +21,13 @@ def auto_approve(src_repo_pk, cv_pk, ns_pk=None):
 
     source_repo = AnsibleRepository.objects.get(pk=src_repo_pk)
 
-    add = [cv_pk]
+    # a batch of collection versions imported together is approved at once,
+    # creating a single repository version
+    cv_pks = list(cv_pk_list) if cv_pk_list else [cv_pk]
+    add = list(cv_pks)
     if ns_pk:
         add.append(ns_pk)
+    add.extend(ns_pk_list or [])
 
     add_and_remove(
         src_repo_pk,
@@ -40,7 +44,7 @@ def auto_approve(src_repo_pk, cv_pk, ns_pk=None):
     if AUTO_SIGN:
         sign(
             repository_href=source_repo,
-            content_hrefs=[cv_pk],
+            content_hrefs=cv_pks,
             signing_service_href=signing_service.pk
         )
 
@@ -53,7 +57,7 @@ def auto_approve(src_repo_pk, cv_pk, ns_pk=None):
             exclusive_resources=published_repos,
             shared_resources=[source_repo],
             kwargs={
-                "cv_pk_list": [cv_pk],
+                "cv_pk_list": cv_pks,
                 "src_repo_pk": source_repo.pk,
                 "dest_repo_list": published_pks,
             }
@@ -64,6 +68,15 @@ def call_auto_approve_task(collection_version, repo, ns_pk):
     """
     Dispatches the auto approve task
     """
+    return call_auto_approve_batch_task(
+        [collection_version], repo, [ns_pk] if ns_pk is not None else []
+    )
+
+
+def call_auto_approve_batch_task(collection_versions, repo, ns_pks):
+    """
+    Dispatches a single auto approve task for several collection versions
+    """
     task_group = TaskGroup.current()
 
     auto_approve_task = dispatch(
@@ -71,9 +84,9 @@ def call_auto_approve_task(collection_version, repo, ns_pk):
         exclusive_resources=[repo],
         task_group=task_group,
         kwargs={
-            'cv_pk': collection_version.pk,
+            'cv_pk_list': [collection_version.pk for collection_version in collection_versions],
             'src_repo_pk': repo.pk,
-            'ns_pk': ns_pk,
+            'ns_pk_list': list(ns_pks),
         },
     )
 
@@ -10,7 +10,7 @@ from pulpcore.plugin.models import Task
 
 from galaxy_ng.app.models import Namespace
 
-from .promotion import call_auto_approve_task
+from .promotion import call_auto_approve_batch_task
 
 log = logging.getLogger(__name__)
 
@@ -24,14 +24,15 @@ def get_created_collection_versions():
     created_resources = current_task.created_resources.filter(
         content_type_id=ContentType.objects.get_for_model(CollectionVersion))
 
-    # TODO(alikins): replace with values_list
-    created_collection_versions = []
-    for created_resource in created_resources:
-        collection_version = created_resource.content_object
+    return list(CollectionVersion.objects.filter(pk__in=created_resources.values("object_id")))
 
-        created_collection_versions.append(collection_version)
 
-    return created_collection_versions
+def get_namespace_metadata_pks(collection_versions):
+    """Map each namespace name to the pk of its latest metadata content, with one query."""
+    names = {collection_version.namespace for collection_version in collection_versions}
+    return dict(
+        Namespace.objects.filter(name__in=names).values_list("name", "last_created_pulp_metadata")
+    )
 
 
 def _upload_collection(**kwargs):
@@ -78,23 +79,25 @@ def import_to_staging(username, **kwargs):
     repo = _upload_collection(**kwargs)
 
     created_collection_versions = get_created_collection_versions()
+    if not created_collection_versions:
+        return
+
+    # add everything in a single task so the batch creates one repository version
+    ns_pks = get_namespace_metadata_pks(created_collection_versions)
+    add = [collection_version.pk for collection_version in created_collection_versions]
+    add.extend(pk for pk in set(ns_pks.values()) if pk)
+    dispatch(
+        add_and_remove,
+        exclusive_resources=[repo],
+        kwargs={
+            "add_content_units": add,
+            "repository_pk": repo.pk,
+            "remove_content_units": []
+        },
+    )
 
-    for collection_version in created_collection_versions:
-        add = [collection_version.pk]
-        ns = Namespace.objects.get(name=collection_version.namespace)
-        if ns.last_created_pulp_metadata:
-            add.append(ns.last_created_pulp_metadata.pk)
-        dispatch(
-            add_and_remove,
-            exclusive_resources=[repo],
-            kwargs={
-                "add_content_units": add,
-                "repository_pk": repo.pk,
-                "remove_content_units": []
-            },
-        )
-
-        if settings.GALAXY_ENABLE_API_ACCESS_LOG:
+    if settings.GALAXY_ENABLE_API_ACCESS_LOG:
+        for collection_version in created_collection_versions:
             _log_collection_upload(
                 username,
                 collection_version.namespace,
@@ -115,15 +118,18 @@ def import_and_auto_approve(username, **kwargs):
     repo = _upload_collection(**kwargs)
 
     created_collection_versions = get_created_collection_versions()
+    if not created_collection_versions:
+        return
+
+    ns_pks = get_namespace_metadata_pks(created_collection_versions)
+    call_auto_approve_batch_task(
+        created_collection_versions,
+        repo,
+        [pk for pk in set(ns_pks.values()) if pk],
+    )
 
-    for collection_version in created_collection_versions:
-        ns = Namespace.objects.get(name=collection_version.namespace)
-        ns_pk = None
-        if ns.last_created_pulp_metadata:
-            ns_pk = ns.last_created_pulp_metadata.pk
-        call_auto_approve_task(collection_version, repo, ns_pk)
-
-        if settings.GALAXY_ENABLE_API_ACCESS_LOG:
+    if settings.GALAXY_ENABLE_API_ACCESS_LOG:
+        for collection_version in created_collection_versions:
             _log_collection_upload(
                 username,
                 collection_version.namespace,
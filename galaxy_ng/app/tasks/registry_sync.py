@@ -1,19 +1,43 @@
+import logging
+from collections import defaultdict
 
+from django.conf import settings
+from pulp_container.app import models as container_models
 from pulp_container.app.tasks.synchronize import synchronize as container_sync
+from pulpcore.plugin.constants import TASK_STATES
+from pulpcore.plugin.models import ProgressReport, Task
 from pulpcore.plugin.tasking import dispatch
 
 from galaxy_ng.app import models
+from galaxy_ng.app.api.utils import prefetch_last_sync_tasks
 
+log = logging.getLogger(__name__)
 
-def launch_container_remote_sync(remote, registry, repository):
+DEFAULT_SYNC_CONCURRENCY = 4
+
+INCOMPLETE_TASK_STATES = (TASK_STATES.WAITING, TASK_STATES.RUNNING, TASK_STATES.CANCELING)
+
+
+def update_remote_connection_fields(remote, registry):
+    """Copy the connection fields of the registry to the remote, saving only what changed."""
+    changed = []
     for key, value in registry.get_connection_fields().items():
-        setattr(remote, key, value)
-        remote.save()
+        if getattr(remote, key) != value:
+            setattr(remote, key, value)
+            changed.append(key)
+
+    if changed:
+        remote.save(update_fields=changed)
+    return changed
+
+
+def launch_container_remote_sync(remote, registry, repository, exclusive_resources=None):
+    update_remote_connection_fields(remote, registry)
 
     return dispatch(
         container_sync,
         shared_resources=[remote],
-        exclusive_resources=[repository],
+        exclusive_resources=[repository, *(exclusive_resources or [])],
         kwargs={
             "remote_pk": str(remote.pk),
             "repository_pk": str(repository.pk),
@@ -23,11 +47,88 @@ def launch_container_remote_sync(remote, registry, repository):
     )
 
 
+def _syncing_repository_pks(repositories):
+    """Returns the pks of the repositories with a waiting or running sync task."""
+    records = Task.objects.filter(
+        state__in=INCOMPLETE_TASK_STATES,
+        name=f"{container_sync.__module__}.{container_sync.__name__}",
+    ).values_list("reserved_resources_record", flat=True)
+    reserved = " ".join(" ".join(record or []) for record in records)
+    return {repo.pk for repo in repositories if str(repo.pk) in reserved}
+
+
+def _staleness_key(remote):
+    """Remotes never synced come first, then the ones synced the longest time ago."""
+    task = remote._prefetched_last_sync_task
+    if task is None:
+        return (0, None)
+    return (1, task.finished_at or task.pulp_created)
+
+
+def _sync_slot(registry, index, concurrency):
+    return f"galaxy:container-registry:{registry.pk}:sync-slot-{index % concurrency}"
+
+
+def _record_summary(summary):
+    """Expose the summary as progress reports of the current task."""
+    if Task.current() is None:
+        return
+    for key, code, message in (
+        ("dispatched", "sync.dispatched", "Dispatched container repository syncs"),
+        ("skipped", "sync.skipped", "Skipped container repositories already syncing"),
+    ):
+        count = summary[key]
+        ProgressReport(
+            message=message, code=code, state=TASK_STATES.COMPLETED, total=count, done=count
+        ).save()
+
+
 def sync_all_repos_in_registry(registry_pk):
+    """Dispatch a sync of every repository indexed from a registry.
+
+    Repositories with a sync already waiting or running are skipped. The others
+    are dispatched from the least recently synced. Each sync also reserves one
+    of GALAXY_CONTAINER_REGISTRY_SYNC_CONCURRENCY slot resources of the
+    registry, so the tasking system runs at most that many of them at once.
+
+    Returns a summary of the dispatched and skipped repositories.
+    """
     registry = models.ContainerRegistryRemote.objects.get(pk=registry_pk)
-    for remote_rel in models.ContainerRegistryRepos.objects.filter(registry=registry).all():
-        remote = remote_rel.repository_remote
+    concurrency = max(
+        settings.get("GALAXY_CONTAINER_REGISTRY_SYNC_CONCURRENCY", DEFAULT_SYNC_CONCURRENCY), 1
+    )
+
+    remotes = [
+        remote_rel.repository_remote
+        for remote_rel in models.ContainerRegistryRepos.objects.filter(
+            registry=registry
+        ).select_related("repository_remote")
+    ]
+    prefetch_last_sync_tasks(remotes)
+    remotes.sort(key=_staleness_key)
 
-        for repo in remote.repository_set.all():
-            repo.cast()
-            launch_container_remote_sync(remote, registry, repo)
+    repositories = defaultdict(list)
+    for repo in container_models.ContainerRepository.objects.filter(remote__in=remotes):
+        repositories[repo.remote_id].append(repo)
+    syncing = _syncing_repository_pks(
+        [repo for repos in repositories.values() for repo in repos]
+    )
+
+    summary = {"dispatched": 0, "skipped": 0, "concurrency": concurrency}
+    for remote in remotes:
+        for repo in repositories[remote.pk]:
+            if repo.pk in syncing:
+                log.info(f"Skipping sync of {repo.name}, a sync is already in progress")
+                summary["skipped"] += 1
+                continue
+
+            slot = _sync_slot(registry, summary["dispatched"], concurrency)
+            launch_container_remote_sync(remote, registry, repo, exclusive_resources=[slot])
+            summary["dispatched"] += 1
+
+    log.info(
+        f"Registry {registry.name} sync: dispatched {summary['dispatched']} repositories, "
+        f"skipped {summary['skipped']} already syncing, at most {concurrency} at once"
+    )
+    _record_summary(summary)
+    return summary
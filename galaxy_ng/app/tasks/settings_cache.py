@@ -1,21 +1,31 @@
 """
 Tasks related to the settings cache management.
 """
+import json
 import logging
+import os
+import threading
+import time
 import redis
 
-from functools import wraps
+from functools import partial, wraps
 from typing import Any, Callable, Optional
 from uuid import uuid4
 
 from django.conf import settings
+from django.db.models import Count, Max
 
+from galaxy_ng.app.common import metrics
 from galaxy_ng.app.models.config import Setting
 from django.db.utils import OperationalError
 
 logger = logging.getLogger(__name__)
 _conn = None
 CACHE_KEY = "GALAXY_SETTINGS_DATA"
+VERSION_KEY = "GALAXY_SETTINGS_VERSION"
+CHANNEL = "GALAXY_SETTINGS_CHANNEL"
+# incremental writes attempted before falling back to a full rewrite
+UPDATE_RETRIES = 3
 
 
 def get_redis_connection():
@@ -109,34 +119,274 @@ def release_lock(lock_name: str, token: str):
 
 
 @connection_error_wrapper
-def update_setting_cache(data: dict[str, Any]) -> int:
+def update_setting_cache(data: dict[str, Any], keys: list[str] | None = None) -> int:
     """Takes a python dictionary and write to Redis
-    as a hashmap using Redis connection"""
+    as a hashmap using Redis connection.
+
+    When `keys` is given and the hash exists only those keys are written
+    (or removed when missing from `data`), otherwise the whole hash is rewritten.
+    The hash is WATCHed while checking that it exists, so if it expires or
+    is replaced before the write the transaction is retried, and after
+    `UPDATE_RETRIES` attempts the whole hash is rewritten.
+    The change is published on `CHANNEL` so other processes can refresh
+    just the changed keys."""
     if conn is None:
         return 0
 
-    conn.delete(CACHE_KEY)
-    updated = 0
-    if data:
-        updated = conn.hset(CACHE_KEY, mapping=data)
-        conn.expire(CACHE_KEY, settings.get("GALAXY_SETTINGS_EXPIRE", 60 * 60 * 24))
-    return updated
+    attempts = UPDATE_RETRIES
+    with conn.pipeline(transaction=True) as pipe:
+        while True:
+            try:
+                incremental = False
+                if keys is not None and attempts > 0:
+                    pipe.watch(CACHE_KEY)
+                    incremental = bool(pipe.exists(CACHE_KEY))
+
+                # the version is bumped in the same transaction so readers
+                # never see a new version with the old data
+                pipe.multi()
+                if incremental:
+                    lowered = {key.lower() for key in keys}
+                    changed = {
+                        key: value for key, value in data.items() if key.lower() in lowered
+                    }
+                    published_keys = sorted(set(keys) | set(changed))
+                    pipe.hdel(CACHE_KEY, *published_keys)
+                    if changed:
+                        pipe.hset(CACHE_KEY, mapping=changed)
+                else:
+                    published_keys = None
+                    pipe.delete(CACHE_KEY)
+                    if data:
+                        pipe.hset(CACHE_KEY, mapping=data)
+                pipe.expire(CACHE_KEY, settings.get("GALAXY_SETTINGS_EXPIRE", 60 * 60 * 24))
+                pipe.incr(VERSION_KEY)
+                results = pipe.execute()
+                break
+            except redis.WatchError:
+                attempts -= 1
+    local_cache.clear()
+
+    conn.publish(CHANNEL, json.dumps({"version": results[-1], "keys": published_keys}))
+    if incremental:
+        return results[1] if changed else 0
+    return results[1] if data else 0
+
+
+class LocalSettingsCache:
+    """Per process copy of the Redis settings hash.
+
+    Within `ttl` seconds the copy is used as is. Once expired it is
+    revalidated by comparing the version key bumped by `update_setting_cache`
+    with the version the copy was read at, which is a single GET instead
+    of an HGETALL, and only re-read when it changed.
+
+    While a `SettingsInvalidationListener` is running the copy is kept up
+    to date by `apply_change` and the ttl only bounds how long a lost
+    notification can go unnoticed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.data = None
+            self.version = None
+            self.checked_at = 0.0
+
+    def expire(self):
+        """Keep the copy but revalidate it on the next read."""
+        with self._lock:
+            self.checked_at = 0.0
+
+    def get(self, redis_conn, ttl: float) -> dict[str, Any]:
+        now = time.monotonic()
+
+        with self._lock:
+            data, version, checked_at = self.data, self.version, self.checked_at
+
+        if data is not None and now - checked_at < ttl:
+            metrics.dynamic_settings_cache_hits.inc()
+            return data
+
+        if data is not None and version is not None and redis_conn.get(VERSION_KEY) == version:
+            metrics.dynamic_settings_cache_revalidations.inc()
+            with self._lock:
+                self.checked_at = now
+            return data
+
+        metrics.dynamic_settings_cache_misses.inc()
+        pipe = redis_conn.pipeline(transaction=True)
+        pipe.get(VERSION_KEY)
+        pipe.hgetall(CACHE_KEY)
+        version, data = pipe.execute()
+        with self._lock:
+            self.data, self.version, self.checked_at = data, version, now
+        return data
+
+    def apply_change(self, redis_conn, version: int, keys: list[str] | None):
+        """Refresh the changed keys of the copy from the Redis hash.
+
+        Only the change following the version of the copy can be applied,
+        anything else (a full rewrite or a missed notification) expires it.
+        """
+        with self._lock:
+            data, current = self.data, self.version
+
+        if data is None:
+            return
+        if keys is None or current is None or version != int(current) + 1:
+            self.expire()
+            return
+
+        values = redis_conn.hmget(CACHE_KEY, keys) if keys else []
+        data = dict(data)
+        for key, value in zip(keys, values, strict=True):
+            if value is None:
+                data.pop(key, None)
+            else:
+                data[key] = value
+
+        with self._lock:
+            # a concurrent read may have replaced the copy meanwhile
+            if self.version == current:
+                self.data, self.version = data, str(version)
+                self.checked_at = time.monotonic()
+        metrics.dynamic_settings_cache_invalidations.inc()
+
+
+local_cache = LocalSettingsCache()
+
+
+class SettingsInvalidationListener:
+    """Subscribes to `CHANNEL` in a background thread and applies the
+    published changes to the process cache.
+
+    Started lazily on the first read of each process (so it survives forks),
+    and restarted on the next read when the connection is lost.
+    """
+
+    def __init__(self, cache: LocalSettingsCache):
+        self.cache = cache
+        self._lock = threading.Lock()
+        self.thread = None
+        self.pid = None
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.pid == os.getpid() and self.thread.is_alive()
+
+    def start(self, redis_conn) -> bool:
+        """Make sure the listener runs, returns False when it could not be started."""
+        if not settings.get("GALAXY_SETTINGS_PUBSUB_ENABLED", True):
+            return False
+        if self.running:
+            return True
+
+        with self._lock:
+            if self.running:
+                return True
+            try:
+                pubsub = redis_conn.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{CHANNEL: partial(self.handle_message, redis_conn)})
+                self.thread = pubsub.run_in_thread(
+                    sleep_time=1, daemon=True, exception_handler=self.handle_error
+                )
+            except redis.ConnectionError as e:
+                logger.error(f"Could not subscribe to dynamic settings changes: {e}")
+                return False
+            self.pid = os.getpid()
+
+        # changes published before subscribing were missed
+        self.cache.expire()
+        return True
+
+    def stop(self):
+        with self._lock:
+            if self.thread is not None:
+                self.thread.stop()
+                self.thread.join(timeout=5)
+            self.thread = None
+
+    def handle_message(self, redis_conn, message):
+        try:
+            change = json.loads(message["data"])
+            self.cache.apply_change(redis_conn, int(change["version"]), change.get("keys"))
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Invalid dynamic settings notification {message!r}: {e}")
+            self.cache.expire()
+
+    def handle_error(self, e, pubsub, thread):
+        logger.warning(f"Dynamic settings listener stopped: {e}")
+        thread.stop()
+        self.cache.expire()
+
+
+listener = SettingsInvalidationListener(local_cache)
 
 
 @connection_error_wrapper(default=dict)
 def get_settings_from_cache() -> dict[str, Any]:
-    """Reads settings from Redis cache and returns a python dictionary"""
+    """Reads settings from the local or Redis cache and returns a python dictionary"""
     if conn is None:
         return {}
 
-    return conn.hgetall(CACHE_KEY)
+    if listener.start(conn):
+        ttl = settings.get("GALAXY_SETTINGS_LOCAL_CACHE_MAX_AGE", 60)
+    else:
+        ttl = settings.get("GALAXY_SETTINGS_LOCAL_CACHE_TTL", 5)
+    return local_cache.get(conn, ttl)
 
 
-def get_settings_from_db():
-    """Returns the data in the Setting table."""
-    try:
+class LocalDbSettingsCache:
+    """Per process copy of the Setting table, used when there is no Redis.
+
+    Within `ttl` seconds the copy is used as is. Once expired it is
+    revalidated with the highest Setting pk and the number of rows, which
+    change with every created or deleted version (rows are never updated),
+    and only re-read with `Setting.as_dict()` when they changed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.data = None
+            self.version = None
+            self.checked_at = 0.0
+
+    def get(self, ttl: float) -> dict[str, Any]:
+        now = time.monotonic()
+
+        with self._lock:
+            data, version, checked_at = self.data, self.version, self.checked_at
+
+        if data is not None and now - checked_at < ttl:
+            return data
+
+        current = tuple(Setting.objects.aggregate(Max("pk"), Count("pk")).values())
+        if data is not None and current == version:
+            with self._lock:
+                self.checked_at = now
+            return data
+
         data = Setting.as_dict()
+        with self._lock:
+            self.data, self.version, self.checked_at = data, current, now
         return data
+
+
+local_db_cache = LocalDbSettingsCache()
+
+
+def get_settings_from_db():
+    """Returns the data in the Setting table, from the process copy when still current."""
+    try:
+        return local_db_cache.get(settings.get("GALAXY_SETTINGS_LOCAL_CACHE_TTL", 5))
     except OperationalError as exc:
         logger.error("Could not read settings from database: %s", str(exc))
         return {}
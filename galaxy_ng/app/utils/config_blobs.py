@@ -0,0 +1,126 @@
+"""Cache the parsed config blobs of container manifests.
+
+Config blobs are content addressed and never change, so their JSON is cached
+by digest. The parsed JSON is kept by each process in a least recently used
+cache bounded by the size of the blobs (GALAXY_CONFIG_BLOB_CACHE_MAX_SIZE).
+When Redis is configured, the raw blobs are also shared between processes
+there, expiring after GALAXY_CONFIG_BLOB_CACHE_TTL seconds. Only a miss in
+both reads the blob artifact from storage.
+"""
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+
+import redis
+from django.conf import settings
+
+from galaxy_ng.app.common import metrics
+
+log = logging.getLogger(__name__)
+
+CONFIG_BLOB_CACHE_KEY_PREFIX = "galaxy_config_blob"
+DEFAULT_MAX_SIZE = 32 * 1024 * 1024
+DEFAULT_TTL = 60 * 60 * 24
+
+
+class LRUCache:
+    """Thread safe LRU mapping bounded by the total size of its values."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        return self._size
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, size):
+        if size > self.max_size:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[key] = (value, size)
+            self._size += size
+            while self._size > self.max_size:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                metrics.config_blob_cache_evictions.inc()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+local_cache = LRUCache(
+    settings.get("GALAXY_CONFIG_BLOB_CACHE_MAX_SIZE", DEFAULT_MAX_SIZE)
+)
+
+
+def _read_config_blob(config_blob):
+    with config_blob._artifacts.first().file.open() as f:
+        return f.read()
+
+
+def _get_shared(redis_conn, key):
+    if redis_conn is None:
+        return None
+    try:
+        return redis_conn.get(key)
+    except redis.RedisError as e:
+        log.warning(f"Could not read config blob {key} from redis: {e}")
+        return None
+
+
+def _set_shared(redis_conn, key, data):
+    if redis_conn is None:
+        return
+    try:
+        redis_conn.set(key, data, ex=settings.get("GALAXY_CONFIG_BLOB_CACHE_TTL", DEFAULT_TTL))
+    except redis.RedisError as e:
+        log.warning(f"Could not write config blob {key} to redis: {e}")
+
+
+def get_config_blob_json(config_blob):
+    """Returns the parsed JSON of a config blob, reading its artifact only on a cache miss."""
+    digest = config_blob.digest
+
+    config_json = local_cache.get(digest)
+    if config_json is not None:
+        metrics.config_blob_cache_hits.labels(cache="local").inc()
+        return config_json
+
+    # Lazy import, importing the tasks package here would be circular
+    from galaxy_ng.app.tasks.settings_cache import get_redis_connection
+
+    redis_conn = get_redis_connection()
+    key = f"{CONFIG_BLOB_CACHE_KEY_PREFIX}:{digest}"
+    data = _get_shared(redis_conn, key)
+    if data is not None:
+        metrics.config_blob_cache_hits.labels(cache="shared").inc()
+    else:
+        metrics.config_blob_cache_misses.inc()
+        data = _read_config_blob(config_blob)
+        if len(data) <= local_cache.max_size:
+            _set_shared(redis_conn, key, data)
+
+    config_json = json.loads(data)
+    local_cache.set(digest, config_json, len(data))
+    return config_json
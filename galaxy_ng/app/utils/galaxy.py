@@ -1,11 +1,31 @@
 import logging
+import random
 import requests
+import threading
 import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing
 from urllib.parse import urlparse
 
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
 
 logger = logging.getLogger(__name__)
 
+# Defaults for the upstream crawler, overridable with the
+# GALAXY_UPSTREAM_FETCH_WORKERS, GALAXY_UPSTREAM_RATE_LIMIT,
+# GALAXY_UPSTREAM_BACKOFF and GALAXY_UPSTREAM_MAX_BACKOFF settings.
+UPSTREAM_FETCH_WORKERS = 8
+UPSTREAM_RATE_LIMIT = 20  # requests per second per host, 0 disables the limit
+UPSTREAM_BACKOFF = 1
+UPSTREAM_MAX_BACKOFF = 60
+UPSTREAM_TIMEOUT = 60
+
+_session = None
+_session_lock = threading.Lock()
+
 
 def generate_unverified_email(github_id):
     return str(github_id) + '@GALAXY.GITHUB.UNVERIFIED.COM'
@@ -29,25 +49,140 @@ def int_to_uuid(num):
     return uuid
 
 
-def safe_fetch(url):
+def get_session():
+    """A keep-alive session shared by the crawler threads."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            pool_size = settings.get("GALAXY_UPSTREAM_FETCH_WORKERS", UPSTREAM_FETCH_WORKERS)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(pool_size, 1))
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+    return _session
+
+
+class HostRateLimiter:
+    """Spaces out the requests made to each host, across threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    def wait(self, url):
+        rate = settings.get("GALAXY_UPSTREAM_RATE_LIMIT", UPSTREAM_RATE_LIMIT)
+        if not rate:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + 1.0 / rate
+        if slot > now:
+            time.sleep(slot - now)
+
+
+rate_limiter = HostRateLimiter()
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Exponential backoff with full jitter, or the server requested delay."""
+    max_backoff = settings.get("GALAXY_UPSTREAM_MAX_BACKOFF", UPSTREAM_MAX_BACKOFF)
+    if retry_after is not None and retry_after.isdigit():
+        return min(int(retry_after), max_backoff)
+    backoff = settings.get("GALAXY_UPSTREAM_BACKOFF", UPSTREAM_BACKOFF)
+    return random.uniform(0, min(max_backoff, backoff * 2 ** (attempt - 1)))
+
+
+def safe_fetch(url, retries=5):
     rr = None
     counter = 0
     while True:
         counter += 1
+        rate_limiter.wait(url)
         logger.info(f'fetch {url}')
-        rr = requests.get(url)
-        if rr.status_code < 500:
+        try:
+            rr = get_session().get(url, timeout=UPSTREAM_TIMEOUT)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if counter >= retries:
+                raise
+            delay = backoff_delay(counter)
+            logger.info(f'ERROR:{e} waiting {delay:.1f}s to refetch {url}')
+            time.sleep(delay)
+            continue
+
+        if rr.status_code < 500 and rr.status_code != 429:
             return rr
 
-        if counter >= 5:
+        if counter >= retries:
             return rr
 
-        logger.info(f'ERROR:{rr.status_code} waiting 60s to refetch {url}')
-        time.sleep(60)
+        delay = backoff_delay(counter, rr.headers.get('Retry-After'))
+        logger.info(f'ERROR:{rr.status_code} waiting {delay:.1f}s to refetch {url}')
+        time.sleep(delay)
 
     return rr
 
 
+def fetch_concurrently(func, items, workers=None):
+    """Yield func(item) for each item, in order, running up to `workers` calls at once.
+
+    Items are pulled lazily so the source can itself be a paginated crawl,
+    and the pending calls are cancelled when the consumer stops early.
+    """
+    if workers is None:
+        workers = settings.get("GALAXY_UPSTREAM_FETCH_WORKERS", UPSTREAM_FETCH_WORKERS)
+    workers = max(workers, 1)
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upstream-fetch")
+    pending = deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+class PageDone:
+    """Marks the end of an upstream page in a stream of fetched items."""
+
+    def __init__(self, page):
+        self.page = page
+
+
+class FetchOnce:
+    """Thread safe memo making concurrent callers share a single fetch per key.
+
+    Failed fetches are not remembered so the next caller tries again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures = {}
+
+    def get(self, key, func):
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = self._futures[key] = Future()
+
+        if owner:
+            try:
+                future.set_result(func())
+            except Exception as e:
+                with self._lock:
+                    del self._futures[key]
+                future.set_exception(e)
+
+        return future.result()
+
+
 def paginated_results(next_url):
     """Iterate through a paginated query and combine the results."""
     parsed = urlparse(next_url)
@@ -150,6 +285,17 @@ def get_namespace_owners_details(baseurl, ns_id):
     return owners
 
 
+def get_namespace_details(baseurl, ns_id):
+    """Fetch a v1 namespace along with its owners."""
+    logger.info(baseurl + f'/api/v1/namespaces/{ns_id}/')
+    ns_url = baseurl + f'/api/v1/namespaces/{ns_id}/'
+    namespace_data = safe_fetch(ns_url).json()
+
+    # get the owners too
+    namespace_data['summary_fields']['owners'] = get_namespace_owners_details(baseurl, ns_id)
+    return namespace_data
+
+
 def upstream_namespace_iterator(
     baseurl=None,
     limit=None,
@@ -177,32 +323,47 @@ def upstream_namespace_iterator(
         pagenum = start_page
         next_url = next_url + f'?page={pagenum}'
 
-    while next_url:
-        logger.info(f'fetch {pagenum} {next_url}')
+    def namespace_summaries(next_url, pagenum):
+        while next_url:
+            logger.info(f'fetch {pagenum} {next_url}')
 
-        page = safe_fetch(next_url)
+            page = safe_fetch(next_url)
 
-        # Some upstream pages return ISEs for whatever reason.
-        if page.status_code >= 500:
-            if 'page=' in next_url:
-                next_url = next_url.replace(f'page={pagenum}', f'page={pagenum + 1}')
-            else:
-                next_url = next_url.rstrip('/') + '/?page={pagenum + 1}'
-            pagenum += 1
-            continue
+            # Some upstream pages return ISEs for whatever reason.
+            if page.status_code >= 500:
+                if 'page=' in next_url:
+                    next_url = next_url.replace(f'page={pagenum}', f'page={pagenum + 1}')
+                else:
+                    next_url = next_url.rstrip('/') + '/?page={pagenum + 1}'
+                pagenum += 1
+                continue
 
-        ds = page.json()
-        total = ds['count']
+            ds = page.json()
+            total = ds['count']
 
-        for ndata in ds['results']:
+            for ndata in ds['results']:
+                if not ndata['summary_fields']['content_counts'] and require_content:
+                    continue
+                yield total, ndata
 
-            if not ndata['summary_fields']['content_counts'] and require_content:
-                continue
+            # break if no next page
+            if not ds.get('next_link'):
+                break
 
-            ns_id = ndata['id']
+            pagenum += 1
+            next_url = _baseurl + ds['next_link']
 
-            # get the owners too
-            ndata['summary_fields']['owners'] = get_namespace_owners_details(_baseurl, ns_id)
+    def fetch_namespace(summary):
+        total, ndata = summary
+        ns_id = ndata['id']
+
+        # get the owners too
+        ndata['summary_fields']['owners'] = get_namespace_owners_details(_baseurl, ns_id)
+        return total, ndata
+
+    namespaces = fetch_concurrently(fetch_namespace, namespace_summaries(next_url, pagenum))
+    with closing(namespaces):
+        for total, ndata in namespaces:
 
             # send the collection
             namespace_count += 1
@@ -212,17 +373,6 @@ def upstream_namespace_iterator(
             if limit is not None and namespace_count >= limit:
                 break
 
-        # break early if count reached
-        if limit is not None and namespace_count >= limit:
-            break
-
-        # break if no next page
-        if not ds.get('next_link'):
-            break
-
-        pagenum += 1
-        next_url = _baseurl + ds['next_link']
-
 
 def upstream_collection_iterator(
     baseurl=None,
@@ -254,13 +404,16 @@ def upstream_collection_iterator(
         next_url = _baseurl + '/api/v1/roles/?' + '&'.join(params)
     '''
 
-    namespace_cache = {}
+    # shared by the fetch threads, each namespace is only fetched once
+    namespace_cache = FetchOnce()
+
+    def get_namespace(ns_id):
+        return namespace_cache.get(ns_id, lambda: get_namespace_details(_baseurl, ns_id))
 
     if collection_namespace or collection_name:
         if collection_namespace and not collection_name:
             # get the namespace ID first ...
-            ns_name, ns_data = find_namespace(baseurl=baseurl, name=collection_namespace)
-            ns_id = ns_data['id']
+            find_namespace(baseurl=baseurl, name=collection_namespace)
             next_url = (
                 baseurl
                 + f'/api/internal/ui/search/?keywords={collection_namespace}'
@@ -272,30 +425,22 @@ def upstream_collection_iterator(
                 page = safe_fetch(next_url)
                 ds = page.json()
                 collections = ds['collection']['results']
-                for cdata in collections:
 
-                    if cdata['namespace']['name'] != collection_namespace:
-                        continue
+                def search_results():
+                    nonlocal collection_count
+                    for cdata in collections:
 
-                    collection_count += 1
-                    if limit and collection_count >= limit:
-                        return
+                        if cdata['namespace']['name'] != collection_namespace:
+                            continue
 
-                    # Get the namespace+owners
-                    ns_id = cdata['namespace']['id']
-                    if ns_id not in namespace_cache:
-                        logger.info(_baseurl + f'/api/v1/namespaces/{ns_id}/')
-                        ns_url = _baseurl + f'/api/v1/namespaces/{ns_id}/'
-                        namespace_data = safe_fetch(ns_url).json()
-                        # logger.info(namespace_data)
-                        namespace_cache[ns_id] = namespace_data
-
-                        # get the owners too
-                        namespace_cache[ns_id]['summary_fields']['owners'] = \
-                            get_namespace_owners_details(_baseurl, ns_id)
+                        collection_count += 1
+                        if limit and collection_count >= limit:
+                            return
+                        yield cdata
 
-                    else:
-                        namespace_data = namespace_cache[ns_id]
+                def fetch_search_result(cdata):
+                    # Get the namespace+owners
+                    namespace_data = get_namespace(cdata['namespace']['id'])
 
                     # get the versions
                     if get_versions:
@@ -311,7 +456,11 @@ def upstream_collection_iterator(
                     else:
                         collection_versions = []
 
-                    yield namespace_data, cdata, collection_versions
+                    return namespace_data, cdata, collection_versions
+
+                results = fetch_concurrently(fetch_search_result, search_results())
+                with closing(results):
+                    yield from results
 
                 # no pagination in search results?
                 return
@@ -325,85 +474,65 @@ def upstream_collection_iterator(
         collection_versions = paginated_results(cdata['versions_url'])
 
         # Get the namespace+owners
-        ns_id = cdata['namespace']['id']
-        if ns_id not in namespace_cache:
-            logger.info(_baseurl + f'/api/v1/namespaces/{ns_id}/')
-            ns_url = _baseurl + f'/api/v1/namespaces/{ns_id}/'
-            namespace_data = safe_fetch(ns_url).json()
-            namespace_cache[ns_id] = namespace_data
-
-            # get the owners too
-            namespace_cache[ns_id]['summary_fields']['owners'] = \
-                get_namespace_owners_details(_baseurl, ns_id)
-
-        else:
-            namespace_data = namespace_cache[ns_id]
+        namespace_data = get_namespace(cdata['namespace']['id'])
 
         yield namespace_data, cdata, collection_versions
         return
 
-    pagenum = 0
-    collection_count = 0
-    next_url = _baseurl + '/api/v2/collections/'
-    while next_url:
-        logger.info(f'fetch {pagenum} {next_url}')
+    def collection_summaries(next_url):
+        pagenum = 0
+        while next_url:
+            logger.info(f'fetch {pagenum} {next_url}')
 
-        page = safe_fetch(next_url)
+            page = safe_fetch(next_url)
 
-        # Some upstream pages return ISEs for whatever reason.
-        if page.status_code >= 500:
-            if 'page=' in next_url:
-                next_url = next_url.replace(f'page={pagenum}', f'page={pagenum + 1}')
-            else:
-                next_url = next_url.rstrip('/') + '/?page={pagenum+1}'
-            pagenum += 1
-            continue
+            # Some upstream pages return ISEs for whatever reason.
+            if page.status_code >= 500:
+                if 'page=' in next_url:
+                    next_url = next_url.replace(f'page={pagenum}', f'page={pagenum + 1}')
+                else:
+                    next_url = next_url.rstrip('/') + '/?page={pagenum+1}'
+                pagenum += 1
+                continue
 
-        ds = page.json()
+            ds = page.json()
 
-        for cdata in ds['results']:
+            yield from ds['results']
 
-            # Get the namespace+owners
-            ns_id = cdata['namespace']['id']
-            if ns_id not in namespace_cache:
-                logger.info(_baseurl + f'/api/v1/namespaces/{ns_id}/')
-                ns_url = _baseurl + f'/api/v1/namespaces/{ns_id}/'
-                namespace_data = safe_fetch(ns_url).json()
-                # logger.info(namespace_data)
-                namespace_cache[ns_id] = namespace_data
+            # break if no next page
+            if not ds.get('next_link'):
+                break
 
-                # get the owners too
-                namespace_cache[ns_id]['summary_fields']['owners'] = \
-                    get_namespace_owners_details(_baseurl, ns_id)
+            pagenum += 1
+            next_url = _baseurl + ds['next_link']
 
-            else:
-                namespace_data = namespace_cache[ns_id]
+    def fetch_collection(cdata):
+        # Get the namespace+owners
+        namespace_data = get_namespace(cdata['namespace']['id'])
 
-            # get the versions
-            if get_versions:
-                collection_versions = paginated_results(cdata['versions_url'])
-            else:
-                collection_versions = []
+        # get the versions
+        if get_versions:
+            collection_versions = paginated_results(cdata['versions_url'])
+        else:
+            collection_versions = []
+
+        return namespace_data, cdata, collection_versions
+
+    collection_count = 0
+    results = fetch_concurrently(
+        fetch_collection, collection_summaries(_baseurl + '/api/v2/collections/')
+    )
+    with closing(results):
+        for result in results:
 
             # send the collection
             collection_count += 1
-            yield namespace_data, cdata, collection_versions
+            yield result
 
             # break early if count reached
             if limit is not None and collection_count >= limit:
                 break
 
-        # break early if count reached
-        if limit is not None and collection_count >= limit:
-            break
-
-        # break if no next page
-        if not ds.get('next_link'):
-            break
-
-        pagenum += 1
-        next_url = _baseurl + ds['next_link']
-
 
 def upstream_role_iterator(
     baseurl=None,
@@ -413,8 +542,16 @@ def upstream_role_iterator(
     role_name=None,
     get_versions=True,
     start_page=None,
+    on_page_done=None,
 ):
-    """Abstracts the pagination of v1 roles into a generator with error handling."""
+    """Abstracts the pagination of v1 roles into a generator with error handling.
+
+    The role details, namespaces and versions are fetched by a pool of
+    threads while the roles are still yielded in the upstream order.
+
+    `on_page_done(page)` is called once every role of that upstream page
+    was yielded, callers can checkpoint and resume with `start_page=page + 1`.
+    """
     if baseurl is None or not baseurl:
         baseurl = 'https://galaxy.ansible.com/api/v1/roles'
     logger.info(f'upstream_role_iterator baseurl:{baseurl}')
@@ -441,98 +578,108 @@ def upstream_role_iterator(
         else:
             next_url = next_url.rstrip('/') + f'/?page={start_page}'
 
-    namespace_cache = {}
+    # shared by the fetch threads, each namespace is only fetched once
+    namespace_cache = FetchOnce()
 
-    pagenum = 0
     role_count = 0
-    while next_url:
-        logger.info(f'fetch {pagenum} {next_url} role-count:{role_count} ...')
 
-        page = safe_fetch(next_url)
+    def role_summaries(next_url):
+        pagenum = 0
+        # the upstream page number, for on_page_done
+        page = start_page or 1
+        while next_url:
+            logger.info(f'fetch {pagenum} {next_url} role-count:{role_count} ...')
+
+            response = safe_fetch(next_url)
+
+            # Some upstream pages return ISEs for whatever reason.
+            if response.status_code >= 500:
+                logger.error(f'{next_url} returned 500ISE. incrementing the page manually')
+                if 'page=' in next_url:
+                    next_url = next_url.replace(f'page={pagenum}', f'page={pagenum + 1}')
+                else:
+                    next_url = next_url.rstrip('/') + '/?page={pagenum + 1}'
+                pagenum += 1
+                yield PageDone(page)
+                page += 1
+                continue
+
+            ds = response.json()
 
-        # Some upstream pages return ISEs for whatever reason.
-        if page.status_code >= 500:
-            logger.error(f'{next_url} returned 500ISE. incrementing the page manually')
-            if 'page=' in next_url:
-                next_url = next_url.replace(f'page={pagenum}', f'page={pagenum + 1}')
+            yield from ds['results']
+            yield PageDone(page)
+            page += 1
+
+            if ds.get('next'):
+                next_url = ds['next']
+            elif ds.get('next_link'):
+                next_url = ds['next_link']
             else:
-                next_url = next_url.rstrip('/') + '/?page={pagenum + 1}'
-            pagenum += 1
-            continue
+                # break if no next page
+                break
 
-        ds = page.json()
+            api_prefix = '/api/v1'
+            if not next_url.startswith(_baseurl):
+                if not next_url.startswith(api_prefix):
+                    next_url = _baseurl + api_prefix + next_url
+                else:
+                    next_url = _baseurl + next_url
 
-        # iterate each role
-        for rdata in ds['results']:
+            pagenum += 1
 
-            remote_id = rdata['id']
-            role_upstream_url = _baseurl + f'/api/v1/roles/{remote_id}/'
-            logger.info(f'fetch {role_upstream_url}')
+    def fetch_role(rdata):
+        if isinstance(rdata, PageDone):
+            return rdata
 
-            role_page = safe_fetch(role_upstream_url)
-            if role_page.status_code == 404:
-                continue
+        remote_id = rdata['id']
+        role_upstream_url = _baseurl + f'/api/v1/roles/{remote_id}/'
+        logger.info(f'fetch {role_upstream_url}')
 
-            role_data = None
-            try:
-                role_data = role_page.json()
-                if role_data.get('detail', '').lower().strip() == 'not found':
-                    continue
-            except Exception:
-                continue
+        role_page = safe_fetch(role_upstream_url)
+        if role_page.status_code == 404:
+            return None
 
-            # Get the namespace+owners
-            ns_id = role_data['summary_fields']['namespace']['id']
-            if ns_id not in namespace_cache:
-                logger.info(_baseurl + f'/api/v1/namespaces/{ns_id}/')
-                ns_url = _baseurl + f'/api/v1/namespaces/{ns_id}/'
+        role_data = None
+        try:
+            role_data = role_page.json()
+            if role_data.get('detail', '').lower().strip() == 'not found':
+                return None
+        except Exception:
+            return None
 
-                nsd_rr = safe_fetch(ns_url)
-                try:
-                    namespace_data = nsd_rr.json()
-                except requests.exceptions.JSONDecodeError:
-                    continue
-                namespace_cache[ns_id] = namespace_data
+        # Get the namespace+owners
+        ns_id = role_data['summary_fields']['namespace']['id']
+        try:
+            namespace_data = namespace_cache.get(
+                ns_id, lambda: get_namespace_details(_baseurl, ns_id)
+            )
+        except requests.exceptions.JSONDecodeError:
+            return None
 
-                # get the owners too
-                namespace_cache[ns_id]['summary_fields']['owners'] = \
-                    get_namespace_owners_details(_baseurl, ns_id)
+        # Get all of the versions because they have more info than the summary
+        if get_versions:
+            versions_url = role_upstream_url + 'versions'
+            role_versions = paginated_results(versions_url)
+        else:
+            role_versions = []
 
-            else:
-                namespace_data = namespace_cache[ns_id]
+        return namespace_data, role_data, role_versions
 
-            # Get all of the versions because they have more info than the summary
-            if get_versions:
-                versions_url = role_upstream_url + 'versions'
-                role_versions = paginated_results(versions_url)
-            else:
-                role_versions = []
+    roles = fetch_concurrently(fetch_role, role_summaries(next_url))
+    with closing(roles):
+        # iterate each role
+        for result in roles:
+            if result is None:
+                continue
+            if isinstance(result, PageDone):
+                if on_page_done is not None:
+                    on_page_done(result.page)
+                continue
 
             # send the role
             role_count += 1
-            yield namespace_data, role_data, role_versions
+            yield result
 
             # break early if count reached
             if limit is not None and role_count >= limit:
                 break
-
-        # break early if count reached
-        if limit is not None and role_count >= limit:
-            break
-
-        if ds.get('next'):
-            next_url = ds['next']
-        elif ds.get('next_link'):
-            next_url = ds['next_link']
-        else:
-            # break if no next page
-            break
-
-        api_prefix = '/api/v1'
-        if not next_url.startswith(_baseurl):
-            if not next_url.startswith(api_prefix):
-                next_url = _baseurl + api_prefix + next_url
-            else:
-                next_url = _baseurl + next_url
-
-        pagenum += 1
@@ -0,0 +1,45 @@
+"""Queue keys touched by signal handlers and refresh them once per transaction."""
+
+import threading
+
+from django.db import transaction
+
+
+class RefreshQueue:
+    """Collects keys in named sets and passes them to `refresh` after commit.
+
+    The first key added in a transaction registers a single on_commit
+    callback, the following ones are only added to the sets, so many
+    signals in one transaction lead to one refresh. When the transaction
+    (or the savepoint that registered the callback) is rolled back, Django
+    drops the callback and the next key added starts new sets, so keys of
+    rolled back changes are not refreshed. Outside of a transaction keys are
+    refreshed right away.
+    """
+
+    def __init__(self, refresh, *names):
+        self.refresh = refresh
+        self.names = names
+        self._local = threading.local()
+
+    def add(self, **keys):
+        connection = transaction.get_connection()
+        if not connection.in_atomic_block:
+            self.refresh(**{name: set(keys.get(name, ())) for name in self.names})
+            return
+
+        pending = getattr(self._local, "pending", None)
+        if pending is None or not self._is_registered(connection):
+            pending = self._local.pending = {name: set() for name in self.names}
+            transaction.on_commit(self._flush)
+        for name, values in keys.items():
+            pending[name].update(values)
+
+    def _is_registered(self, connection):
+        return any(entry[1] == self._flush for entry in connection.run_on_commit)
+
+    def _flush(self):
+        pending = getattr(self._local, "pending", None)
+        self._local.pending = None
+        if pending is not None:
+            self.refresh(**pending)
@@ -0,0 +1,237 @@
+"""Maintain the SearchDocument table backing /_ui/v1/search/.
+
+The builder querysets here describe what a search document contains for a
+collection (its highest distributed version) and for a legacy role. They are
+used both for incremental refreshes triggered by signal handlers and for the
+full rebuild done by the `rebuild-search-index` management command.
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models import (
+    Exists,
+    F,
+    JSONField,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+)
+from django.db.models.fields.json import KT
+from django.db.models.functions import Coalesce
+from pulp_ansible.app.models import (
+    AnsibleCollectionDeprecated,
+    CollectionDownloadCount,
+    CollectionVersion,
+)
+
+from galaxy_ng.app.api.v1.models import LegacyRole
+from galaxy_ng.app.models.namespace import Namespace
+from galaxy_ng.app.models.search import SearchDocument
+from galaxy_ng.app.utils.refresh_queue import RefreshQueue
+
+log = logging.getLogger(__name__)
+
+DOCUMENT_FIELDS = [
+    "namespace_name",
+    "name",
+    "description_text",
+    "latest_version",
+    "namespace_avatar",
+    "content_list",
+    "tag_names",
+    "platform_names",
+    "deprecated",
+    "download_count",
+    "last_updated",
+    "search",
+]
+
+def get_collection_documents_queryset():
+    """Build the values queryset of collection documents from the highest versions."""
+    deprecated_qs = AnsibleCollectionDeprecated.objects.filter(
+        namespace=OuterRef("namespace"), name=OuterRef("name")
+    )
+    download_count_qs = CollectionDownloadCount.objects.filter(
+        namespace=OuterRef("namespace"), name=OuterRef("name")
+    )
+    namespace_qs = Namespace.objects.filter(name=OuterRef("namespace"))
+
+    # a collection can be the highest in more than one repository,
+    # keep the most recently created of those versions.
+    return (
+        CollectionVersion.objects.filter(
+            ansible_crossrepositorycollectionversionindex__is_highest=True
+        )
+        .annotate(
+            namespace_name=F("namespace"),
+            description_text=F("description"),
+            platform_names=Value([], JSONField()),  # There is no platforms for collections
+            tag_names=F("tags"),
+            last_updated=F("timestamp_of_interest"),
+            deprecated=Exists(deprecated_qs),
+            download_count=Coalesce(
+                Subquery(download_count_qs.values("download_count")[:1]), Value(0)
+            ),
+            latest_version=F("version"),
+            content_list=F("contents"),
+            namespace_avatar=Subquery(namespace_qs.values("_avatar_url")[:1]),
+            search=F("search_vector"),
+        )
+        .order_by("collection_id", "-pulp_created")
+        .distinct("collection_id")
+        .values("collection_id", *DOCUMENT_FIELDS)
+    )
+
+
+def get_role_documents_queryset():
+    """Build the values queryset of role documents."""
+    return LegacyRole.objects.annotate(
+        namespace_name=F("namespace__name"),
+        description_text=KT("full_metadata__description"),
+        platform_names=F("full_metadata__platforms"),
+        tag_names=F("full_metadata__tags"),
+        last_updated=F("created"),
+        deprecated=Value(False),  # there is no deprecation for roles
+        download_count=Coalesce(F("legacyroledownloadcount__count"), Value(0)),
+        latest_version=KT("full_metadata__versions__-1__version"),
+        content_list=Value([], JSONField()),  # There is no contents for roles
+        namespace_avatar=F("namespace__namespace___avatar_url"),  # v3 namespace._avatar_url
+        search=F("legacyrolesearchvector__search_vector"),
+    ).values("role_id", *DOCUMENT_FIELDS)
+
+
+def _make_document(content_type, row):
+    row = dict(row)
+    for key in ("tag_names", "platform_names", "content_list"):
+        if row[key] is None:
+            row[key] = []
+    return SearchDocument(content_type=content_type, **row)
+
+
+def _collection_keys_filter(keys, namespace_field, name_field):
+    """Build a Q for (namespace, name) keys, a name of None matches the whole namespace."""
+    query = Q()
+    for namespace, name in keys:
+        if name is None:
+            query |= Q(**{namespace_field: namespace})
+        else:
+            query |= Q(**{namespace_field: namespace, name_field: name})
+    return query
+
+
+def refresh_collection_documents(keys):
+    """Rebuild the documents for the given (namespace, name) collection keys."""
+    keys = set(keys)
+    if not keys:
+        return
+
+    rows = get_collection_documents_queryset().filter(
+        _collection_keys_filter(keys, "namespace", "name")
+    )
+    documents = [_make_document("collection", row) for row in rows]
+
+    with transaction.atomic():
+        SearchDocument.objects.filter(content_type="collection").filter(
+            _collection_keys_filter(keys, "namespace_name", "name")
+        ).delete()
+        SearchDocument.objects.bulk_create(documents)
+
+
+def refresh_role_documents(role_ids):
+    """Rebuild the documents for the given legacy role ids."""
+    role_ids = set(role_ids)
+    if not role_ids:
+        return
+
+    rows = get_role_documents_queryset().filter(pk__in=role_ids)
+    documents = [_make_document("role", row) for row in rows]
+
+    with transaction.atomic():
+        SearchDocument.objects.filter(role_id__in=role_ids).delete()
+        SearchDocument.objects.bulk_create(documents)
+
+
+def update_collection_download_count(namespace, name):
+    """Copy the current collection download count into its document."""
+    update_collection_download_counts([(namespace, name)])
+
+
+def update_collection_download_counts(keys):
+    """Copy the current download counts into the documents of the (namespace, name) keys."""
+    keys = set(keys)
+    if not keys:
+        return
+
+    download_count_qs = CollectionDownloadCount.objects.filter(
+        namespace=OuterRef("namespace_name"), name=OuterRef("name")
+    )
+    SearchDocument.objects.filter(content_type="collection").filter(
+        _collection_keys_filter(keys, "namespace_name", "name")
+    ).update(
+        download_count=Coalesce(
+            Subquery(download_count_qs.values("download_count")[:1]), Value(0)
+        )
+    )
+
+
+def update_role_download_count(role_id, count):
+    """Copy the role download count into its document."""
+    SearchDocument.objects.filter(role_id=role_id).update(download_count=count)
+
+
+def update_namespace_avatar(namespace):
+    """Copy the namespace avatar into the documents of its collections and roles."""
+    SearchDocument.objects.filter(
+        Q(content_type="collection", namespace_name=namespace.name)
+        | Q(role__namespace__namespace=namespace)
+    ).update(namespace_avatar=namespace._avatar_url)
+
+
+def rebuild_search_documents(batch_size=1000):
+    """Drop and rebuild every search document, returns the number of documents."""
+    total = 0
+    with transaction.atomic():
+        SearchDocument.objects.all().delete()
+        for content_type, qs in (
+            ("collection", get_collection_documents_queryset()),
+            ("role", get_role_documents_queryset()),
+        ):
+            batch = []
+            for row in qs.iterator(chunk_size=batch_size):
+                batch.append(_make_document(content_type, row))
+                if len(batch) >= batch_size:
+                    SearchDocument.objects.bulk_create(batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                SearchDocument.objects.bulk_create(batch)
+                total += len(batch)
+    log.info("Rebuilt %s search documents", total)
+    return total
+
+
+def _refresh_pending(collections, collection_version_ids, roles):
+    if collection_version_ids:
+        collections |= set(
+            CollectionVersion.objects.filter(pk__in=collection_version_ids)
+            .values_list("namespace", "name")
+            .distinct()
+        )
+    refresh_collection_documents(collections)
+    refresh_role_documents(roles)
+
+
+_queue = RefreshQueue(_refresh_pending, "collections", "collection_version_ids", "roles")
+
+
+def schedule_search_document_refresh(collections=(), collection_version_ids=(), roles=()):
+    """Queue documents to be refreshed once the current transaction commits.
+
+    Imports and index updates touch many rows of the same collection in a
+    single transaction, queueing them means each document is rebuilt once.
+    """
+    _queue.add(
+        collections=collections, collection_version_ids=collection_version_ids, roles=roles
+    )
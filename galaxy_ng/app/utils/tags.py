@@ -0,0 +1,138 @@
+"""Maintain the TagCount table backing /_ui/v1/tags/collections/ and /_ui/v1/tags/roles/.
+
+The builder querysets here compute the count of a tag from the highest
+distributed collection versions and from the legacy roles. They are used
+both for incremental refreshes of the tags touched by a change, triggered
+by signal handlers, and for the full rebuild done by the `rebuild-tag-counts`
+management command.
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models import Count, F, Func
+from pulp_ansible.app.models import CollectionVersion
+
+from galaxy_ng.app.api.v1.models import LegacyRoleTag
+from galaxy_ng.app.models.tags import TagCount
+from galaxy_ng.app.utils.refresh_queue import RefreshQueue
+
+log = logging.getLogger(__name__)
+
+class Unnest(Func):
+    """PostgreSQL unnest() function to expand array elements into rows."""
+    function = 'unnest'
+    arity = 1
+
+
+def get_collection_tag_counts_queryset():
+    """Build the values queryset of tag names and their count of highest collection versions."""
+    return (
+        CollectionVersion.objects
+        .filter(ansible_crossrepositorycollectionversionindex__is_highest=True)
+        .exclude(tags=[])
+        .exclude(tags__isnull=True)
+        .annotate(tag_name=Unnest('tags'))
+        .values('tag_name')
+        .annotate(name=F('tag_name'), count=Count('pk', distinct=True))
+        .values('name', 'count')
+        .order_by()
+    )
+
+
+def get_role_tag_counts_queryset():
+    """Build the values queryset of role tag names and their count of roles."""
+    return LegacyRoleTag.objects.annotate(count=Count("legacyrole")).values("name", "count")
+
+
+def _save_counts(content_type, names, rows):
+    """Store the counts of the rows, the names without a row are removed."""
+    counts = [TagCount(content_type=content_type, **row) for row in rows]
+    with transaction.atomic():
+        TagCount.objects.filter(content_type=content_type, name__in=names).exclude(
+            name__in=[count.name for count in counts]
+        ).delete()
+        TagCount.objects.bulk_create(
+            counts,
+            update_conflicts=True,
+            unique_fields=["content_type", "name"],
+            update_fields=["count"],
+        )
+
+
+def refresh_collection_tag_counts(names):
+    """Recount the given collection tags."""
+    names = set(names)
+    if not names:
+        return
+
+    # unnest() can't be filtered, get every tag of the versions using one of them
+    rows = get_collection_tag_counts_queryset().filter(tags__overlap=list(names))
+    _save_counts("collection", names, [row for row in rows if row["name"] in names])
+
+
+def refresh_role_tag_counts(names):
+    """Recount the given role tags."""
+    names = set(names)
+    if not names:
+        return
+
+    _save_counts("role", names, get_role_tag_counts_queryset().filter(name__in=names))
+
+
+def rebuild_tag_counts(batch_size=1000):
+    """Drop and rebuild every tag count, returns the number of tags."""
+    total = 0
+    with transaction.atomic():
+        TagCount.objects.all().delete()
+        for content_type, qs in (
+            ("collection", get_collection_tag_counts_queryset()),
+            ("role", get_role_tag_counts_queryset()),
+        ):
+            batch = []
+            for row in qs.iterator(chunk_size=batch_size):
+                batch.append(TagCount(content_type=content_type, **row))
+                if len(batch) >= batch_size:
+                    TagCount.objects.bulk_create(batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                TagCount.objects.bulk_create(batch)
+                total += len(batch)
+    log.info("Rebuilt %s tag counts", total)
+    return total
+
+
+def _refresh_pending(collection_tags, collection_version_ids, role_tags, role_tag_ids):
+    if collection_version_ids:
+        for tags in CollectionVersion.objects.filter(pk__in=collection_version_ids).values_list(
+            "tags", flat=True
+        ):
+            collection_tags.update(tags or ())
+    if role_tag_ids:
+        role_tags |= set(
+            LegacyRoleTag.objects.filter(pk__in=role_tag_ids).values_list("name", flat=True)
+        )
+    refresh_collection_tag_counts(collection_tags)
+    refresh_role_tag_counts(role_tags)
+
+
+_queue = RefreshQueue(
+    _refresh_pending, "collection_tags", "collection_version_ids", "role_tags", "role_tag_ids"
+)
+
+
+def schedule_tag_count_refresh(
+    collection_tags=(), collection_version_ids=(), role_tags=(), role_tag_ids=()
+):
+    """Queue tags to be recounted once the current transaction commits.
+
+    Index updates and role tag population touch the same tags many times in a
+    single transaction, queueing them means each tag is recounted once.
+    """
+    _queue.add(
+        collection_tags=collection_tags,
+        collection_version_ids=collection_version_ids,
+        role_tags=role_tags,
+        role_tag_ids=role_tag_ids,
+    )
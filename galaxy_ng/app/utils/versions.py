@@ -0,0 +1,179 @@
+"""Compile semantic version specs into filters on collection versions.
+
+pulp_ansible stores the components of each CollectionVersion.version in the
+version_major, version_minor, version_patch and version_prerelease columns.
+The clauses of a semantic_version.SimpleSpec are translated into Q objects on
+those columns, matching what `SimpleSpec.match()` would return for each
+version, so a range like `>=1.2,<2` is filtered by the database.
+"""
+
+import semantic_version
+from django.db.models import CharField, F, Func, Q, Value
+from django.db.models.functions import Collate, Length
+from django.db.models.lookups import Exact, GreaterThan, Regex
+
+from semantic_version.base import AllOf, Always, AnyOf, Never, Range
+
+NUMERIC_IDENTIFIER = r"^[0-9]+$"
+
+# Q objects can't be empty when combined, use explicit always/never conditions.
+ALWAYS = ~Q(pk__in=[])
+NEVER = Q(pk__in=[])
+
+
+def _identifier(position):
+    """Prerelease identifier at position, an empty string when there are fewer identifiers."""
+    return Func(
+        F("version_prerelease"),
+        Value("."),
+        Value(position + 1),
+        function="split_part",
+        output_field=CharField(),
+    )
+
+
+def _identifier_equals(position, value):
+    return Q(Exact(_identifier(position), value))
+
+
+def _identifier_greater_than(position, value):
+    """Compare an identifier like semantic_version does.
+
+    Numeric identifiers are compared numerically and sort before alphanumeric
+    identifiers, which are compared in ASCII order.
+    """
+    identifier = _identifier(position)
+    is_numeric = Q(Regex(identifier, NUMERIC_IDENTIFIER))
+    is_alpha = ~is_numeric & ~Q(Exact(identifier, ""))
+    ascii_greater = Q(GreaterThan(Collate(identifier, "C"), value))
+
+    if value.isdigit():
+        # numeric identifiers have no leading zeros, a longer one is greater
+        numeric_greater = Q(GreaterThan(Length(identifier), len(value))) | (
+            Q(Exact(Length(identifier), len(value))) & ascii_greater
+        )
+        return (is_numeric & numeric_greater) | is_alpha
+    return is_alpha & ascii_greater
+
+
+def _prerelease_greater_than(prerelease):
+    """Versions of the same patch with a higher precedence than the prerelease."""
+    if not prerelease:
+        return NEVER
+
+    # a release has a higher precedence than any of its prereleases
+    condition = Q(version_prerelease="")
+    for position, value in enumerate(prerelease):
+        previous_equal = ALWAYS
+        for previous, previous_value in enumerate(prerelease[:position]):
+            previous_equal &= _identifier_equals(previous, previous_value)
+        condition |= previous_equal & _identifier_greater_than(position, value)
+
+    # more identifiers sort higher when the first ones are equal
+    longer = ~Q(Exact(_identifier(len(prerelease)), ""))
+    for position, value in enumerate(prerelease):
+        longer &= _identifier_equals(position, value)
+    return condition | longer
+
+
+def _same_patch(target):
+    return Q(
+        version_major=target.major,
+        version_minor=target.minor,
+        version_patch=target.patch,
+    )
+
+
+def _equal(target):
+    return _same_patch(target) & Q(version_prerelease=".".join(target.prerelease))
+
+
+def _greater_than(target):
+    return (
+        Q(version_major__gt=target.major)
+        | Q(version_major=target.major, version_minor__gt=target.minor)
+        | Q(
+            version_major=target.major,
+            version_minor=target.minor,
+            version_patch__gt=target.patch,
+        )
+        | (_same_patch(target) & _prerelease_greater_than(target.prerelease))
+    )
+
+
+def _lower_than(target, include_same_patch_prereleases=True):
+    condition = (
+        Q(version_major__lt=target.major)
+        | Q(version_major=target.major, version_minor__lt=target.minor)
+        | Q(
+            version_major=target.major,
+            version_minor=target.minor,
+            version_patch__lt=target.patch,
+        )
+    )
+    if include_same_patch_prereleases:
+        condition |= (
+            _same_patch(target)
+            & ~Q(version_prerelease="")
+            & ~_prerelease_greater_than(target.prerelease)
+            & ~Q(version_prerelease=".".join(target.prerelease))
+        )
+    return condition
+
+
+def _range_to_q(clause):
+    target = clause.target
+    # <1.2.3 and !=1.2.3 don't match 1.2.3-a1 unless asked to with 1.2.3-
+    natural = (
+        clause.prerelease_policy == Range.PRERELEASE_NATURAL and not target.prerelease
+    )
+
+    if clause.build_policy == Range.BUILD_STRICT:
+        if clause.operator == Range.OP_EQ:
+            return Q(version=str(target))
+        if clause.operator == Range.OP_NEQ:
+            return ~Q(version=str(target))
+
+    if clause.operator == Range.OP_EQ:
+        return _equal(target)
+    if clause.operator == Range.OP_GT:
+        return _greater_than(target)
+    if clause.operator == Range.OP_GTE:
+        return _greater_than(target) | _equal(target)
+    if clause.operator == Range.OP_LT:
+        return _lower_than(target, include_same_patch_prereleases=not natural)
+    if clause.operator == Range.OP_LTE:
+        return _lower_than(target) | _equal(target)
+    if clause.operator == Range.OP_NEQ:
+        if natural:
+            return ~_same_patch(target)
+        return ~_equal(target)
+    raise ValueError(f"Unsupported version range operator: {clause.operator}")
+
+
+def _clause_to_q(clause):
+    if isinstance(clause, AllOf):
+        condition = ALWAYS
+        for subclause in clause.clauses:
+            condition &= _clause_to_q(subclause)
+        return condition
+    if isinstance(clause, AnyOf):
+        condition = NEVER
+        for subclause in clause.clauses:
+            condition |= _clause_to_q(subclause)
+        return condition
+    if isinstance(clause, Always):
+        return ALWAYS
+    if isinstance(clause, Never):
+        return NEVER
+    if isinstance(clause, Range):
+        return _range_to_q(clause)
+    raise ValueError(f"Unsupported version range clause: {clause!r}")
+
+
+def version_range_q(spec):
+    """Returns a Q object matching the collection versions in a SimpleSpec range.
+
+    Raises ValueError when spec is not a valid range.
+    """
+    return _clause_to_q(semantic_version.SimpleSpec(spec).clause)
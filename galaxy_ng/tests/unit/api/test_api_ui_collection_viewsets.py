@@ -1,7 +1,9 @@
 import urllib
 import uuid
 
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from pulp_ansible.app.models import (
     AnsibleDistribution,
     AnsibleRepository,
@@ -237,6 +239,48 @@ class TestUiCollectionViewSet(BaseTestCase):
         response = self.client.get(self.repo1_collection1_detail_url)
         self.assertEqual(response.data['latest_version']['version'], '1.0.1')
 
+    def test_list_latest_version_prefers_stable(self):
+        _get_create_version_in_repo(
+            self.namespace, self.collection1, self.repo1, version="2.0.0-beta.1")
+        _get_create_version_in_repo(
+            self.namespace, self.collection2, self.repo2, version="3.0.0-beta.1")
+
+        response = self.client.get(self.repo1_list_url)
+        c1 = next(i for i in response.data['data'] if i['name'] == self.collection1.name)
+        self.assertEqual(c1['latest_version']['version'], '1.0.1')
+
+        response = self.client.get(self.repo2_list_url)
+        c2 = next(i for i in response.data['data'] if i['name'] == self.collection2.name)
+        self.assertEqual(c2['latest_version']['version'], '3.0.0-beta.1')
+
+    def test_list_distribution_pinned_to_version(self):
+        # repo1 version 1 only contains collection1 1.0.0
+        AnsibleDistribution.objects.create(
+            name='repo1-v1',
+            base_path='repo1-v1',
+            repository_version=self.repo1.versions.get(number=1),
+        )
+        url = get_current_ui_url('collections-list', kwargs={'distro_base_path': 'repo1-v1'})
+
+        response = self.client.get(url)
+        self.assertEqual(response.data['meta']['count'], 1)
+        self.assertEqual(response.data['data'][0]['latest_version']['version'], '1.0.0')
+
+    def test_list_query_count_is_constant(self):
+        with CaptureQueriesContext(connection) as two_collections:
+            response = self.client.get(self.repo1_list_url)
+        self.assertEqual(response.data['meta']['count'], 2)
+
+        for i in range(3):
+            namespace = models.Namespace.objects.create(name=f'other_namespace_{i}')
+            collection = Collection.objects.create(namespace=namespace, name=f'collection_{i}')
+            _get_create_version_in_repo(namespace, collection, self.repo1, version="1.0.0")
+
+        with CaptureQueriesContext(connection) as five_collections:
+            response = self.client.get(self.repo1_list_url)
+        self.assertEqual(response.data['meta']['count'], 5)
+        self.assertEqual(len(five_collections), len(two_collections))
+
     def test_include_related(self):
         response = self.client.get(self.repo1_list_url + "?include_related=my_permissions")
         for c in response.data['data']:
@@ -0,0 +1,71 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from pulp_ansible.app.models import AnsibleRepository
+
+from galaxy_ng.app.api.ui.v1.views.landing_page import get_landing_page_counts, sample_namespace
+from galaxy_ng.app.constants import (
+    LANDING_PAGE_COUNTS_CACHE_KEY,
+    LANDING_PAGE_COUNTS_CACHE_TIMEOUT,
+)
+from galaxy_ng.app.models import Namespace
+
+
+class TestLandingPageCounts(TestCase):
+
+    def setUp(self):
+        cache.delete(LANDING_PAGE_COUNTS_CACHE_KEY)
+        self.repo = AnsibleRepository.objects.create(name="landing_page_repo")
+        self.namespaces = [
+            Namespace.objects.create(name=f"partner_{i}", company=f"Partner {i}")
+            for i in range(3)
+        ]
+
+    def test_counts_are_cached(self):
+        repository_version = self.repo.latest_version()
+        counts = get_landing_page_counts(repository_version)
+        assert counts["collection_count"] == 0
+        assert counts["partner_count"] == 3
+
+        with self.assertNumQueries(0):
+            assert get_landing_page_counts(repository_version) == counts
+
+    def test_counts_invalidated_by_namespace_changes(self):
+        repository_version = self.repo.latest_version()
+        get_landing_page_counts(repository_version)
+
+        Namespace.objects.create(name="partner_new")
+        assert get_landing_page_counts(repository_version)["partner_count"] == 4
+
+        self.namespaces[0].delete()
+        assert get_landing_page_counts(repository_version)["partner_count"] == 3
+
+    def test_counts_invalidated_by_repository_version(self):
+        get_landing_page_counts(self.repo.latest_version())
+        other_repo = AnsibleRepository.objects.create(name="landing_page_other_repo")
+
+        with mock.patch("galaxy_ng.app.api.ui.v1.views.landing_page.cache.set") as cache_set:
+            get_landing_page_counts(other_repo.latest_version())
+        # other processes only see changes once the entry expires
+        cache_set.assert_called_once_with(
+            LANDING_PAGE_COUNTS_CACHE_KEY, mock.ANY, timeout=LANDING_PAGE_COUNTS_CACHE_TIMEOUT
+        )
+
+    def test_sample_namespace(self):
+        pks = [namespace.pk for namespace in self.namespaces]
+        self.namespaces[1].delete()
+
+        for pk in range(min(pks), max(pks) + 1):
+            with mock.patch(
+                "galaxy_ng.app.api.ui.v1.views.landing_page.randint", return_value=pk
+            ), self.assertNumQueries(1):
+                namespace = sample_namespace(min(pks), max(pks))
+            assert namespace.pk in (pks[0], pks[2])
+
+        # the highest namespace was deleted since the bounds were cached
+        self.namespaces[2].delete()
+        with mock.patch(
+            "galaxy_ng.app.api.ui.v1.views.landing_page.randint", return_value=max(pks)
+        ):
+            assert sample_namespace(min(pks), max(pks)).pk == pks[0]
@@ -0,0 +1,198 @@
+import logging
+import time
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from pulp_container.app import models as container_models
+from pulp_container.constants import MEDIA_TYPE
+from pulpcore.plugin import models as core_models
+from pulpcore.plugin.util import assign_role
+
+from galaxy_ng.app import models
+from galaxy_ng.app.constants import DeploymentMode
+from galaxy_ng.app.models import auth as auth_models
+from galaxy_ng.tests.unit.benchmark import benchmark
+
+from .base import BaseTestCase
+
+logger = logging.getLogger(__name__)
+
+
+@override_settings(GALAXY_DEPLOYMENT_MODE=DeploymentMode.STANDALONE.value)
+class TestContainerRepositoryViewSet(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = auth_models.User.objects.create(username='admin', is_superuser=True)
+        self.owner = auth_models.User.objects.create(username='ee_owner')
+        self.client.force_authenticate(user=self.admin)
+        self.registry = models.ContainerRegistryRemote.objects.create(
+            name="Test Registry",
+            url="quay.io",
+        )
+        self.list_url = reverse('galaxy:api:v3:container-repository-list')
+
+    def _create_repository(self, name, with_remote=True):
+        namespace = container_models.ContainerNamespace.objects.create(name=name)
+        assign_role('galaxy.execution_environment_namespace_owner', self.owner, namespace)
+
+        remote = None
+        if with_remote:
+            remote = container_models.ContainerRemote.objects.create(
+                name=name, url="https://quay.io", upstream_name=name
+            )
+            models.ContainerRegistryRepos.objects.create(
+                registry=self.registry, repository_remote=remote
+            )
+        repository = container_models.ContainerRepository.objects.create(
+            name=name, remote=remote
+        )
+        container_models.ContainerDistribution.objects.create(
+            name=name, base_path=name, repository=repository, namespace=namespace
+        )
+
+    def test_list(self):
+        self._create_repository('remote_ee')
+        self._create_repository('push_ee', with_remote=False)
+
+        response = self.client.get(self.list_url + '?sort=name')
+        self.assertEqual(response.status_code, 200)
+        push_ee, remote_ee = response.data['data']
+
+        self.assertEqual(push_ee['pulp']['repository']['remote'], None)
+        self.assertEqual(remote_ee['pulp']['repository']['remote']['upstream_name'], 'remote_ee')
+        self.assertEqual(
+            remote_ee['pulp']['repository']['remote']['registry'], str(self.registry.pk)
+        )
+        self.assertEqual(remote_ee['pulp']['repository']['remote']['last_sync_task'], {})
+        for ee in (push_ee, remote_ee):
+            self.assertEqual(ee['pulp']['repository']['version'], 0)
+            self.assertEqual(ee['pulp']['repository']['sign_state'], 'unsigned')
+            self.assertIn('ee_owner', ee['namespace']['owners'])
+
+    def test_list_query_count_is_constant(self):
+        self._create_repository('remote_ee_0')
+        self._create_repository('push_ee_0', with_remote=False)
+
+        with CaptureQueriesContext(connection) as two_repositories:
+            response = self.client.get(self.list_url)
+        self.assertEqual(response.data['meta']['count'], 2)
+
+        for i in range(1, 4):
+            self._create_repository(f'remote_ee_{i}')
+            self._create_repository(f'push_ee_{i}', with_remote=False)
+
+        with CaptureQueriesContext(connection) as eight_repositories:
+            response = self.client.get(self.list_url)
+        self.assertEqual(response.data['meta']['count'], 8)
+        self.assertEqual(len(eight_repositories), len(two_repositories))
+
+
+@override_settings(GALAXY_DEPLOYMENT_MODE=DeploymentMode.STANDALONE.value)
+class TestContainerRepositoryHistoryViewSet(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = auth_models.User.objects.create(username='admin', is_superuser=True)
+        self.client.force_authenticate(user=self.admin)
+
+        namespace = container_models.ContainerNamespace.objects.create(name='history_ee')
+        self.repository = container_models.ContainerRepository.objects.create(name='history_ee')
+        container_models.ContainerDistribution.objects.create(
+            name='history_ee',
+            base_path='history_ee',
+            repository=self.repository,
+            namespace=namespace,
+        )
+        self.history_url = reverse(
+            'galaxy:api:v3:container-repository-history', kwargs={'base_path': 'history_ee'}
+        )
+
+        self.manifests = [
+            container_models.Manifest.objects.create(
+                digest=f'sha256:{i:064d}', schema_version=2, media_type=MEDIA_TYPE.MANIFEST_V2
+            )
+            for i in range(20)
+        ]
+        self.tags = [
+            container_models.Tag.objects.create(
+                name=f'tag_{i}', tagged_manifest=self.manifests[i % len(self.manifests)]
+            )
+            for i in range(100)
+        ]
+
+    def _create_history(self, count):
+        """Versions that each add a manifest and a tag, and remove the previous ones."""
+        versions = core_models.RepositoryVersion.objects.bulk_create([
+            core_models.RepositoryVersion(repository=self.repository, number=number, complete=True)
+            for number in range(1, count + 1)
+        ])
+        memberships = []
+        for i, version in enumerate(versions):
+            version_removed = versions[i + 1] if i + 1 < len(versions) else None
+            for content in (self.manifests[i % len(self.manifests)], self.tags[i % len(self.tags)]):
+                memberships.append(core_models.RepositoryContent(
+                    repository=self.repository,
+                    content=content,
+                    version_added=version,
+                    version_removed=version_removed,
+                ))
+        core_models.RepositoryContent.objects.bulk_create(memberships, batch_size=5000)
+
+    def test_history(self):
+        self._create_history(3)
+
+        response = self.client.get(self.history_url + '?sort=-number')
+        # version 0 didn't change any tags or manifests
+        self.assertEqual([v['number'] for v in response.data['data']], [3, 2, 1])
+
+        def content_info(contents):
+            return sorted(
+                (c['pulp_type'], c['tag_name'], c['manifest_digest']) for c in contents
+            )
+
+        version_2 = response.data['data'][1]
+        self.assertEqual(content_info(version_2['added']), [
+            ('container.manifest', None, self.manifests[1].digest),
+            ('container.tag', 'tag_1', self.manifests[1].digest),
+        ])
+        self.assertEqual(content_info(version_2['removed']), [
+            ('container.manifest', None, self.manifests[0].digest),
+            ('container.tag', 'tag_0', self.manifests[0].digest),
+        ])
+
+    def test_history_query_count_is_constant(self):
+        """History pages are listed in the same number of queries whatever their size."""
+        self._create_history(200)
+
+        query_counts = {}
+        for limit in (10, 100):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(f'{self.history_url}?sort=-number&limit={limit}')
+
+            self.assertEqual(response.data['meta']['count'], 200)
+            self.assertEqual(len(response.data['data']), limit)
+            query_counts[limit] = len(queries)
+
+        self.assertEqual(query_counts[10], query_counts[100])
+
+    @benchmark
+    def test_history_benchmark(self):
+        """List history pages of a repository with 10k versions and report their latency."""
+        self._create_history(10_000)
+
+        query_counts = {}
+        for limit in (10, 100):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.monotonic()
+                response = self.client.get(f'{self.history_url}?sort=-number&limit={limit}')
+                elapsed = time.monotonic() - start
+
+            self.assertEqual(response.data['meta']['count'], 10_000)
+            query_counts[limit] = len(queries)
+            logger.info(
+                f'history page of {limit} versions out of 10000: '
+                f'{len(queries)} queries in {elapsed * 1000:.0f}ms'
+            )
+
+        self.assertEqual(query_counts[10], query_counts[100])
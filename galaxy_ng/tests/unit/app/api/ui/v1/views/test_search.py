@@ -1,4 +1,8 @@
+from urllib.parse import parse_qs, urlparse
 from unittest.mock import Mock, patch
+
+from django.contrib.postgres.search import SearchVector
+from django.db.models import FloatField, Value
 from django.test import TestCase
 from rest_framework.exceptions import ValidationError
 from rest_framework.test import APIRequestFactory
@@ -11,6 +15,8 @@ from galaxy_ng.app.api.ui.v1.views.search import (
     DEFAULT_SEARCH_TYPE,
     RANK_NORMALIZATION,
 )
+from galaxy_ng.app.models import SearchDocument
+from galaxy_ng.tests.unit.api.base import get_current_ui_url
 
 
 class TestSearchListView(TestCase):
@@ -163,19 +169,16 @@ class TestSearchListView(TestCase):
 
         assert '\'search_type\' must be [\'sql\', \'websearch\']' in str(cm.exception)
 
-    @patch('galaxy_ng.app.api.ui.v1.views.search.SearchListView.get_collection_queryset')
-    @patch('galaxy_ng.app.api.ui.v1.views.search.SearchListView.get_role_queryset')
+    @patch('galaxy_ng.app.api.ui.v1.views.search.SearchListView.get_document_queryset')
     @patch('galaxy_ng.app.api.ui.v1.views.search.SearchListView.filter_and_sort')
     def test_get_search_results_valid_collection(
-        self, mock_filter_and_sort, mock_get_roles, mock_get_collections
+        self, mock_filter_and_sort, mock_get_documents
     ):
         request = self.factory.get('/')
         self.view.request = request
 
-        mock_collections = Mock()
-        mock_roles = Mock()
-        mock_get_collections.return_value = mock_collections
-        mock_get_roles.return_value = mock_roles
+        mock_documents = Mock()
+        mock_get_documents.return_value = mock_documents
         mock_filter_and_sort.return_value = Mock()
 
         filter_params = {'type': 'collection', 'search_type': 'websearch'}
@@ -183,28 +186,24 @@ class TestSearchListView(TestCase):
 
         self.view.get_search_results(filter_params, sort_params)
 
-        mock_get_collections.assert_called_once()
-        mock_get_roles.assert_called_once()
+        mock_get_documents.assert_called_once_with(query=None)
         mock_filter_and_sort.assert_called_once_with(
-            mock_collections, mock_roles, filter_params, sort_params, 'collection', query=None
+            mock_documents, filter_params, sort_params, 'collection', query=None
         )
 
     @patch('galaxy_ng.app.api.ui.v1.views.search.SearchQuery')
-    @patch('galaxy_ng.app.api.ui.v1.views.search.SearchListView.get_collection_queryset')
-    @patch('galaxy_ng.app.api.ui.v1.views.search.SearchListView.get_role_queryset')
+    @patch('galaxy_ng.app.api.ui.v1.views.search.SearchListView.get_document_queryset')
     @patch('galaxy_ng.app.api.ui.v1.views.search.SearchListView.filter_and_sort')
     def test_get_search_results_with_websearch_keywords(
-        self, mock_filter_and_sort, mock_get_roles, mock_get_collections, mock_search_query
+        self, mock_filter_and_sort, mock_get_documents, mock_search_query
     ):
         request = self.factory.get('/')
         self.view.request = request
 
         mock_query = Mock()
         mock_search_query.return_value = mock_query
-        mock_collections = Mock()
-        mock_roles = Mock()
-        mock_get_collections.return_value = mock_collections
-        mock_get_roles.return_value = mock_roles
+        mock_documents = Mock()
+        mock_get_documents.return_value = mock_documents
         mock_filter_and_sort.return_value = Mock()
 
         filter_params = {
@@ -217,248 +216,144 @@ class TestSearchListView(TestCase):
         self.view.get_search_results(filter_params, sort_params)
 
         mock_search_query.assert_called_once_with('test keywords', search_type='websearch')
+        mock_get_documents.assert_called_once_with(query=mock_query)
         mock_filter_and_sort.assert_called_once_with(
-            mock_collections, mock_roles, filter_params, sort_params, 'collection', query=mock_query
+            mock_documents, filter_params, sort_params, 'collection', query=mock_query
         )
 
-    @patch('galaxy_ng.app.api.ui.v1.views.search.CollectionVersion')
-    @patch('galaxy_ng.app.api.ui.v1.views.search.AnsibleCollectionDeprecated')
-    @patch('galaxy_ng.app.api.ui.v1.views.search.CollectionDownloadCount')
-    @patch('galaxy_ng.app.api.ui.v1.views.search.Namespace')
-    def test_get_collection_queryset_without_query(
-        self, mock_namespace, mock_download_count, mock_deprecated,
-        mock_collection_version
-    ):
-        mock_qs = Mock()
-        mock_collection_version.objects.annotate.return_value.values.\
-            return_value.filter.return_value = mock_qs
-
-        result = self.view.get_collection_queryset()
-
-        assert result == mock_qs
-        mock_collection_version.objects.annotate.assert_called_once()
-
     @patch('galaxy_ng.app.api.ui.v1.views.search.Func')
-    @patch('galaxy_ng.app.api.ui.v1.views.search.CollectionVersion')
-    @patch('galaxy_ng.app.api.ui.v1.views.search.AnsibleCollectionDeprecated')
-    @patch('galaxy_ng.app.api.ui.v1.views.search.CollectionDownloadCount')
-    @patch('galaxy_ng.app.api.ui.v1.views.search.Namespace')
-    def test_get_collection_queryset_with_query(
-        self, mock_namespace, mock_download_count, mock_deprecated,
-        mock_collection_version, mock_func
-    ):
-        mock_query = Mock()
+    @patch('galaxy_ng.app.api.ui.v1.views.search.SearchDocument')
+    def test_get_document_queryset_without_query(self, mock_document, mock_func):
         mock_qs = Mock()
-        mock_collection_version.objects.annotate.return_value.values.\
-            return_value.filter.return_value = mock_qs
+        mock_document.objects.annotate.return_value.values.return_value = mock_qs
 
-        result = self.view.get_collection_queryset(query=mock_query)
+        result = self.view.get_document_queryset()
 
         assert result == mock_qs
-        mock_func.assert_called_once()
-
-    @patch('galaxy_ng.app.api.ui.v1.views.search.LegacyRole')
-    def test_get_role_queryset_without_query(self, mock_legacy_role):
-        mock_qs = Mock()
-        mock_legacy_role.objects.annotate.return_value.values.return_value = mock_qs
-
-        result = self.view.get_role_queryset()
-
-        assert result == mock_qs
-        mock_legacy_role.objects.annotate.assert_called_once()
+        mock_document.objects.annotate.assert_called_once()
+        mock_func.assert_not_called()
 
     @patch('galaxy_ng.app.api.ui.v1.views.search.Func')
-    @patch('galaxy_ng.app.api.ui.v1.views.search.LegacyRole')
-    def test_get_role_queryset_with_query(self, mock_legacy_role, mock_func):
+    @patch('galaxy_ng.app.api.ui.v1.views.search.SearchDocument')
+    def test_get_document_queryset_with_query(self, mock_document, mock_func):
         mock_query = Mock()
         mock_qs = Mock()
-        mock_legacy_role.objects.annotate.return_value.values.return_value = mock_qs
+        mock_document.objects.annotate.return_value.values.return_value = mock_qs
 
-        result = self.view.get_role_queryset(query=mock_query)
+        result = self.view.get_document_queryset(query=mock_query)
 
         assert result == mock_qs
         mock_func.assert_called_once()
+        relevance = mock_document.objects.annotate.call_args.kwargs["relevance"]
+        assert relevance.get_source_expressions() == [mock_func.return_value]
+        assert isinstance(relevance.output_field, FloatField)
+
+    def _mock_documents(self):
+        mock_documents = Mock()
+        mock_documents.filter.return_value = mock_documents
+        mock_documents.order_by.return_value = Mock()
+        return mock_documents
 
     def test_filter_and_sort_invalid_deprecated_filter(self):
-        mock_collections = Mock()
-        mock_roles = Mock()
+        mock_documents = self._mock_documents()
 
         with self.assertRaises(ValidationError) as cm:  # noqa: PT027
             self.view.filter_and_sort(
-                mock_collections, mock_roles,
-                {'deprecated': 'invalid'}, ['-download_count']
+                mock_documents, {'deprecated': 'invalid'}, ['-download_count']
             )
 
         assert '\'deprecated\' filter must be \'true\' or \'false\'' in str(cm.exception)
 
     def test_filter_and_sort_deprecated_true(self):
-        mock_collections = Mock()
-        mock_roles = Mock()
-        mock_collections.filter.return_value = mock_collections
-        mock_roles.filter.return_value = mock_roles
-        mock_collections.union.return_value.order_by.return_value = Mock()
+        mock_documents = self._mock_documents()
 
-        self.view.filter_and_sort(
-            mock_collections, mock_roles,
-            {'deprecated': 'true'}, ['-download_count']
-        )
+        self.view.filter_and_sort(mock_documents, {'deprecated': 'true'}, ['-download_count'])
 
-        mock_collections.filter.assert_called_with(deprecated=True)
-        mock_roles.filter.assert_called_with(deprecated=True)
+        mock_documents.filter.assert_called_with(deprecated=True)
 
     def test_filter_and_sort_deprecated_false(self):
-        mock_collections = Mock()
-        mock_roles = Mock()
-        mock_collections.filter.return_value = mock_collections
-        mock_roles.filter.return_value = mock_roles
-        mock_collections.union.return_value.order_by.return_value = Mock()
+        mock_documents = self._mock_documents()
 
-        self.view.filter_and_sort(
-            mock_collections, mock_roles,
-            {'deprecated': 'false'}, ['-download_count']
-        )
+        self.view.filter_and_sort(mock_documents, {'deprecated': 'false'}, ['-download_count'])
 
-        mock_collections.filter.assert_called_with(deprecated=False)
-        mock_roles.filter.assert_called_with(deprecated=False)
+        mock_documents.filter.assert_called_with(deprecated=False)
 
     def test_filter_and_sort_name_filter(self):
-        mock_collections = Mock()
-        mock_roles = Mock()
-        mock_collections.filter.return_value = mock_collections
-        mock_roles.filter.return_value = mock_roles
-        mock_collections.union.return_value.order_by.return_value = Mock()
+        mock_documents = self._mock_documents()
 
-        self.view.filter_and_sort(
-            mock_collections, mock_roles,
-            {'name': 'TestName'}, ['-download_count']
-        )
+        self.view.filter_and_sort(mock_documents, {'name': 'TestName'}, ['-download_count'])
 
-        mock_collections.filter.assert_called_with(name__iexact='TestName')
-        mock_roles.filter.assert_called_with(name__iexact='TestName')
+        mock_documents.filter.assert_called_with(name__iexact='TestName')
 
     def test_filter_and_sort_namespace_filter(self):
-        mock_collections = Mock()
-        mock_roles = Mock()
-        mock_collections.filter.return_value = mock_collections
-        mock_roles.filter.return_value = mock_roles
-        mock_collections.union.return_value.order_by.return_value = Mock()
+        mock_documents = self._mock_documents()
 
         self.view.filter_and_sort(
-            mock_collections, mock_roles,
-            {'namespace': 'TestNamespace'}, ['-download_count']
+            mock_documents, {'namespace': 'TestNamespace'}, ['-download_count']
         )
 
-        mock_collections.filter.assert_called_with(namespace_name__iexact='TestNamespace')
-        mock_roles.filter.assert_called_with(namespace_name__iexact='TestNamespace')
+        mock_documents.filter.assert_called_with(namespace_name__iexact='TestNamespace')
 
     def test_filter_and_sort_tags_filter(self):
-        mock_collections = Mock()
-        mock_roles = Mock()
-        mock_collections.filter.return_value = mock_collections
-        mock_roles.filter.return_value = mock_roles
-        mock_collections.union.return_value.order_by.return_value = Mock()
+        mock_documents = self._mock_documents()
 
         self.view.filter_and_sort(
-            mock_collections, mock_roles,
-            {'tags': ['tag1', 'tag2']}, ['-download_count']
+            mock_documents, {'tags': ['tag1', 'tag2']}, ['-download_count']
         )
 
         # Should be called once for tag filtering
-        assert mock_collections.filter.call_count == 1
-        assert mock_roles.filter.call_count == 1
+        assert mock_documents.filter.call_count == 1
 
     def test_filter_and_sort_platform_filter(self):
-        mock_collections = Mock()
-        mock_roles = Mock()
-        mock_collections.filter.return_value = mock_collections
-        mock_roles.filter.return_value = mock_roles
-        mock_collections.union.return_value.order_by.return_value = Mock()
+        mock_documents = self._mock_documents()
 
-        self.view.filter_and_sort(
-            mock_collections, mock_roles,
-            {'platform': 'ubuntu'}, ['-download_count']
-        )
+        self.view.filter_and_sort(mock_documents, {'platform': 'ubuntu'}, ['-download_count'])
 
-        mock_roles.filter.assert_called_with(full_metadata__platforms__icontains='ubuntu')
-        mock_collections.filter.assert_called_with(platform_names='ubuntu')
+        mock_documents.filter.assert_called_with(platform_names__icontains='ubuntu')
 
     def test_filter_and_sort_with_query(self):
         mock_query = Mock()
-        mock_collections = Mock()
-        mock_roles = Mock()
-        mock_collections.filter.return_value = mock_collections
-        mock_roles.filter.return_value = mock_roles
-        mock_collections.union.return_value.order_by.return_value = Mock()
+        mock_documents = self._mock_documents()
 
-        self.view.filter_and_sort(
-            mock_collections, mock_roles,
-            {}, ['-download_count'], query=mock_query
-        )
+        self.view.filter_and_sort(mock_documents, {}, ['-download_count'], query=mock_query)
 
-        mock_collections.filter.assert_called_with(search=mock_query)
-        mock_roles.filter.assert_called_with(search=mock_query)
+        mock_documents.filter.assert_called_with(search=mock_query)
 
     def test_filter_and_sort_with_keywords_sql_search(self):
-        mock_collections = Mock()
-        mock_roles = Mock()
-        mock_collections.filter.return_value = mock_collections
-        mock_roles.filter.return_value = mock_roles
-        mock_collections.union.return_value.order_by.return_value = Mock()
+        mock_documents = self._mock_documents()
 
         self.view.filter_and_sort(
-            mock_collections, mock_roles,
-            {'keywords': 'test keywords'}, ['-download_count']
+            mock_documents, {'keywords': 'test keywords'}, ['-download_count']
         )
 
         # Should be called once for keywords filtering
-        mock_collections.filter.assert_called_once()
-        mock_roles.filter.assert_called_once()
+        mock_documents.filter.assert_called_once()
 
     def test_filter_and_sort_type_role_only(self):
-        mock_collections = Mock()
-        mock_roles = Mock()
-        mock_roles.order_by.return_value = Mock()
+        mock_documents = self._mock_documents()
 
-        self.view.filter_and_sort(
-            mock_collections, mock_roles,
-            {}, ['-download_count'], type_='role'
-        )
+        self.view.filter_and_sort(mock_documents, {}, ['-download_count'], type_='role')
 
-        mock_roles.order_by.assert_called_with('-download_count')
-        mock_collections.union.assert_not_called()
+        mock_documents.filter.assert_called_once_with(content_type='role')
+        mock_documents.order_by.assert_called_with('-download_count')
 
     def test_filter_and_sort_type_collection_only(self):
-        mock_collections = Mock()
-        mock_roles = Mock()
-        mock_collections.order_by.return_value = Mock()
+        mock_documents = self._mock_documents()
 
-        self.view.filter_and_sort(
-            mock_collections, mock_roles,
-            {}, ['-download_count'], type_='collection'
-        )
+        self.view.filter_and_sort(mock_documents, {}, ['-download_count'], type_='collection')
 
-        mock_collections.order_by.assert_called_with('-download_count')
-        mock_collections.union.assert_not_called()
+        mock_documents.filter.assert_called_once_with(content_type='collection')
+        mock_documents.order_by.assert_called_with('-download_count')
 
-    def test_filter_and_sort_union_both_types(self):
-        mock_collections = Mock()
-        mock_roles = Mock()
-        mock_union_qs = Mock()
+    def test_filter_and_sort_both_types(self):
+        mock_documents = self._mock_documents()
         mock_final_qs = Mock()
-        mock_collections.union.return_value = mock_union_qs
-        mock_union_qs.order_by.return_value = mock_final_qs
+        mock_documents.order_by.return_value = mock_final_qs
 
-        self.view.filter_and_sort(
-            mock_collections, mock_roles,
-            {}, ['-download_count'], type_=''
-        )
+        result = self.view.filter_and_sort(mock_documents, {}, ['-download_count'], type_='')
 
-        mock_collections.union.assert_called_with(mock_roles, all=True)
-        mock_union_qs.order_by.assert_called_with('-download_count')
-        result = self.view.filter_and_sort(
-            mock_collections, mock_roles,
-            {}, ['-download_count'], type_=''
-        )
+        mock_documents.filter.assert_not_called()
+        mock_documents.order_by.assert_called_with('-download_count')
         assert result == mock_final_qs
 
     @patch('galaxy_ng.app.api.ui.v1.views.search.SearchListView.get_filter_params')
@@ -486,6 +381,46 @@ class TestSearchListView(TestCase):
         assert self.view.sort == mock_sort_params
 
 
+class TestSearchKeysetPagination(TestCase):
+
+    def setUp(self):
+        # three distinct ranks, each shared by four documents, split over
+        # two download counts so the pages end inside runs of rank ties
+        for i in range(12):
+            doc = SearchDocument.objects.create(
+                content_type="role",
+                namespace_name="geerlingguy",
+                name=f"role{i}",
+                download_count=i // 6,
+            )
+            text = "nginx " * (1 + i % 3) + "web server"
+            SearchDocument.objects.filter(pk=doc.pk).update(search=SearchVector(Value(text)))
+
+    def _walk(self, params):
+        url = get_current_ui_url("search-view")
+        docs = []
+        cursor = ""
+        while cursor is not None:
+            response = self.client.get(url, {**params, "cursor": cursor, "limit": 5})
+            assert response.status_code == 200
+            docs.extend(response.data["data"])
+            assert len(docs) <= 12
+            link = response.data["links"]["next"]
+            cursor = parse_qs(urlparse(link).query)["cursor"][0] if link else None
+        assert sorted(doc["name"] for doc in docs) == sorted(f"role{i}" for i in range(12))
+        return docs
+
+    def test_walk_relevance_ties(self):
+        docs = self._walk({"keywords": "nginx web"})
+        keys = [(doc["download_count"], doc["relevance"]) for doc in docs]
+        assert keys == sorted(keys, reverse=True)
+
+    def test_walk_relevance_only(self):
+        docs = self._walk({"keywords": "nginx", "order_by": "relevance"})
+        ranks = [doc["relevance"] for doc in docs]
+        assert ranks == sorted(ranks)
+
+
 class TestSearchConstants(TestCase):
 
     def test_filter_params_list(self):
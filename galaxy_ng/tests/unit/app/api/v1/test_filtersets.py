@@ -1,13 +1,28 @@
+import logging
+import time
 import uuid
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
 
 from pulpcore.app.models import Task
 from pulpcore.constants import TASK_STATES
 
-from galaxy_ng.app.api.v1.filtersets import LegacyRoleImportFilter
+from galaxy_ng.app.api.v1.filtersets import (
+    LegacyNamespaceFilter,
+    LegacyRoleFilter,
+    LegacyRoleImportFilter,
+)
 from galaxy_ng.app.api.v1.models import LegacyNamespace, LegacyRole, LegacyRoleImport
 from galaxy_ng.app.models import Namespace
+from galaxy_ng.app.models.auth import Group, User
+from galaxy_ng.app.utils.rbac import add_group_to_v3_namespace, add_user_to_v3_namespace
+from galaxy_ng.tests.unit.benchmark import benchmark
+
+logger = logging.getLogger(__name__)
 
 
 def _create_import(github_user, github_repo, state=TASK_STATES.COMPLETED, role=None):
@@ -21,7 +36,13 @@ def _create_import(github_user, github_repo, state=TASK_STATES.COMPLETED, role=N
             "request_username": "admin",
         },
     )
-    return LegacyRoleImport.objects.create(task=task, role=role, messages=[])
+    return LegacyRoleImport.objects.create(
+        task=task,
+        role=role,
+        messages=[],
+        github_user=github_user,
+        github_repo=github_repo,
+    )
 
 
 def _create_namespace(name):
@@ -108,6 +129,19 @@ class TestLegacyRoleImportFilterGithubRepo:
         assert f.qs.count() == 0
 
 
+@pytest.mark.django_db
+class TestLegacyRoleImportFilterColumns:
+
+    def test_uses_columns_not_task_kwargs(self, import_data):
+        qs = LegacyRoleImport.objects.all()
+        f = LegacyRoleImportFilter({"github_user": "alice"}, queryset=qs)
+        with CaptureQueriesContext(connection) as ctx:
+            results = list(f.qs)
+        assert len(results) == 3
+        assert len(ctx.captured_queries) == 1
+        assert "enc_kwargs" not in ctx.captured_queries[0]["sql"]
+
+
 @pytest.mark.django_db
 class TestLegacyRoleImportFilterCombined:
 
@@ -157,3 +191,141 @@ class TestLegacyRoleImportFilterState:
 
         assert import_data["imp_orphan"] in results
         assert len(results) == 1
+
+
+@pytest.fixture
+def owner_data():
+    alice = User.objects.create(username="alice")
+    bob = User.objects.create(username="bob")
+    group = Group.objects.create(name="owners")
+    group.user_set.add(bob)
+
+    ns_direct = _create_namespace("direct")
+    ns_group = _create_namespace("viagroup")
+    ns_other = _create_namespace("other")
+    ns_unlinked, _ = LegacyNamespace.objects.get_or_create(name="unlinked")
+
+    add_user_to_v3_namespace(alice, ns_direct.namespace)
+    add_group_to_v3_namespace(group, ns_group.namespace)
+
+    return {
+        "ns_direct": ns_direct,
+        "ns_group": ns_group,
+        "ns_other": ns_other,
+        "ns_unlinked": ns_unlinked,
+    }
+
+
+@pytest.mark.django_db
+class TestLegacyNamespaceFilterOwner:
+
+    def test_filters_by_user_role(self, owner_data):
+        qs = LegacyNamespace.objects.all()
+        f = LegacyNamespaceFilter({"owner": "alice"}, queryset=qs)
+        assert list(f.qs) == [owner_data["ns_direct"]]
+
+    def test_filters_by_group_role(self, owner_data):
+        qs = LegacyNamespace.objects.all()
+        f = LegacyNamespaceFilter({"owner": "bob"}, queryset=qs)
+        assert list(f.qs) == [owner_data["ns_group"]]
+
+    def test_unknown_owner_returns_empty(self, owner_data):
+        qs = LegacyNamespace.objects.all()
+        f = LegacyNamespaceFilter({"owner": "nobody"}, queryset=qs)
+        assert f.qs.count() == 0
+
+    def test_single_query(self, owner_data):
+        qs = LegacyNamespace.objects.all()
+        f = LegacyNamespaceFilter({"owner": "alice"}, queryset=qs)
+        with CaptureQueriesContext(connection) as ctx:
+            list(f.qs)
+        assert len(ctx.captured_queries) == 1
+
+
+def _seed_namespaces(total):
+    v3_namespaces = Namespace.objects.bulk_create(
+        [Namespace(name=f"bench{i}") for i in range(total)],
+        batch_size=5000,
+    )
+    LegacyNamespace.objects.bulk_create(
+        [LegacyNamespace(name=f"bench{i}", namespace=ns) for i, ns in enumerate(v3_namespaces)],
+        batch_size=5000,
+    )
+
+
+@pytest.mark.django_db
+def test_owner_filter_many_namespaces(owner_data):
+    """The owner lookup stays a single query however many namespaces there are."""
+    _seed_namespaces(500)
+
+    qs = LegacyNamespace.objects.all()
+    f = LegacyNamespaceFilter({"owner": "alice"}, queryset=qs)
+    with CaptureQueriesContext(connection) as ctx:
+        results = list(f.qs)
+
+    assert results == [owner_data["ns_direct"]]
+    assert len(ctx.captured_queries) == 1
+
+
+@benchmark
+@pytest.mark.django_db
+def test_owner_filter_benchmark(owner_data):
+    """Seed 50k legacy namespaces and report the owner lookup latency."""
+    total = 50_000
+    _seed_namespaces(total)
+
+    qs = LegacyNamespace.objects.all()
+    f = LegacyNamespaceFilter({"owner": "alice"}, queryset=qs)
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.monotonic()
+        results = list(f.qs)
+        elapsed = time.monotonic() - start
+
+    logger.info(f"owner filter over {total} namespaces took {elapsed:.3f}s")
+    assert results == [owner_data["ns_direct"]]
+    assert len(ctx.captured_queries) == 1
+
+
+@pytest.fixture
+def keyword_data():
+    ns_web = _create_namespace("webteam")
+    ns_other = _create_namespace("other")
+    roles = {
+        "by_namespace": _create_role(ns_web, "alpha", "webteam", "alpha"),
+        "by_name": _create_role(ns_other, "nginx_webserver", "other", "nginx"),
+        "by_description": _create_role(ns_other, "beta", "other", "beta"),
+        "no_match": _create_role(ns_other, "gamma", "other", "gamma"),
+    }
+    roles["by_description"].full_metadata["description"] = "Installs a web server"
+    roles["by_description"].full_metadata["tags"] = ["http", "proxy"]
+    roles["by_description"].save()
+    return roles
+
+
+def _filter_roles(params):
+    request = Request(APIRequestFactory().get("/api/v1/roles/", params))
+    return LegacyRoleFilter(params, queryset=LegacyRole.objects.all(), request=request).qs
+
+
+@pytest.mark.django_db
+class TestLegacyRoleFilterKeywords:
+
+    @pytest.mark.parametrize("param", ["keywords", "autocomplete"])
+    def test_matches_namespace_name_and_description(self, keyword_data, param):
+        results = set(_filter_roles({param: "web"}))
+        assert results == {
+            keyword_data["by_namespace"],
+            keyword_data["by_name"],
+            keyword_data["by_description"],
+        }
+
+    def test_keywords_are_combined(self, keyword_data):
+        results = list(_filter_roles({"keywords": ["web", "server"]}))
+        assert sorted(r.name for r in results) == ["beta", "nginx_webserver"]
+
+    def test_keywords_are_case_sensitive(self, keyword_data):
+        assert not _filter_roles({"keywords": "WEB"}).exists()
+
+    def test_tags(self, keyword_data):
+        assert list(_filter_roles({"tags": "proxy"})) == [keyword_data["by_description"]]
+        assert not _filter_roles({"tags": "prox"}).exists()
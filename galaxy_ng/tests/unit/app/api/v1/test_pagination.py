@@ -0,0 +1,128 @@
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from galaxy_ng.app.api.pagination import KeysetLimitOffsetPagination
+from galaxy_ng.app.api.v1.filtersets import LegacyRoleFilter
+from galaxy_ng.app.api.v1.models import LegacyNamespace, LegacyRole, LegacyRoleDownloadCount
+from galaxy_ng.app.api.v1.viewsets.roles import LegacyRolesSetPagination, LegacyRolesViewSet
+
+
+@pytest.fixture
+def roles():
+    legacy_ns = LegacyNamespace.objects.create(name="geerlingguy")
+    roles = []
+    for i in range(25):
+        role = LegacyRole.objects.create(namespace=legacy_ns, name=f"role{i}", full_metadata={})
+        # many roles share a download count to exercise the pk tie breaker
+        LegacyRoleDownloadCount.objects.create(legacyrole=role, count=i % 3)
+        roles.append(role)
+    return roles
+
+
+def _request(params):
+    return Request(APIRequestFactory().get("/api/v1/roles/", params))
+
+
+def _ordered_roles(order_by):
+    return LegacyRoleFilter({"order_by": order_by}, queryset=LegacyRolesViewSet.queryset.all()).qs
+
+
+def _walk(queryset, params):
+    names = []
+    cursor = ""
+    while cursor is not None:
+        paginator = LegacyRolesSetPagination()
+        page = paginator.paginate_queryset(queryset, _request({**params, "cursor": cursor}))
+        names.extend(role.name for role in page)
+        link = paginator.get_keyset_next_link()
+        cursor = parse_qs(urlparse(link).query)["cursor"][0] if link else None
+    return names
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    @pytest.mark.parametrize("order_by", ["name", "-download_count", "download_count"])
+    def test_walk_matches_offset_order(self, roles, order_by):
+        qs = _ordered_roles(order_by)
+        expected = [role.name for role in qs.order_by(*qs.query.order_by, "id")]
+        assert _walk(qs, {"page_size": 4}) == expected
+
+    def test_offset_mode_is_default(self, roles):
+        paginator = LegacyRolesSetPagination()
+        page = paginator.paginate_queryset(_ordered_roles("name"), _request({"page": 2}))
+        assert not paginator.keyset
+        assert len(page) == 10
+        assert paginator.get_paginated_response([]).data["count"] == 25
+
+    def test_count_modes(self, roles):
+        qs = _ordered_roles("name")
+        paginator = LegacyRolesSetPagination()
+        paginator.paginate_queryset(qs, _request({"cursor": "", "count": "exact"}))
+        assert paginator.get_paginated_response([]).data["count"] == 25
+
+        paginator = LegacyRolesSetPagination()
+        paginator.paginate_queryset(qs, _request({"cursor": "", "count": "none"}))
+        assert paginator.get_paginated_response([]).data["count"] is None
+
+        paginator = LegacyRolesSetPagination()
+        paginator.paginate_queryset(qs, _request({"cursor": ""}))
+        assert isinstance(paginator.count, int)
+
+    def test_invalid_cursor(self, roles):
+        with pytest.raises(NotFound):
+            LegacyRolesSetPagination().paginate_queryset(
+                _ordered_roles("name"), _request({"cursor": "not-a-cursor"})
+            )
+
+    def test_cursor_from_other_ordering(self, roles):
+        paginator = LegacyRolesSetPagination()
+        paginator.paginate_queryset(_ordered_roles("name"), _request({"cursor": ""}))
+        cursor = paginator.encode_cursor(paginator.next_position)
+        with pytest.raises(NotFound):
+            LegacyRolesSetPagination().paginate_queryset(
+                _ordered_roles("-download_count"), _request({"cursor": cursor})
+            )
+
+    def test_values_queryset(self, roles):
+        qs = LegacyRole.objects.order_by("-name").values("id", "name")
+        expected = [row["name"] for row in qs.order_by("-name", "id")]
+
+        names = []
+        cursor = ""
+        while cursor is not None:
+            paginator = KeysetLimitOffsetPagination()
+            page = paginator.paginate_queryset(qs, _request({"limit": 7, "cursor": cursor}))
+            names.extend(row["name"] for row in page)
+            data = paginator.get_paginated_data(page)
+            assert data["links"]["last"] is None
+            link = data["links"]["next"]
+            cursor = parse_qs(urlparse(link).query)["cursor"][0] if link else None
+        assert names == expected
+
+    @pytest.mark.parametrize("ordering", ["created", "-created"])
+    def test_walk_sub_millisecond_datetimes(self, roles, ordering):
+        base = timezone.now()
+        for i, role in enumerate(roles):
+            # 100µs apart, with pairs of equal values for the pk tie breaker
+            created = base + timedelta(microseconds=100 * (i // 2))
+            LegacyRole.objects.filter(pk=role.pk).update(created=created)
+
+        qs = LegacyRole.objects.order_by(ordering)
+        expected = [role.name for role in qs.order_by(ordering, "id")]
+
+        names = []
+        cursor = ""
+        while cursor is not None:
+            paginator = KeysetLimitOffsetPagination()
+            page = paginator.paginate_queryset(qs, _request({"limit": 3, "cursor": cursor}))
+            names.extend(role.name for role in page)
+            link = paginator.get_paginated_data(page)["links"]["next"]
+            cursor = parse_qs(urlparse(link).query)["cursor"][0] if link else None
+        assert names == expected
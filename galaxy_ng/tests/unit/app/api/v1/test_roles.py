@@ -0,0 +1,61 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from galaxy_ng.app.api.v1.filtersets import LegacyRoleFilter
+from galaxy_ng.app.api.v1.models import LegacyNamespace, LegacyRole, LegacyRoleDownloadCount
+from galaxy_ng.app.api.v1.serializers import LegacyRoleSerializer
+from galaxy_ng.app.api.v1.viewsets.roles import LegacyRolesViewSet
+from galaxy_ng.app.models import Namespace
+
+
+@pytest.fixture
+def roles():
+    v3_ns = Namespace.objects.create(name="geerlingguy")
+    legacy_ns = LegacyNamespace.objects.create(name="geerlingguy", namespace=v3_ns)
+    roles = []
+    for i in range(20):
+        role = LegacyRole.objects.create(
+            namespace=legacy_ns,
+            name=f"role{i}",
+            full_metadata={
+                "github_user": "geerlingguy",
+                "github_repo": f"ansible-role-{i}",
+                "versions": [{"name": "1.0.0"}, {"name": "1.1.0"}],
+            },
+        )
+        if i % 2:
+            LegacyRoleDownloadCount.objects.create(legacyrole=role, count=i)
+        roles.append(role)
+    return roles
+
+
+def _serialize_page(page_size):
+    qs = LegacyRolesViewSet.queryset.all()[:page_size]
+    with CaptureQueriesContext(connection) as ctx:
+        data = LegacyRoleSerializer(qs, many=True).data
+    return data, len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+class TestLegacyRolesListQueries:
+
+    def test_download_count_annotation(self, roles):
+        data, _ = _serialize_page(20)
+        counts = {x["name"]: x["download_count"] for x in data}
+        assert counts["role0"] == 0
+        assert counts["role1"] == 1
+        assert counts["role19"] == 19
+
+    def test_query_budget_is_fixed(self, roles):
+        _, small = _serialize_page(2)
+        _, large = _serialize_page(20)
+        assert small == 1
+        assert large == small
+
+    def test_download_count_ordering(self, roles):
+        f = LegacyRoleFilter(
+            {"order_by": "-download_count"},
+            queryset=LegacyRolesViewSet.queryset.all(),
+        )
+        assert [x.name for x in f.qs[:2]] == ["role19", "role17"]
@@ -6,9 +6,10 @@ from galaxy_importer.config import Config
 from galaxy_ng.app.models import Namespace
 from galaxy_ng.app.api.v1.models import LegacyNamespace
 from galaxy_ng.app.api.v1.models import LegacyRole
+from galaxy_ng.app.api.v1.models import LegacyRoleSyncCheckpoint
 
 from galaxy_ng.app.api.v1.tasks import do_git_checkout, legacy_role_import
-# from galaxy_ng.app.api.v1.tasks import legacy_sync_from_upstream
+from galaxy_ng.app.api.v1.tasks import legacy_sync_from_upstream
 
 
 @pytest.mark.parametrize('url', [
@@ -217,3 +218,84 @@ def test_legacy_role_import_with_tag_name():
     # the tag should be in the versions ...
     vmap = {x['version']: x for x in role.full_metadata['versions']}
     assert github_reference in vmap
+
+
+class FakeUpstream:
+    """Three upstream pages of roles, optionally failing on one of them."""
+
+    def __init__(self):
+        self.pages = {
+            1: [self.role(1, 'apache'), self.role(2, 'nginx')],
+            2: [self.role(3, 'mysql')],
+            3: [self.role(4, 'redis')],
+        }
+        self.fail_on = None
+        self.start_pages = []
+
+    @staticmethod
+    def role(remote_id, name, download_count=10):
+        return {
+            'id': remote_id,
+            'github_user': 'geerlingguy',
+            'name': name,
+            'github_repo': f'ansible-role-{name}',
+            'github_branch': 'main',
+            'download_count': download_count,
+        }
+
+    def iterate(self, start_page=None, on_page_done=None, **kwargs):
+        for page in range(start_page or 1, len(self.pages) + 1):
+            if page == self.fail_on:
+                raise RuntimeError('upstream went away')
+            for rdata in self.pages[page]:
+                yield {'name': 'geerlingguy'}, rdata, []
+            on_page_done(page)
+
+
+@pytest.fixture
+def fake_upstream():
+    legacy_ns = LegacyNamespace.objects.create(name='geerlingguy')
+    upstream = FakeUpstream()
+    with patch('galaxy_ng.app.api.v1.tasks.upstream_role_iterator', upstream.iterate), \
+            patch('galaxy_ng.app.api.v1.tasks.process_namespace') as process_namespace:
+        process_namespace.return_value = (legacy_ns, None)
+        yield upstream
+
+
+@pytest.mark.django_db
+def test_legacy_sync_resumes_from_checkpoint(fake_upstream):
+    fake_upstream.fail_on = 3
+    with pytest.raises(RuntimeError):
+        legacy_sync_from_upstream(baseurl='https://example.com')
+
+    # the completed pages were written and checkpointed
+    assert sorted(LegacyRole.objects.values_list('name', flat=True)) == [
+        'apache', 'mysql', 'nginx'
+    ]
+    checkpoint = LegacyRoleSyncCheckpoint.objects.get()
+    assert checkpoint.page == 2
+    assert checkpoint.synced_roles == 3
+
+    fake_upstream.fail_on = None
+    legacy_sync_from_upstream(baseurl='https://example.com')
+
+    assert LegacyRole.objects.count() == 4
+    assert LegacyRole.objects.get(name='redis').full_metadata['upstream_id'] == 4
+    # the sync completed so the next one starts over
+    assert not LegacyRoleSyncCheckpoint.objects.exists()
+
+
+@pytest.mark.django_db
+def test_legacy_sync_updates_existing_roles(fake_upstream):
+    legacy_sync_from_upstream(baseurl='https://example.com')
+    apache = LegacyRole.objects.get(name='apache')
+    assert apache.legacyroledownloadcount.count == 10
+
+    fake_upstream.pages[1][0] = FakeUpstream.role(1, 'apache', download_count=42)
+    fake_upstream.pages[1][0]['description'] = 'Apache 2.x for Linux.'
+    legacy_sync_from_upstream(baseurl='https://example.com')
+
+    assert LegacyRole.objects.count() == 4
+    apache.refresh_from_db()
+    assert apache.full_metadata['description'] == 'Apache 2.x for Linux.'
+    assert apache.legacyroledownloadcount.count == 42
@@ -9,6 +9,9 @@ import insights_analytics_collector.package
 from galaxy_ng.app.metrics_collection.automation_analytics.collector import Collector
 from galaxy_ng.app.metrics_collection.automation_analytics.package import Package
 from django.test import TestCase, override_settings
+from django.utils.timezone import now, timedelta
+from galaxy_ng.app.metrics_collection.common_data import FULL_SYNC_SINCE
+from galaxy_ng.app.models import MetricsCollectionState
 
 
 @register('config', '1.0', config=True)
@@ -215,6 +218,93 @@ class TestAutomationAnalyticsCollector(TestCase):
                                      timeout=(31, 31)
                                      )
 
+    def test_first_gathering_is_full_sync(self):
+        collector = Collector(
+            collector_module=importlib.import_module(__name__),
+            collection_type=Collector.DRY_RUN
+        )
+        collector._calculate_collection_interval(None, None)
+
+        assert collector.gather_since == FULL_SYNC_SINCE
+
+    def test_gathering_since_last_gather(self):
+        last_gather = now() - timedelta(days=1)
+        MetricsCollectionState.objects.create(
+            collector="automation_analytics",
+            last_gather=last_gather,
+            last_gathered_entries={"example1": last_gather.isoformat()},
+        )
+
+        collector = Collector(
+            collector_module=importlib.import_module(__name__),
+            collection_type=Collector.DRY_RUN
+        )
+        collector._calculate_collection_interval(None, None)
+        assert collector.gather_since is None
+        assert collector.last_gather == last_gather
+        assert collector._load_last_gathered_entries() == {"example1": last_gather}
+
+        collector = Collector(
+            collector_module=importlib.import_module(__name__),
+            collection_type=Collector.DRY_RUN,
+            full_sync=True
+        )
+        collector._calculate_collection_interval(None, None)
+        assert collector.gather_since == FULL_SYNC_SINCE
+
+    def test_stale_last_gather_is_full_sync(self):
+        MetricsCollectionState.objects.create(
+            collector="automation_analytics", last_gather=now() - timedelta(weeks=5)
+        )
+        collector = Collector(
+            collector_module=importlib.import_module(__name__),
+            collection_type=Collector.DRY_RUN
+        )
+        collector._calculate_collection_interval(None, None)
+
+        assert collector.gather_since == FULL_SYNC_SINCE
+
+    def test_collection_without_shipped_entry_is_full_sync(self):
+        last_gather = now() - timedelta(days=1)
+        state = MetricsCollectionState.objects.create(
+            collector="automation_analytics",
+            last_gather=last_gather,
+            last_gathered_entries={"bad_csv": last_gather.isoformat()},
+        )
+
+        def gather_since(fnc):
+            collector = Collector(
+                collector_module=importlib.import_module(__name__),
+                collection_type=Collector.DRY_RUN
+            )
+            collector._calculate_collection_interval(None, None)
+            collector.last_gathered_entries = collector._load_last_gathered_entries()
+            assert collector.gather_since is None
+            return collector._create_collection(fnc)._gather_since()
+
+        assert gather_since(bad_csv) == last_gather
+        # never shipped, e.g. its first upload failed
+        assert gather_since(csv_exception) == FULL_SYNC_SINCE
+
+        # last shipped more than 4 weeks ago
+        state.last_gathered_entries = {"bad_csv": (now() - timedelta(weeks=5)).isoformat()}
+        state.save()
+        assert gather_since(bad_csv) == FULL_SYNC_SINCE
+
+    def test_save_watermarks(self):
+        collector = Collector(
+            collector_module=importlib.import_module(__name__),
+            collection_type=Collector.DRY_RUN
+        )
+        collector._calculate_collection_interval(None, None)
+        collector._save_last_gathered_entries({"example1": collector.gather_until})
+        collector._save_last_gather()
+
+        state = MetricsCollectionState.objects.get(collector="automation_analytics")
+        assert state.last_gather == collector.gather_until
+        assert collector._last_gathering() == collector.gather_until
+        assert collector._load_last_gathered_entries() == {"example1": collector.gather_until}
+
     def _test_shipping_error(self):
         collector = Collector(
             collector_module=importlib.import_module(__name__),
@@ -0,0 +1,45 @@
+import uuid
+
+from django.core.management import call_command
+from django.test import TestCase
+from pulpcore.app.models import Task
+from pulpcore.constants import TASK_STATES
+
+from galaxy_ng.app.api.v1.models import LegacyRoleImport
+
+
+class TestBackfillLegacyRoleImportsCommand(TestCase):
+
+    def _create_import(self, **kwargs):
+        task = Task.objects.create(
+            name="galaxy_ng.app.api.v1.tasks.legacy_role_import",
+            state=TASK_STATES.COMPLETED,
+            logging_cid=str(uuid.uuid4()),
+            enc_kwargs=kwargs,
+        )
+        return LegacyRoleImport.objects.create(task=task, messages=[])
+
+    def test_backfill(self):
+        imp = self._create_import(
+            github_user="alice", github_repo="ansible-role-web", github_reference="v1.0.0"
+        )
+        other = self._create_import(github_user="bob", github_repo="ansible-role-db")
+
+        call_command("backfill-legacy-role-imports", batch_size=1)
+
+        imp.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(imp.github_user, "alice")
+        self.assertEqual(imp.github_repo, "ansible-role-web")
+        self.assertEqual(imp.github_reference, "v1.0.0")
+        self.assertEqual(other.github_user, "bob")
+        self.assertIsNone(other.github_reference)
+
+    def test_filled_rows_are_skipped(self):
+        imp = self._create_import(github_user="alice", github_repo="ansible-role-web")
+        LegacyRoleImport.objects.filter(pk=imp.pk).update(github_user="carol")
+
+        call_command("backfill-legacy-role-imports")
+
+        imp.refresh_from_db()
+        self.assertEqual(imp.github_user, "carol")
@@ -0,0 +1,107 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+import requests
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from pulp_ansible.app.models import Collection, CollectionDownloadCount
+
+from galaxy_ng.app.models import SearchDocument
+
+UPSTREAM_COUNTS = {
+    ("community", "general"): 100,
+    ("community", "docker"): 50,
+    ("ansible", "posix"): 30,
+    ("larrymou9", "skipped"): 10,
+}
+
+
+def _upstream_get(url, params=None, **kwargs):
+    response = mock.Mock()
+    count = UPSTREAM_COUNTS.get((params["namespace"], params["name"]))
+    if count is None:
+        response.json.return_value = {"data": {}}
+    else:
+        response.json.return_value = {
+            "data": {"collection": {"id": 1, "download_count": count}}
+        }
+    return response
+
+
+class TestSyncCollectionDownloadCounts(TestCase):
+
+    def setUp(self):
+        for namespace, name in [*UPSTREAM_COUNTS, ("ansible", "missing")]:
+            Collection.objects.create(namespace=namespace, name=name)
+
+    def _call(self, *args):
+        out = StringIO()
+        with mock.patch.object(requests.Session, "get", side_effect=_upstream_get) as get:
+            call_command("sync-collection-download-counts", *args, stdout=out)
+        return get, out.getvalue()
+
+    def _counts(self):
+        return {
+            (namespace, name): count
+            for namespace, name, count in CollectionDownloadCount.objects.values_list(
+                "namespace", "name", "download_count"
+            )
+        }
+
+    def test_create_and_update_counts(self):
+        CollectionDownloadCount.objects.create(
+            namespace="community", name="general", download_count=10
+        )
+        CollectionDownloadCount.objects.create(
+            namespace="community", name="docker", download_count=80
+        )
+        CollectionDownloadCount.objects.filter(namespace="community").update(
+            pulp_last_updated=timezone.now() - timedelta(days=2)
+        )
+
+        get, out = self._call()
+
+        assert get.call_count == 4
+        assert self._counts() == {
+            ("community", "general"): 100,
+            # counts are never lowered
+            ("community", "docker"): 80,
+            ("ansible", "posix"): 30,
+        }
+        assert "1 created, 1 updated, 1 failed, 1 skipped" in out
+
+    def test_recently_synced_counts_are_skipped(self):
+        CollectionDownloadCount.objects.create(
+            namespace="community", name="general", download_count=10
+        )
+
+        get, _ = self._call()
+        assert get.call_count == 3
+        assert self._counts()[("community", "general")] == 10
+
+        get, _ = self._call("--force")
+        assert get.call_count == 4
+        assert self._counts()[("community", "general")] == 100
+
+    def test_search_documents_are_updated(self):
+        for namespace, name in [("community", "general"), ("ansible", "posix")]:
+            SearchDocument.objects.create(
+                content_type="collection",
+                collection=Collection.objects.get(namespace=namespace, name=name),
+                namespace_name=namespace,
+                name=name,
+            )
+        CollectionDownloadCount.objects.create(
+            namespace="community", name="general", download_count=10
+        )
+        CollectionDownloadCount.objects.filter(namespace="community").update(
+            pulp_last_updated=timezone.now() - timedelta(days=2)
+        )
+
+        self._call()
+
+        assert dict(
+            SearchDocument.objects.values_list("name", "download_count")
+        ) == {"general": 100, "posix": 30}
@@ -1,7 +1,9 @@
+from datetime import UTC, datetime
 from unittest.mock import Mock, patch
 from django.test import TestCase
 
 from galaxy_ng.app.metrics_collection.automation_analytics import data
+from galaxy_ng.app.metrics_collection.common_data import FULL_SYNC_SINCE
 
 
 class TestAutomationAnalyticsData(TestCase):
@@ -37,9 +39,44 @@ class TestAutomationAnalyticsData(TestCase):
         result = data.collections(since=None, full_path='/tmp', until=None)
 
         mock_query.assert_called_once()
-        mock_export.assert_called_once_with('/tmp', 'collections', "SELECT * FROM collections")
+        mock_export.assert_called_once_with(
+            '/tmp', 'collections', "SELECT * FROM collections", None
+        )
         assert result == ['file1.csv', 'file2.csv']
 
+    @patch('galaxy_ng.app.metrics_collection.automation_analytics.data.export_to_csv')
+    @patch(
+        'galaxy_ng.app.metrics_collection.automation_analytics.data.data.collections_query'
+    )
+    def test_collections_changed_since(self, mock_query, mock_export):
+        mock_query.return_value = "SELECT * FROM collections"
+        since = datetime(2024, 1, 1, tzinfo=UTC)
+        until = datetime(2024, 1, 2, tzinfo=UTC)
+
+        data.collections(since=since, full_path='/tmp', until=until)
+
+        mock_export.assert_called_once_with(
+            '/tmp',
+            'collections',
+            'SELECT * FROM (SELECT * FROM collections) AS changed '
+            'WHERE "pulp_last_updated" > %(since)s AND "pulp_last_updated" <= %(until)s',
+            {'since': since, 'until': until},
+        )
+
+    @patch('galaxy_ng.app.metrics_collection.automation_analytics.data.export_to_csv')
+    @patch(
+        'galaxy_ng.app.metrics_collection.automation_analytics.data.data'
+        '.collection_downloads_query'
+    )
+    def test_collection_download_logs_full_sync(self, mock_query, mock_export):
+        mock_query.return_value = "SELECT * FROM downloads"
+
+        data.collection_download_logs(since=FULL_SYNC_SINCE, full_path='/tmp', until=None)
+
+        mock_export.assert_called_once_with(
+            '/tmp', 'collection_download_logs', "SELECT * FROM downloads", None
+        )
+
     @patch('galaxy_ng.app.metrics_collection.automation_analytics.data.export_to_csv')
     @patch(
         'galaxy_ng.app.metrics_collection.automation_analytics.data.data'
@@ -49,7 +86,9 @@ class TestAutomationAnalyticsData(TestCase):
         mock_query.return_value = "SELECT * FROM collection_versions"
         mock_export.return_value = ['versions.csv']
 
-        result = data.collection_versions(since=None, full_path='/tmp', until=None)
+        # always a full sync, is_highest changes don't update pulp_last_updated
+        since = datetime(2024, 1, 1, tzinfo=UTC)
+        result = data.collection_versions(since=since, full_path='/tmp', until=None)
 
         mock_query.assert_called_once()
         mock_export.assert_called_once_with(
@@ -70,7 +109,7 @@ class TestAutomationAnalyticsData(TestCase):
 
         mock_query.assert_called_once()
         mock_export.assert_called_once_with(
-            '/tmp', 'collection_version_tags', "SELECT * FROM version_tags"
+            '/tmp', 'collection_version_tags', "SELECT * FROM version_tags", None
         )
         assert result == ['tags.csv']
 
@@ -85,7 +124,7 @@ class TestAutomationAnalyticsData(TestCase):
         result = data.collection_tags(since=None, full_path='/tmp')
 
         mock_query.assert_called_once()
-        mock_export.assert_called_once_with('/tmp', 'collection_tags', "SELECT * FROM tags")
+        mock_export.assert_called_once_with('/tmp', 'collection_tags', "SELECT * FROM tags", None)
         assert result == ['collection_tags.csv']
 
     @patch('galaxy_ng.app.metrics_collection.automation_analytics.data.export_to_csv')
@@ -101,7 +140,7 @@ class TestAutomationAnalyticsData(TestCase):
 
         mock_query.assert_called_once()
         mock_export.assert_called_once_with(
-            '/tmp', 'collection_version_signatures', "SELECT * FROM signatures"
+            '/tmp', 'collection_version_signatures', "SELECT * FROM signatures", None
         )
         assert result == ['signatures.csv']
 
@@ -116,7 +155,9 @@ class TestAutomationAnalyticsData(TestCase):
         result = data.signing_services(since=None, full_path='/tmp')
 
         mock_query.assert_called_once()
-        mock_export.assert_called_once_with('/tmp', 'signing_services', "SELECT * FROM signing")
+        mock_export.assert_called_once_with(
+            '/tmp', 'signing_services', "SELECT * FROM signing", None
+        )
         assert result == ['signing.csv']
 
     @patch('galaxy_ng.app.metrics_collection.automation_analytics.data.export_to_csv')
@@ -132,7 +173,7 @@ class TestAutomationAnalyticsData(TestCase):
 
         mock_query.assert_called_once()
         mock_export.assert_called_once_with(
-            '/tmp', 'collection_download_logs', "SELECT * FROM downloads"
+            '/tmp', 'collection_download_logs', "SELECT * FROM downloads", None
         )
         assert result == ['downloads.csv']
 
@@ -149,7 +190,7 @@ class TestAutomationAnalyticsData(TestCase):
 
         mock_query.assert_called_once()
         mock_export.assert_called_once_with(
-            '/tmp', 'collection_download_counts', "SELECT * FROM counts"
+            '/tmp', 'collection_download_counts', "SELECT * FROM counts", None
         )
         assert result == ['counts.csv']
 
@@ -164,7 +205,7 @@ class TestCSVUtilities(TestCase):
         result = data._get_csv_splitter('/tmp/test.csv')
 
         mock_splitter.assert_called_once_with(
-            filespec='/tmp/test.csv', max_file_size=209715200
+            filespec='/tmp/test.csv', max_file_size=209715200, compression=None
         )
         assert result == mock_instance
 
@@ -175,7 +216,9 @@ class TestCSVUtilities(TestCase):
 
         result = data._get_csv_splitter('/tmp/test.csv', max_data_size=1024)
 
-        mock_splitter.assert_called_once_with(filespec='/tmp/test.csv', max_file_size=1024)
+        mock_splitter.assert_called_once_with(
+            filespec='/tmp/test.csv', max_file_size=1024, compression=None
+        )
         assert result == mock_instance
 
     @patch('galaxy_ng.app.metrics_collection.automation_analytics.data._simple_csv')
@@ -190,7 +233,7 @@ class TestCSVUtilities(TestCase):
     ) TO STDOUT WITH CSV HEADER
     """
         mock_simple_csv.assert_called_once_with(
-            '/tmp', 'test_file', expected_copy_query, max_data_size=209715200
+            '/tmp', 'test_file', expected_copy_query, None, max_data_size=209715200
         )
         assert result == ['output.csv']
 
@@ -217,10 +260,10 @@ class TestCSVUtilities(TestCase):
 
         mock_get_path.assert_called_once_with('/tmp', 'test')
         mock_get_splitter.assert_called_once_with('/tmp/test.csv', 209715200)
-        mock_cursor.copy.assert_called_once_with('SELECT * FROM test')
+        mock_cursor.copy.assert_called_once_with('SELECT * FROM test', None)
         assert mock_splitter.write.call_count == 2
-        mock_splitter.write.assert_any_call('data1')
-        mock_splitter.write.assert_any_call('data2')
+        mock_splitter.write.assert_any_call(b'data1')
+        mock_splitter.write.assert_any_call(b'data2')
         assert result == ['test1.csv', 'test2.csv']
 
     @patch('galaxy_ng.app.metrics_collection.automation_analytics.data._get_file_path')
@@ -0,0 +1,135 @@
+import csv
+import gzip
+import io
+import logging
+import os
+import resource
+import tempfile
+import time
+
+import pytest
+
+from galaxy_ng.app.metrics_collection.csv_collection import CsvFileSplitter
+from galaxy_ng.tests.unit.benchmark import benchmark
+
+logger = logging.getLogger(__name__)
+
+HEADER = b"uuid,pulp_created,collection_version_id,ip,org_id,user_agent\n"
+
+
+def _download_log_rows(count):
+    """Synthetic ansible_downloadlog rows as sent by COPY, one row per chunk."""
+    for i in range(count):
+        yield (
+            f"00000000-0000-0000-0000-{i:012d},2024-01-01 00:00:00+00,"
+            f"11111111-1111-1111-1111-{i % 5000:012d},10.0.{i % 256}.{i % 200},"
+            f'{i % 1000},"ansible-galaxy/2.16 (Linux; python:3.11) ""ünïcode"""\n'
+        ).encode()
+
+
+def _read_rows(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        return list(csv.reader(io.StringIO(f.read().decode("utf-8"))))
+
+
+@pytest.fixture
+def filespec():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        yield os.path.join(tmp_dir, "collection_download_logs.csv")
+
+
+class TestCsvFileSplitter:
+
+    @pytest.mark.parametrize("compression", [None, "gzip"])
+    def test_splits_on_row_boundaries(self, filespec, compression):
+        rows = [HEADER, *_download_log_rows(2000)]
+        rows.append('9,"multi\nline ""quoted"" ünïcode",x,y,z,w\n'.encode())
+        payload = b"".join(rows)
+
+        splitter = CsvFileSplitter(filespec, max_file_size=4096, compression=compression)
+        # chunks not aligned on rows nor on utf-8 characters
+        for start in range(0, len(payload), 1000):
+            splitter.write(memoryview(payload[start:start + 1000]))
+        files = splitter.file_list()
+
+        written = []
+        for path in files:
+            file_rows = _read_rows(path)
+            assert file_rows[0] == HEADER.decode().strip().split(",")
+            written.extend(file_rows[1:])
+
+        expected = list(csv.reader(io.StringIO(payload.decode("utf-8"))))[1:]
+        assert written == expected
+        if compression is None:
+            assert len(files) > 1
+            # at most one row over the limit
+            assert all(os.path.getsize(path) < 4096 + 200 for path in files)
+        else:
+            assert all(path.endswith(".gz") for path in files)
+
+    def test_single_file_has_no_split_suffix(self, filespec):
+        splitter = CsvFileSplitter(filespec)
+        splitter.write(HEADER)
+        splitter.write(b"1,2,3,4,5,6\n")
+
+        assert splitter.file_list() == [filespec]
+
+    def test_empty_dump(self, filespec):
+        splitter = CsvFileSplitter(filespec)
+        splitter.write(HEADER)
+
+        assert splitter.file_list() == []
+        assert not os.path.exists(f"{filespec}_split0")
+
+    def test_unsupported_compression(self, filespec):
+        with pytest.raises(ValueError, match="Unsupported CSV compression"):
+            CsvFileSplitter(filespec, compression="lzma")
+
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_csv_splitter_many_files(filespec, compression):
+    """Stream download log rows one per chunk into many files without losing any row."""
+    total = 20_000
+    splitter = CsvFileSplitter(filespec, max_file_size=64 * 1024, compression=compression)
+    splitter.write(HEADER)
+    for row in _download_log_rows(total):
+        splitter.write(row)
+    files = splitter.file_list()
+
+    assert len(files) > 1
+    rows = 0
+    for path in files:
+        file_rows = _read_rows(path)
+        assert file_rows[0] == HEADER.decode().strip().split(",")
+        assert all(len(row) == 6 for row in file_rows[1:])
+        rows += len(file_rows) - 1
+    assert rows == total
+
+
+@benchmark
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_csv_splitter_benchmark(filespec, compression):
+    """Stream 2M download log rows, report the throughput and check the memory stays bounded."""
+    total = 2_000_000
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.monotonic()
+    written = 0
+    splitter = CsvFileSplitter(filespec, max_file_size=64 * 1024 * 1024, compression=compression)
+    splitter.write(HEADER)
+    for row in _download_log_rows(total):
+        splitter.write(row)
+        written += len(row)
+    files = splitter.file_list()
+    elapsed = time.monotonic() - start
+
+    # ru_maxrss is in kilobytes on linux
+    rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+    logger.info(
+        f"csv splitter ({compression}) wrote {total} rows, {written / 2**20:.0f}MB "
+        f"in {len(files)} files: {written / 2**20 / elapsed:.1f}MB/s, "
+        f"peak RSS growth {rss_growth / 1024:.1f}MB"
+    )
+    assert files
+    assert rss_growth < 64 * 1024
@@ -3,16 +3,22 @@ from urllib.parse import urlencode, quote
 
 import pytest
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import DatabaseError, IntegrityError
 from django.http.request import HttpRequest
 from django.test import TestCase
+from pulp_container.app import models as container_models
+
+from galaxy_ng.app import models
 
 from galaxy_ng.app.tasks.index_registry import (
     CouldNotCreateContainerError,
+    CouldNotIndexContainersError,
     _get_request,
     _parse_catalog_repositories,
     _update_distro_readme_and_description,
     create_or_update_remote_container,
     index_execution_environments_from_redhat_registry,
+    index_remote_containers,
     CATALOG_API
 )
 
@@ -376,3 +382,158 @@ class TestIndexExecutionEnvironments(TestCase):
 
         with pytest.raises(ObjectDoesNotExist):
             index_execution_environments_from_redhat_registry(self.registry_pk, self.request_data)
+
+    @patch('galaxy_ng.app.tasks.index_registry.models.ContainerRegistryRemote.objects.get')
+    @patch('galaxy_ng.app.tasks.index_registry.index_remote_containers')
+    @patch('galaxy_ng.app.tasks.index_registry.dispatch')
+    @patch('galaxy_ng.app.tasks.index_registry.json.load')
+    @patch('builtins.open', new_callable=mock_open)
+    def test_index_execution_environments_in_batches(self, mock_file_open, mock_json_load,
+                                                     mock_dispatch, mock_index, mock_registry_get):
+        mock_registry_get.return_value = self.registry
+        self.registry.get_downloader.return_value.fetch.return_value.path = '/tmp/test.json'
+
+        entries = [
+            {
+                'repository': f'test-ee-{i}',
+                'display_data': {'short_description': '', 'long_description_markdown': ''}
+            }
+            for i in range(5)
+        ]
+        mock_json_load.side_effect = [
+            {'data': entries, 'page_size': 10},
+            {'data': [], 'page_size': 10},
+        ]
+        mock_index.side_effect = [[], ['Failed to create container test-ee-4.']]
+
+        with pytest.raises(CouldNotIndexContainersError) as error:
+            index_execution_environments_from_redhat_registry(
+                self.registry_pk, self.request_data, batch_size=3
+            )
+
+        mock_dispatch.assert_not_called()
+        chunks = [[c['name'] for c in call[0][0]] for call in mock_index.call_args_list]
+        self.assertEqual(chunks, [
+            ['test-ee-0', 'test-ee-1', 'test-ee-2'],
+            ['test-ee-3', 'test-ee-4'],
+        ])
+        self.assertEqual(error.value.errors, ['Failed to create container test-ee-4.'])
+
+
+class TestIndexRemoteContainers(TestCase):
+
+    def setUp(self):
+        self.registry = models.ContainerRegistryRemote.objects.create(
+            name="Test Registry", url="https://registry.redhat.io"
+        )
+        self.other_registry = models.ContainerRegistryRemote.objects.create(
+            name="Other Registry", url="https://quay.io"
+        )
+
+    def _create_container(self, name, registry=None, with_remote=True):
+        remote = None
+        if with_remote:
+            remote = container_models.ContainerRemote.objects.create(
+                name=name, url=registry.url if registry else "https://quay.io", upstream_name=name
+            )
+            if registry:
+                models.ContainerRegistryRepos.objects.create(
+                    registry=registry, repository_remote=remote
+                )
+        repository = container_models.ContainerRepository.objects.create(
+            name=name, remote=remote
+        )
+        return container_models.ContainerDistribution.objects.create(
+            name=name, base_path=name, repository=repository, description="old"
+        )
+
+    def _entry(self, name):
+        return {
+            "name": name,
+            "upstream_name": name,
+            "description": f"{name} description",
+            "readme": f"# {name}",
+        }
+
+    @patch('galaxy_ng.app.tasks.index_registry._create_remote_container')
+    def test_errors_are_collected_per_entry(self, mock_create):
+        indexed = self._create_container("indexed", registry=self.registry)
+        models.ContainerDistroReadme.objects.create(container=indexed, text="old")
+        unindexed = self._create_container("unindexed", registry=self.registry)
+        self._create_container("local", with_remote=False)
+        self._create_container("unregistered")
+        other = self._create_container("other", registry=self.other_registry)
+
+        mock_create.side_effect = CouldNotCreateContainerError("new", error="Invalid name")
+
+        errors = index_remote_containers(
+            [self._entry(name) for name in (
+                "indexed", "local", "new", "unindexed", "unregistered", "other"
+            )],
+            self.registry.pk,
+            HttpRequest(),
+        )
+
+        self.assertEqual(len(errors), 3)
+        for name, error in zip(("local", "new", "unregistered"), errors, strict=True):
+            self.assertIn(f"Failed to create container {name}.", str(error))
+
+        for distro in (indexed, unindexed):
+            distro.refresh_from_db()
+            self.assertEqual(distro.description, f"{distro.name} description")
+            self.assertEqual(
+                models.ContainerDistroReadme.objects.get(container=distro).text,
+                f"# {distro.name}",
+            )
+
+        other.refresh_from_db()
+        self.assertEqual(other.description, "old")
+        self.assertFalse(models.ContainerDistroReadme.objects.filter(container=other).exists())
+
+    @patch('galaxy_ng.app.tasks.index_registry._create_remote_container')
+    def test_unexpected_errors_are_collected_per_entry(self, mock_create):
+        def create(container_data, registry_pk, request):
+            distro = self._create_container(container_data['name'], registry=self.registry)
+            if container_data['name'] == "broken":
+                raise IntegrityError("duplicate key value")
+            return distro
+
+        mock_create.side_effect = create
+
+        errors = index_remote_containers(
+            [self._entry(name) for name in ("first", "broken", "last")],
+            self.registry.pk,
+            HttpRequest(),
+        )
+
+        self.assertEqual(len(errors), 1)
+        self.assertIn("Failed to create container broken.", str(errors[0]))
+        self.assertIn("duplicate key value", str(errors[0]))
+        # the savepoint of the failed entry is rolled back
+        self.assertFalse(
+            container_models.ContainerDistribution.objects.filter(base_path="broken").exists()
+        )
+        for name in ("first", "last"):
+            distro = container_models.ContainerDistribution.objects.get(base_path=name)
+            self.assertEqual(distro.description, f"{name} description")
+            self.assertEqual(
+                models.ContainerDistroReadme.objects.get(container=distro).text, f"# {name}"
+            )
+
+    @patch('galaxy_ng.app.tasks.index_registry._update_distro_readme_and_description')
+    @patch('galaxy_ng.app.tasks.index_registry._bulk_update_distro_readmes_and_descriptions')
+    def test_failed_bulk_update_falls_back_per_entry(self, mock_bulk_update, mock_update):
+        for name in ("first", "broken"):
+            self._create_container(name, registry=self.registry)
+        mock_bulk_update.side_effect = DatabaseError("bulk update failed")
+        mock_update.side_effect = [None, DatabaseError("update failed")]
+
+        errors = index_remote_containers(
+            [self._entry(name) for name in ("first", "broken")],
+            self.registry.pk,
+            HttpRequest(),
+        )
+
+        self.assertEqual(mock_update.call_count, 2)
+        self.assertEqual(len(errors), 1)
+        self.assertIn("Failed to create container broken.", str(errors[0]))
@@ -4,6 +4,7 @@ from django.test import TestCase, override_settings
 
 from galaxy_ng.app.tasks.promotion import (
     auto_approve,
+    call_auto_approve_batch_task,
     call_auto_approve_task,
     call_move_content_task
 )
@@ -143,6 +144,39 @@ class TestAutoApprove(TestCase):
         mock_dispatch.assert_not_called()
 
 
+    @patch('galaxy_ng.app.tasks.promotion.AnsibleRepository.objects.filter')
+    @patch('galaxy_ng.app.tasks.promotion.AnsibleRepository.objects.get')
+    @patch('galaxy_ng.app.tasks.promotion.add_and_remove')
+    @patch('galaxy_ng.app.tasks.promotion.dispatch')
+    def test_auto_approve_batch(
+        self, mock_dispatch, mock_add_and_remove, mock_repo_get, mock_repo_filter
+    ):
+        published_queryset = Mock()
+        published_queryset.values_list.return_value = [201, 202]
+        staging_queryset = Mock()
+        staging_queryset.values_list.return_value = [301]
+
+        def filter_side_effect(pulp_labels__pipeline):
+            if pulp_labels__pipeline == "approved":
+                return published_queryset
+            return staging_queryset
+
+        mock_repo_filter.side_effect = filter_side_effect
+        mock_repo_get.return_value = self.source_repo
+        self.source_repo.pk = 301
+
+        auto_approve(self.src_repo_pk, cv_pk_list=["cv-1", "cv-2"], ns_pk_list=[self.ns_pk])
+
+        # a single repository version for the whole batch
+        mock_add_and_remove.assert_called_once_with(
+            self.src_repo_pk,
+            add_content_units=["cv-1", "cv-2", self.ns_pk],
+            remove_content_units=[]
+        )
+        mock_dispatch.assert_called_once()
+        self.assertEqual(mock_dispatch.call_args[1]['kwargs']['cv_pk_list'], ["cv-1", "cv-2"])
+
+
 class TestCallAutoApproveTask(TestCase):
 
     def setUp(self):
@@ -171,9 +205,9 @@ class TestCallAutoApproveTask(TestCase):
         self.assertEqual(call_args[1]['exclusive_resources'], [self.repo])
         self.assertEqual(call_args[1]['task_group'], mock_task_group)
         self.assertEqual(call_args[1]['kwargs'], {
-            'cv_pk': 'cv-pk',
+            'cv_pk_list': ['cv-pk'],
             'src_repo_pk': 123,
-            'ns_pk': 'ns-pk'
+            'ns_pk_list': ['ns-pk']
         })
 
         mock_task_group.finish.assert_called_once()
@@ -189,9 +223,31 @@ class TestCallAutoApproveTask(TestCase):
 
         call_auto_approve_task(self.collection_version, self.repo, None)
 
-        # Check that ns_pk is passed as None
+        # Check that no namespace is added
         call_args = mock_dispatch.call_args
-        self.assertEqual(call_args[1]['kwargs']['ns_pk'], None)
+        self.assertEqual(call_args[1]['kwargs']['ns_pk_list'], [])
+
+    @patch('galaxy_ng.app.tasks.promotion.TaskGroup.current')
+    @patch('galaxy_ng.app.tasks.promotion.dispatch')
+    def test_call_auto_approve_batch_task(self, mock_dispatch, mock_task_group_current):
+        mock_task_group = Mock()
+        mock_task_group_current.return_value = mock_task_group
+        other_version = Mock()
+        other_version.pk = "other-cv-pk"
+
+        call_auto_approve_batch_task(
+            [self.collection_version, other_version], self.repo, [self.ns_pk]
+        )
+
+        mock_dispatch.assert_called_once()
+        call_args = mock_dispatch.call_args
+        self.assertEqual(call_args[1]['exclusive_resources'], [self.repo])
+        self.assertEqual(call_args[1]['kwargs'], {
+            'cv_pk_list': ['cv-pk', 'other-cv-pk'],
+            'src_repo_pk': 123,
+            'ns_pk_list': ['ns-pk']
+        })
+        mock_task_group.finish.assert_called_once()
 
 
 class TestCallMoveContentTask(TestCase):
@@ -0,0 +1,83 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from pulp_container.app import models as container_models
+from pulpcore.plugin.constants import TASK_STATES
+from pulpcore.plugin.models import Task
+
+from galaxy_ng.app import models
+from galaxy_ng.app.tasks import registry_sync
+
+SYNC_TASK_NAME = "pulp_container.app.tasks.synchronize.synchronize"
+
+
+@override_settings(GALAXY_CONTAINER_REGISTRY_SYNC_CONCURRENCY=2)
+class TestSyncAllReposInRegistry(TestCase):
+
+    def setUp(self):
+        self.registry = models.ContainerRegistryRemote.objects.create(
+            name="Test Registry",
+            url="https://quay.io",
+            username="foo",
+        )
+        self.repositories = {}
+        for name in ("recent", "never_synced", "old", "syncing"):
+            remote = container_models.ContainerRemote.objects.create(
+                name=name, url="https://quay.io", upstream_name=name
+            )
+            models.ContainerRegistryRepos.objects.create(
+                registry=self.registry, repository_remote=remote
+            )
+            self.repositories[name] = container_models.ContainerRepository.objects.create(
+                name=name, remote=remote
+            )
+
+        now = timezone.now()
+        for name, finished_at in (
+            ("recent", now - timedelta(hours=1)),
+            ("old", now - timedelta(days=2)),
+            ("syncing", now - timedelta(days=3)),
+        ):
+            remote = self.repositories[name].remote
+            Task.objects.create(
+                name=SYNC_TASK_NAME,
+                state=TASK_STATES.COMPLETED,
+                finished_at=finished_at,
+                reserved_resources_record=[f"shared:prn:container.containerremote:{remote.pk}"],
+            )
+        Task.objects.create(
+            name=SYNC_TASK_NAME,
+            state=TASK_STATES.WAITING,
+            reserved_resources_record=[
+                f"prn:container.containerrepository:{self.repositories['syncing'].pk}"
+            ],
+        )
+
+    def test_sync_wave(self):
+        with mock.patch.object(registry_sync, "dispatch") as dispatch:
+            summary = registry_sync.sync_all_repos_in_registry(self.registry.pk)
+
+        assert summary == {"dispatched": 3, "skipped": 1, "concurrency": 2}
+        synced = [call.kwargs["kwargs"]["repository_pk"] for call in dispatch.call_args_list]
+        assert synced == [
+            str(self.repositories[name].pk) for name in ("never_synced", "old", "recent")
+        ]
+
+        slots = [call.kwargs["exclusive_resources"][1] for call in dispatch.call_args_list]
+        assert slots == [
+            f"galaxy:container-registry:{self.registry.pk}:sync-slot-{i}" for i in (0, 1, 0)
+        ]
+
+    def test_remote_saved_only_when_changed(self):
+        remote = container_models.ContainerRemote.objects.get(name="recent")
+
+        changed = registry_sync.update_remote_connection_fields(remote, self.registry)
+        assert "username" in changed
+        remote.refresh_from_db()
+        assert remote.username == "foo"
+
+        with mock.patch.object(container_models.ContainerRemote, "save") as save:
+            assert registry_sync.update_remote_connection_fields(remote, self.registry) == []
+        save.assert_not_called()
@@ -0,0 +1,218 @@
+import time
+from unittest.mock import patch
+
+import fakeredis
+import redis
+from django.test import TestCase, override_settings
+
+from galaxy_ng.app.common import metrics
+from galaxy_ng.app.models.config import Setting
+from galaxy_ng.app.tasks import settings_cache
+
+
+def _count(counter):
+    return counter._value.get()
+
+
+@override_settings(GALAXY_SETTINGS_LOCAL_CACHE_TTL=60, GALAXY_SETTINGS_PUBSUB_ENABLED=False)
+class TestLocalSettingsCache(TestCase):
+
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis(decode_responses=True)
+        patcher = patch.object(settings_cache, "conn", self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        settings_cache.local_cache.clear()
+        self.addCleanup(settings_cache.local_cache.clear)
+
+    def test_update_bumps_version(self):
+        settings_cache.update_setting_cache({"FOO": "bar"})
+        settings_cache.update_setting_cache({"FOO": "baz"})
+        assert self.redis.get(settings_cache.VERSION_KEY) == "2"
+        assert self.redis.hgetall(settings_cache.CACHE_KEY) == {"FOO": "baz"}
+
+    def test_hits_within_ttl(self):
+        settings_cache.update_setting_cache({"FOO": "bar"})
+        hits = _count(metrics.dynamic_settings_cache_hits)
+        misses = _count(metrics.dynamic_settings_cache_misses)
+
+        assert settings_cache.get_settings_from_cache() == {"FOO": "bar"}
+        with patch.object(self.redis, "hgetall") as hgetall, \
+                patch.object(self.redis, "get") as get:
+            for _ in range(5):
+                assert settings_cache.get_settings_from_cache() == {"FOO": "bar"}
+            hgetall.assert_not_called()
+            get.assert_not_called()
+
+        assert _count(metrics.dynamic_settings_cache_misses) == misses + 1
+        assert _count(metrics.dynamic_settings_cache_hits) == hits + 5
+
+    @override_settings(GALAXY_SETTINGS_LOCAL_CACHE_TTL=0)
+    def test_revalidates_with_version_key(self):
+        settings_cache.update_setting_cache({"FOO": "bar"})
+        settings_cache.get_settings_from_cache()
+        revalidations = _count(metrics.dynamic_settings_cache_revalidations)
+
+        with patch.object(self.redis, "hgetall") as hgetall:
+            assert settings_cache.get_settings_from_cache() == {"FOO": "bar"}
+            hgetall.assert_not_called()
+        assert _count(metrics.dynamic_settings_cache_revalidations) == revalidations + 1
+
+    @override_settings(GALAXY_SETTINGS_LOCAL_CACHE_TTL=0)
+    def test_reloads_when_version_changes(self):
+        settings_cache.update_setting_cache({"FOO": "bar"})
+        assert settings_cache.get_settings_from_cache() == {"FOO": "bar"}
+
+        # another process updates the cache
+        self.redis.hset(settings_cache.CACHE_KEY, mapping={"FOO": "baz"})
+        self.redis.incr(settings_cache.VERSION_KEY)
+
+        assert settings_cache.get_settings_from_cache() == {"FOO": "baz"}
+
+    def test_update_clears_local_copy(self):
+        settings_cache.update_setting_cache({"FOO": "bar"})
+        assert settings_cache.get_settings_from_cache() == {"FOO": "bar"}
+        settings_cache.update_setting_cache({"FOO": "baz"})
+        assert settings_cache.get_settings_from_cache() == {"FOO": "baz"}
+
+    def test_update_only_changed_keys(self):
+        settings_cache.update_setting_cache({"FOO": "bar", "BAR": "1", "GONE": "x"})
+        self.redis.hset(settings_cache.CACHE_KEY, "BAR", "untouched")
+
+        settings_cache.update_setting_cache({"FOO": "baz", "BAR": "1"}, keys=["FOO", "GONE"])
+        assert self.redis.hgetall(settings_cache.CACHE_KEY) == {"FOO": "baz", "BAR": "untouched"}
+        assert self.redis.get(settings_cache.VERSION_KEY) == "2"
+
+    def test_update_missing_hash_is_rewritten(self):
+        settings_cache.update_setting_cache({"FOO": "bar", "BAR": "1"})
+        self.redis.delete(settings_cache.CACHE_KEY)
+
+        settings_cache.update_setting_cache({"FOO": "baz", "BAR": "1"}, keys=["FOO"])
+        assert self.redis.hgetall(settings_cache.CACHE_KEY) == {"FOO": "baz", "BAR": "1"}
+
+    def test_update_retries_when_hash_changes(self):
+        settings_cache.update_setting_cache({"FOO": "bar", "BAR": "1"})
+
+        # the hash expires between the existence check and the write
+        watch = redis.client.Pipeline.watch
+        calls = []
+
+        def watch_then_expire(pipe, *names):
+            result = watch(pipe, *names)
+            calls.append(names)
+            if len(calls) == 1:
+                self.redis.delete(settings_cache.CACHE_KEY)
+            return result
+
+        with patch.object(redis.client.Pipeline, "watch", watch_then_expire):
+            settings_cache.update_setting_cache({"FOO": "baz", "BAR": "1"}, keys=["FOO"])
+
+        # never a partial hash holding only FOO
+        assert self.redis.hgetall(settings_cache.CACHE_KEY) == {"FOO": "baz", "BAR": "1"}
+        assert self.redis.get(settings_cache.VERSION_KEY) == "2"
+        assert len(calls) == 2
+
+
+def _wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestSettingsInvalidation(TestCase):
+    """Two workers sharing one Redis converge through the pub/sub channel."""
+
+    def setUp(self):
+        server = fakeredis.FakeServer()
+        self.redis = fakeredis.FakeRedis(server=server, decode_responses=True)
+        patcher = patch.object(settings_cache, "conn", self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.workers = []
+        for _ in range(2):
+            worker_conn = fakeredis.FakeRedis(server=server, decode_responses=True)
+            cache = settings_cache.LocalSettingsCache()
+            listener = settings_cache.SettingsInvalidationListener(cache)
+            self.addCleanup(listener.stop)
+            self.workers.append((worker_conn, cache, listener))
+
+        settings_cache.update_setting_cache({"FOO": "bar", "BAR": "1"})
+        for worker_conn, cache, listener in self.workers:
+            assert listener.start(worker_conn)
+            assert cache.get(worker_conn, ttl=60) == {"FOO": "bar", "BAR": "1"}
+
+    def _converged(self, expected):
+        return all(
+            cache.data == expected and cache.checked_at
+            for __, cache, __ in self.workers
+        )
+
+    def test_changed_keys_are_applied(self):
+        misses = _count(metrics.dynamic_settings_cache_misses)
+
+        settings_cache.update_setting_cache({"FOO": "baz", "BAR": "1"}, keys=["FOO"])
+        assert _wait_for(lambda: self._converged({"FOO": "baz", "BAR": "1"}))
+
+        settings_cache.update_setting_cache({"FOO": "baz"}, keys=["BAR"])
+        assert _wait_for(lambda: self._converged({"FOO": "baz"}))
+
+        for worker_conn, cache, __ in self.workers:
+            with patch.object(worker_conn, "get") as get:
+                assert cache.get(worker_conn, ttl=60) == {"FOO": "baz"}
+                get.assert_not_called()
+            assert cache.version == "3"
+        assert _count(metrics.dynamic_settings_cache_misses) == misses
+
+    def test_full_rewrite_expires_copy(self):
+        settings_cache.update_setting_cache({"FOO": "qux"})
+        assert _wait_for(lambda: all(not cache.checked_at for __, cache, __ in self.workers))
+        for worker_conn, cache, __ in self.workers:
+            assert cache.get(worker_conn, ttl=60) == {"FOO": "qux"}
+
+    def test_missed_notification_expires_copy(self):
+        # a change that was never published
+        self.redis.hset(settings_cache.CACHE_KEY, "FOO", "lost")
+        self.redis.incr(settings_cache.VERSION_KEY)
+
+        settings_cache.update_setting_cache({"FOO": "lost", "BAR": "2"}, keys=["BAR"])
+        assert _wait_for(lambda: all(not cache.checked_at for __, cache, __ in self.workers))
+        for worker_conn, cache, __ in self.workers:
+            assert cache.get(worker_conn, ttl=60) == {"FOO": "lost", "BAR": "2"}
+
+
+class TestLocalDbSettingsCache(TestCase):
+
+    def setUp(self):
+        Setting.objects.all().delete()
+        settings_cache.local_db_cache.clear()
+        self.addCleanup(settings_cache.local_db_cache.clear)
+
+    @override_settings(GALAXY_SETTINGS_LOCAL_CACHE_TTL=60)
+    def test_hits_within_ttl(self):
+        Setting.objects.create(key="FOO", value="bar")
+        assert settings_cache.get_settings_from_db() == {"FOO": "bar"}
+
+        with patch.object(Setting, "as_dict") as as_dict, \
+                self.assertNumQueries(0):
+            for _ in range(5):
+                assert settings_cache.get_settings_from_db() == {"FOO": "bar"}
+        as_dict.assert_not_called()
+
+    @override_settings(GALAXY_SETTINGS_LOCAL_CACHE_TTL=0)
+    def test_revalidates_with_latest_setting(self):
+        Setting.objects.create(key="FOO", value="bar")
+        assert settings_cache.get_settings_from_db() == {"FOO": "bar"}
+
+        with patch.object(Setting, "as_dict") as as_dict:
+            assert settings_cache.get_settings_from_db() == {"FOO": "bar"}
+        as_dict.assert_not_called()
+
+        Setting.objects.create(key="FOO", value="baz")
+        assert settings_cache.get_settings_from_db() == {"FOO": "baz"}
+
+        Setting.objects.filter(key="FOO").latest("version").delete()
+        assert settings_cache.get_settings_from_db() == {"FOO": "bar"}
@@ -1,6 +1,7 @@
 import logging
 import os
 import tempfile
+from unittest.mock import Mock, patch
 
 from django.conf import settings
 from django.test import TestCase, override_settings
@@ -10,7 +11,12 @@ from pulp_ansible.app.models import (
 )
 from pulpcore.plugin.models import Artifact, ContentArtifact, PulpTemporaryFile
 
-from galaxy_ng.app.tasks.publishing import _log_collection_upload
+from galaxy_ng.app.models import Namespace
+from galaxy_ng.app.tasks.publishing import (
+    _log_collection_upload,
+    get_namespace_metadata_pks,
+    import_to_staging,
+)
 
 log = logging.getLogger(__name__)
 logging.getLogger().setLevel(logging.DEBUG)
@@ -53,3 +59,32 @@ class TestTaskPublish(TestCase):
                 "INFO:automated_logging:Collection uploaded by user 'admin': namespace-name-0.0.1",
                 lm.output
             )
+
+    def test_get_namespace_metadata_pks(self):
+        Namespace.objects.create(name='my_ns')
+        Namespace.objects.create(name='other_ns')
+        with self.assertNumQueries(1):
+            ns_pks = get_namespace_metadata_pks([self.collection_version])
+        self.assertEqual(ns_pks, {'my_ns': None})
+
+    @patch('galaxy_ng.app.tasks.publishing.dispatch')
+    @patch('galaxy_ng.app.tasks.publishing.get_created_collection_versions')
+    @patch('galaxy_ng.app.tasks.publishing._upload_collection')
+    def test_import_to_staging_dispatches_once(self, mock_upload, mock_created, mock_dispatch):
+        Namespace.objects.create(name='my_ns')
+        other_version = CollectionVersion.objects.create(
+            collection=self.collection_version.collection,
+            version='2.0.0',
+        )
+        repo = Mock(pk='repo-pk')
+        mock_upload.return_value = repo
+        mock_created.return_value = [self.collection_version, other_version]
+
+        import_to_staging('admin')
+
+        mock_dispatch.assert_called_once()
+        kwargs = mock_dispatch.call_args[1]['kwargs']
+        self.assertEqual(
+            set(kwargs['add_content_units']), {self.collection_version.pk, other_version.pk}
+        )
+        self.assertEqual(kwargs['repository_pk'], 'repo-pk')
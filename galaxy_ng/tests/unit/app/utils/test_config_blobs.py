@@ -0,0 +1,101 @@
+import json
+from unittest import mock
+
+import fakeredis
+from django.test import TestCase
+
+from galaxy_ng.app.common import metrics
+from galaxy_ng.app.tasks import settings_cache
+from galaxy_ng.app.utils import config_blobs
+
+
+def _count(counter):
+    return counter._value.get()
+
+
+def _config_blob(digest, config):
+    blob = mock.Mock(digest=digest)
+    blob.data = json.dumps(config).encode()
+    return blob
+
+
+class TestLRUCache(TestCase):
+
+    def test_evicts_least_recently_used(self):
+        lru = config_blobs.LRUCache(max_size=10)
+        lru.set("a", 1, 4)
+        lru.set("b", 2, 4)
+        assert lru.get("a") == 1
+
+        evictions = _count(metrics.config_blob_cache_evictions)
+        lru.set("c", 3, 4)
+        assert lru.get("b") is None
+        assert lru.get("a") == 1
+        assert lru.get("c") == 3
+        assert lru.size == 8
+        assert _count(metrics.config_blob_cache_evictions) == evictions + 1
+
+    def test_replace_and_oversized_values(self):
+        lru = config_blobs.LRUCache(max_size=10)
+        lru.set("a", 1, 4)
+        lru.set("a", 2, 6)
+        assert lru.get("a") == 2
+        assert lru.size == 6
+
+        lru.set("big", 3, 11)
+        assert lru.get("big") is None
+        assert len(lru) == 1
+
+
+class TestConfigBlobCache(TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(
+            config_blobs, "local_cache", config_blobs.LRUCache(max_size=1024)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        read_patcher = mock.patch.object(
+            config_blobs, "_read_config_blob", side_effect=lambda blob: blob.data
+        )
+        self.read = read_patcher.start()
+        self.addCleanup(read_patcher.stop)
+        self.redis = fakeredis.FakeRedis(decode_responses=True)
+        redis_patcher = mock.patch.object(
+            settings_cache, "get_redis_connection", return_value=self.redis
+        )
+        redis_patcher.start()
+        self.addCleanup(redis_patcher.stop)
+
+    def test_storage_is_read_once(self):
+        blob = _config_blob("sha256:aaa", {"architecture": "amd64"})
+        misses = _count(metrics.config_blob_cache_misses)
+        local_hits = _count(metrics.config_blob_cache_hits.labels(cache="local"))
+
+        for _ in range(3):
+            assert config_blobs.get_config_blob_json(blob) == {"architecture": "amd64"}
+
+        self.read.assert_called_once_with(blob)
+        assert _count(metrics.config_blob_cache_misses) == misses + 1
+        assert _count(metrics.config_blob_cache_hits.labels(cache="local")) == local_hits + 2
+
+    def test_shared_cache(self):
+        blob = _config_blob("sha256:bbb", {"os": "linux"})
+        config_blobs.get_config_blob_json(blob)
+        shared_hits = _count(metrics.config_blob_cache_hits.labels(cache="shared"))
+
+        # another process has an empty local cache
+        config_blobs.local_cache.clear()
+        assert config_blobs.get_config_blob_json(blob) == {"os": "linux"}
+
+        self.read.assert_called_once_with(blob)
+        assert _count(metrics.config_blob_cache_hits.labels(cache="shared")) == shared_hits + 1
+        assert self.redis.ttl(f"{config_blobs.CONFIG_BLOB_CACHE_KEY_PREFIX}:sha256:bbb") > 0
+
+    def test_without_redis(self):
+        blob = _config_blob("sha256:ccc", {"os": "linux"})
+        with mock.patch.object(settings_cache, "get_redis_connection", return_value=None):
+            assert config_blobs.get_config_blob_json(blob) == {"os": "linux"}
+            config_blobs.local_cache.clear()
+            assert config_blobs.get_config_blob_json(blob) == {"os": "linux"}
+        assert self.read.call_count == 2
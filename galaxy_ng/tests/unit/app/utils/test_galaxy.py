@@ -1,8 +1,17 @@
+import json
+import threading
+import time
 import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch, Mock
+from urllib.parse import parse_qs, urlparse
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from galaxy_ng.app.utils.galaxy import (
+    FetchOnce,
+    fetch_concurrently,
+    upstream_collection_iterator,
+    upstream_namespace_iterator,
     upstream_role_iterator,
     uuid_to_int,
     int_to_uuid,
@@ -66,45 +75,265 @@ class TestGenerateUnverifiedEmail(TestCase):
         assert result == "67890@GALAXY.GITHUB.UNVERIFIED.COM"
 
 
+@override_settings(GALAXY_UPSTREAM_RATE_LIMIT=0)
 class TestSafeFetch(TestCase):
 
-    @patch('galaxy_ng.app.utils.galaxy.requests.get')
+    @patch('galaxy_ng.app.utils.galaxy.get_session')
     @patch('galaxy_ng.app.utils.galaxy.time.sleep')
-    def test_safe_fetch_success(self, mock_sleep, mock_get):
+    def test_safe_fetch_success(self, mock_sleep, mock_get_session):
         mock_response = Mock()
         mock_response.status_code = 200
+        mock_get = mock_get_session.return_value.get
         mock_get.return_value = mock_response
 
         result = safe_fetch('http://example.com')
         assert result == mock_response
-        mock_get.assert_called_once_with('http://example.com')
+        mock_get.assert_called_once_with('http://example.com', timeout=60)
         mock_sleep.assert_not_called()
 
-    @patch('galaxy_ng.app.utils.galaxy.requests.get')
+    @patch('galaxy_ng.app.utils.galaxy.get_session')
     @patch('galaxy_ng.app.utils.galaxy.time.sleep')
-    def test_safe_fetch_retry_on_server_error(self, mock_sleep, mock_get):
+    def test_safe_fetch_retry_on_server_error(self, mock_sleep, mock_get_session):
         mock_response_fail = Mock()
         mock_response_fail.status_code = 500
+        mock_response_fail.headers = {}
         mock_response_success = Mock()
         mock_response_success.status_code = 200
+        mock_get = mock_get_session.return_value.get
         mock_get.side_effect = [mock_response_fail, mock_response_success]
 
         result = safe_fetch('http://example.com')
         assert result == mock_response_success
         assert mock_get.call_count == 2
-        mock_sleep.assert_called_once_with(60)
+        mock_sleep.assert_called_once()
+        # first retry waits up to the base backoff
+        assert 0 <= mock_sleep.call_args[0][0] <= 1
 
-    @patch('galaxy_ng.app.utils.galaxy.requests.get')
+    @patch('galaxy_ng.app.utils.galaxy.get_session')
     @patch('galaxy_ng.app.utils.galaxy.time.sleep')
-    def test_safe_fetch_max_retries(self, mock_sleep, mock_get):
+    def test_safe_fetch_max_retries(self, mock_sleep, mock_get_session):
         mock_response = Mock()
         mock_response.status_code = 500
+        mock_response.headers = {}
+        mock_get = mock_get_session.return_value.get
         mock_get.return_value = mock_response
 
         result = safe_fetch('http://example.com')
         assert result == mock_response
         assert mock_get.call_count == 5
         assert mock_sleep.call_count == 4
+        # the backoff grows exponentially
+        assert all(
+            0 <= call[0][0] <= 2 ** i for i, call in enumerate(mock_sleep.call_args_list)
+        )
+
+    @patch('galaxy_ng.app.utils.galaxy.get_session')
+    @patch('galaxy_ng.app.utils.galaxy.time.sleep')
+    def test_safe_fetch_honors_retry_after(self, mock_sleep, mock_get_session):
+        mock_response_limited = Mock()
+        mock_response_limited.status_code = 429
+        mock_response_limited.headers = {'Retry-After': '3'}
+        mock_response_success = Mock()
+        mock_response_success.status_code = 200
+        mock_get = mock_get_session.return_value.get
+        mock_get.side_effect = [mock_response_limited, mock_response_success]
+
+        assert safe_fetch('http://example.com') == mock_response_success
+        mock_sleep.assert_called_once_with(3)
+
+
+class TestFetchConcurrently(TestCase):
+
+    def test_keeps_order(self):
+        def slow_square(i):
+            time.sleep(0.01 * (i % 3))
+            return i * i
+
+        assert list(fetch_concurrently(slow_square, range(20), workers=4)) == [
+            i * i for i in range(20)
+        ]
+
+    def test_fetch_once(self):
+        calls = []
+        cache = FetchOnce()
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.05)
+            return 'data'
+
+        results = list(fetch_concurrently(lambda _: cache.get('key', fetch), range(8), workers=8))
+        assert results == ['data'] * 8
+        assert len(calls) == 1
+
+
+class StubGalaxyHandler(BaseHTTPRequestHandler):
+    """Serves a small v1/v2 upstream, see StubGalaxy."""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            server.requests.append(self.path)
+        try:
+            time.sleep(0.01)
+            status, body = server.stub.route(self.path)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubGalaxy:
+    """25 roles and collections spread on 3 namespaces, 10 per page.
+
+    Role 7 is gone and role 3 fails once with a 503.
+    """
+
+    page_size = 10
+    count = 25
+    missing_role = 7
+    flaky_role = 3
+
+    def __init__(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubGalaxyHandler)
+        self.server.stub = self
+        self.server.lock = threading.Lock()
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        self.server.requests = []
+        self.flaky_failed = False
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _page(self, query, make, link):
+        page = int(parse_qs(query).get('page', ['1'])[0])
+        ids = range((page - 1) * self.page_size, min(page * self.page_size, self.count))
+        has_next = page * self.page_size < self.count
+        return {
+            'count': self.count,
+            'results': [make(i) for i in ids],
+            'next_link': f'{link}?page={page + 1}' if has_next else None,
+        }
+
+    def _namespace(self, ns_id):
+        return {
+            'id': ns_id,
+            'name': f'ns{ns_id}',
+            'summary_fields': {'content_counts': {'roles': 1}},
+        }
+
+    def route(self, path):
+        parsed = urlparse(path)
+        parts = parsed.path.strip('/').split('/')
+        if parts[:3] == ['api', 'v1', 'roles']:
+            if len(parts) == 3:
+                return 200, self._page(
+                    parsed.query, lambda i: {'id': i}, '/api/v1/roles/'
+                )
+            role_id = int(parts[3])
+            if role_id == self.missing_role:
+                return 404, {'detail': 'Not found.'}
+            if len(parts) == 5:
+                return 200, {'results': [{'name': f'{role_id}.0.0'}], 'next': None}
+            if role_id == self.flaky_role and not self.flaky_failed:
+                self.flaky_failed = True
+                return 503, {}
+            return 200, {
+                'id': role_id,
+                'name': f'role{role_id}',
+                'summary_fields': {'namespace': {'id': role_id % 3}},
+            }
+        if parts[:3] == ['api', 'v1', 'namespaces']:
+            if len(parts) == 3:
+                return 200, self._page(parsed.query, self._namespace, '/api/v1/namespaces/')
+            if len(parts) == 5:
+                return 200, {'results': [{'username': f'owner{parts[3]}'}], 'next': None}
+            return 200, self._namespace(int(parts[3]))
+        if parts[:3] == ['api', 'v2', 'collections']:
+            if len(parts) == 3:
+                return 200, self._page(
+                    parsed.query,
+                    lambda i: {
+                        'name': f'collection{i}',
+                        'namespace': {'id': i % 3},
+                        'versions_url': f'{self.url}/api/v2/collections/c{i}/versions/',
+                    },
+                    '/api/v2/collections/',
+                )
+            return 200, {'results': [{'version': '1.0.0'}], 'next': None}
+        return 404, {}
+
+
+@override_settings(
+    GALAXY_UPSTREAM_FETCH_WORKERS=8,
+    GALAXY_UPSTREAM_RATE_LIMIT=0,
+    GALAXY_UPSTREAM_BACKOFF=0.01,
+)
+class TestUpstreamCrawler(TestCase):
+
+    def setUp(self):
+        self.stub = StubGalaxy()
+        self.addCleanup(self.stub.stop)
+
+    def test_role_iterator(self):
+        results = list(upstream_role_iterator(baseurl=self.stub.url))
+
+        expected = [i for i in range(StubGalaxy.count) if i != StubGalaxy.missing_role]
+        assert [role['id'] for _, role, _ in results] == expected
+        for namespace, role, versions in results:
+            assert namespace['id'] == role['id'] % 3
+            assert namespace['summary_fields']['owners'] == [
+                {'username': f'owner{namespace["id"]}'}
+            ]
+            assert versions == [{'name': f'{role["id"]}.0.0'}]
+
+        # the flaky role was retried
+        assert self.stub.flaky_failed
+        # each namespace is fetched once
+        ns_requests = [p for p in self.stub.server.requests if p.startswith('/api/v1/namespaces/')]
+        assert len(ns_requests) == 6
+        assert self.stub.server.max_in_flight > 1
+
+    def test_role_iterator_limit(self):
+        results = list(upstream_role_iterator(baseurl=self.stub.url, limit=12))
+        assert [role['id'] for _, role, _ in results] == [*range(7), *range(8, 13)]
+
+    @override_settings(GALAXY_UPSTREAM_FETCH_WORKERS=1)
+    def test_role_iterator_serial(self):
+        results = list(upstream_role_iterator(baseurl=self.stub.url, get_versions=False))
+        assert len(results) == StubGalaxy.count - 1
+        # the listing pages are fetched alongside the single worker
+        assert self.stub.server.max_in_flight <= 2
+
+    def test_collection_iterator(self):
+        results = list(upstream_collection_iterator(baseurl=self.stub.url))
+        assert [c['name'] for _, c, _ in results] == [
+            f'collection{i}' for i in range(StubGalaxy.count)
+        ]
+        assert all(versions == [{'version': '1.0.0'}] for _, _, versions in results)
+        assert self.stub.server.max_in_flight > 1
+
+    def test_namespace_iterator(self):
+        results = list(upstream_namespace_iterator(baseurl=self.stub.url))
+        assert [ns['id'] for _, ns in results] == list(range(StubGalaxy.count))
+        assert all(total == StubGalaxy.count for total, _ in results)
+        assert results[4][1]['summary_fields']['owners'] == [{'username': 'owner4'}]
 
 
 class TestPaginatedResults(TestCase):
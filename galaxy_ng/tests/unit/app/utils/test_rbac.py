@@ -1,6 +1,8 @@
 from unittest.mock import Mock, patch
 import pytest
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from galaxy_ng.app.utils.rbac import (
     add_username_to_groupname,
@@ -13,6 +15,7 @@ from galaxy_ng.app.utils.rbac import (
     add_user_to_v3_namespace,
     remove_user_from_v3_namespace,
     get_v3_namespace_owners,
+    get_v3_namespace_owners_map,
     get_owned_v3_namespaces,
 )
 from galaxy_ng.app.models import Namespace
@@ -339,6 +342,43 @@ class TestGetNamespaceOwners(TestCase):
         self.assertIn(user4, result)
 
 
+class TestGetNamespaceOwnersMap(TestCase):
+
+    def setUp(self):
+        self.alice = User.objects.create(username="alice")
+        self.bob = User.objects.create(username="bob")
+        self.carol = User.objects.create(username="carol")
+        self.group = Group.objects.create(name="owners")
+        self.group.user_set.add(self.bob, self.carol)
+
+        self.namespaces = [Namespace.objects.create(name=f"ns{i}") for i in range(6)]
+        for ns in self.namespaces:
+            add_user_to_v3_namespace(self.alice, ns)
+            add_group_to_v3_namespace(self.group, ns)
+        # bob is an owner both directly and through the group
+        add_user_to_v3_namespace(self.bob, self.namespaces[0])
+
+        self.unowned = Namespace.objects.create(name="unowned")
+
+    def test_matches_get_v3_namespace_owners(self):
+        owners_map = get_v3_namespace_owners_map([ns.pk for ns in self.namespaces])
+        for ns in self.namespaces:
+            expected = sorted(get_v3_namespace_owners(ns), key=lambda x: x.pk)
+            self.assertEqual(owners_map[ns.pk], expected)
+
+    def test_unowned_and_missing_ids(self):
+        owners_map = get_v3_namespace_owners_map([self.unowned.pk, None])
+        self.assertEqual(owners_map, {})
+        self.assertEqual(get_v3_namespace_owners_map([]), {})
+
+    def test_query_count_is_fixed(self):
+        with CaptureQueriesContext(connection) as small:
+            get_v3_namespace_owners_map([ns.pk for ns in self.namespaces[:1]])
+        with CaptureQueriesContext(connection) as large:
+            get_v3_namespace_owners_map([ns.pk for ns in self.namespaces])
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+
 class TestGetOwnedNamespaces(TestCase):
 
     def setUp(self):
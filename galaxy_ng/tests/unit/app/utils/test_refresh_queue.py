@@ -0,0 +1,42 @@
+from django.db import transaction
+from django.test import TestCase
+
+from galaxy_ng.app.utils.refresh_queue import RefreshQueue
+
+
+class TestRefreshQueue(TestCase):
+
+    def setUp(self):
+        self.refreshed = []
+        self.queue = RefreshQueue(
+            lambda **keys: self.refreshed.append(keys), "collections", "roles"
+        )
+
+    def test_refreshed_once_per_transaction(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for i in range(10):
+                self.queue.add(collections=[("community", f"c{i % 2}")])
+            self.queue.add(roles=[1])
+
+        assert len(callbacks) == 1
+        assert self.refreshed == [{
+            "collections": {("community", "c0"), ("community", "c1")},
+            "roles": {1},
+        }]
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.queue.add(roles=[2])
+        assert len(callbacks) == 1
+        assert self.refreshed[1] == {"collections": set(), "roles": {2}}
+
+    def test_rolled_back_keys_are_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.queue.add(roles=[1])
+                    raise ValueError
+            except ValueError:
+                pass
+            self.queue.add(roles=[2])
+
+        assert self.refreshed == [{"collections": set(), "roles": {2}}]
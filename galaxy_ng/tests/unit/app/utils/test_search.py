@@ -0,0 +1,176 @@
+import uuid
+
+from django.test import TestCase
+from pulp_ansible.app.models import (
+    AnsibleCollectionDeprecated,
+    AnsibleRepository,
+    Collection,
+    CollectionDownloadCount,
+    CollectionVersion,
+    CrossRepositoryCollectionVersionIndex,
+)
+
+from galaxy_ng.app.api.v1.models import LegacyNamespace, LegacyRole, LegacyRoleDownloadCount
+from galaxy_ng.app.models import Namespace, SearchDocument
+from galaxy_ng.app.utils.search import (
+    rebuild_search_documents,
+    refresh_collection_documents,
+    refresh_role_documents,
+)
+
+
+class TestSearchDocuments(TestCase):
+
+    def setUp(self):
+        self.v3_ns = Namespace.objects.create(name="geerlingguy", _avatar_url="https://a/b.png")
+        self.legacy_ns = LegacyNamespace.objects.create(name="geerlingguy", namespace=self.v3_ns)
+
+    def _create_role(self, name):
+        with self.captureOnCommitCallbacks(execute=True):
+            return LegacyRole.objects.create(
+                namespace=self.legacy_ns,
+                name=name,
+                full_metadata={
+                    "description": f"{name} role",
+                    "tags": ["web"],
+                    "platforms": [{"name": "Ubuntu"}],
+                    "versions": [{"version": "1.0.0"}, {"version": "1.1.0"}],
+                },
+            )
+
+    def test_role_save_creates_document(self):
+        role = self._create_role("nginx")
+
+        doc = SearchDocument.objects.get(role=role)
+        assert doc.content_type == "role"
+        assert doc.namespace_name == "geerlingguy"
+        assert doc.name == "nginx"
+        assert doc.description_text == "nginx role"
+        assert doc.latest_version == "1.1.0"
+        assert doc.namespace_avatar == "https://a/b.png"
+        assert doc.tag_names == ["web"]
+        assert doc.content_list == []
+        assert doc.download_count == 0
+
+    def test_refresh_is_idempotent(self):
+        role = self._create_role("nginx")
+        refresh_role_documents([role.pk])
+        refresh_role_documents([role.pk])
+        assert SearchDocument.objects.filter(role=role).count() == 1
+
+    def test_download_count_is_copied(self):
+        role = self._create_role("nginx")
+        LegacyRoleDownloadCount.objects.create(legacyrole=role, count=42)
+        assert SearchDocument.objects.get(role=role).download_count == 42
+
+    def test_namespace_avatar_is_copied(self):
+        role = self._create_role("nginx")
+        self.v3_ns._avatar_url = "https://c/d.png"
+        self.v3_ns.save()
+        assert SearchDocument.objects.get(role=role).namespace_avatar == "https://c/d.png"
+
+    def test_role_delete_removes_document(self):
+        role = self._create_role("nginx")
+        role.delete()
+        assert not SearchDocument.objects.exists()
+
+    def test_rebuild(self):
+        self._create_role("nginx")
+        self._create_role("apache")
+        SearchDocument.objects.all().delete()
+
+        assert rebuild_search_documents(batch_size=1) == 2
+        assert sorted(SearchDocument.objects.values_list("name", flat=True)) == [
+            "apache", "nginx"
+        ]
+
+
+class TestCollectionSearchDocuments(TestCase):
+
+    def setUp(self):
+        self.repo = AnsibleRepository.objects.create(name="published")
+        Namespace.objects.create(name="community", _avatar_url="https://a/b.png")
+        self.collection = Collection.objects.create(namespace="community", name="general")
+
+    def _index(self, version, is_highest=True):
+        collection_version = CollectionVersion.objects.create(
+            namespace="community",
+            name="general",
+            collection=self.collection,
+            version=version,
+            sha256=uuid.uuid4().hex,
+            description=f"general {version}",
+            tags=["network"],
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            return CrossRepositoryCollectionVersionIndex.objects.create(
+                repository=self.repo,
+                collection_version=collection_version,
+                is_highest=is_highest,
+                is_signed=False,
+                is_deprecated=False,
+            )
+
+    def test_highest_version_is_indexed(self):
+        old = self._index("1.0.0")
+        self._index("0.9.0", is_highest=False)
+
+        doc = SearchDocument.objects.get(collection=self.collection)
+        assert doc.content_type == "collection"
+        assert doc.namespace_name == "community"
+        assert doc.name == "general"
+        assert doc.latest_version == "1.0.0"
+        assert doc.description_text == "general 1.0.0"
+        assert doc.namespace_avatar == "https://a/b.png"
+        assert doc.tag_names == ["network"]
+        assert doc.deprecated is False
+        assert doc.download_count == 0
+
+        with self.captureOnCommitCallbacks(execute=True):
+            old.is_highest = False
+            old.save()
+            self._index("2.0.0")
+        assert list(SearchDocument.objects.values_list("latest_version", flat=True)) == [
+            "2.0.0"
+        ]
+
+    def test_refresh(self):
+        self._index("1.0.0")
+        SearchDocument.objects.all().delete()
+
+        # a name of None refreshes the whole namespace
+        refresh_collection_documents([("community", None)])
+        refresh_collection_documents([("community", "general")])
+        assert SearchDocument.objects.get(collection=self.collection).latest_version == "1.0.0"
+
+    def test_deprecation(self):
+        self._index("1.0.0")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            deprecation = AnsibleCollectionDeprecated.objects.create(
+                namespace="community", name="general"
+            )
+        assert SearchDocument.objects.get(collection=self.collection).deprecated is True
+
+        with self.captureOnCommitCallbacks(execute=True):
+            deprecation.delete()
+        assert SearchDocument.objects.get(collection=self.collection).deprecated is False
+
+    def test_download_count_is_copied(self):
+        self._index("1.0.0")
+        CollectionDownloadCount.objects.create(
+            namespace="community", name="general", download_count=42
+        )
+        assert SearchDocument.objects.get(collection=self.collection).download_count == 42
+
+    def test_index_delete_removes_document(self):
+        index = self._index("1.0.0")
+        with self.captureOnCommitCallbacks(execute=True):
+            index.delete()
+        assert not SearchDocument.objects.exists()
+
+    def test_collection_version_delete_removes_document(self):
+        index = self._index("1.0.0")
+        with self.captureOnCommitCallbacks(execute=True):
+            index.collection_version.delete()
+        assert not SearchDocument.objects.exists()
@@ -0,0 +1,110 @@
+import uuid
+
+from django.test import TestCase
+from pulp_ansible.app.models import (
+    AnsibleRepository,
+    Collection,
+    CollectionVersion,
+    CrossRepositoryCollectionVersionIndex,
+)
+
+from galaxy_ng.app.api.v1.models import LegacyNamespace, LegacyRole, LegacyRoleTag
+from galaxy_ng.app.models import Namespace, TagCount
+from galaxy_ng.app.utils.tags import rebuild_tag_counts
+
+
+def _counts(content_type):
+    return dict(
+        TagCount.objects.filter(content_type=content_type).values_list("name", "count")
+    )
+
+
+class TestRoleTagCounts(TestCase):
+
+    def setUp(self):
+        self.legacy_ns = LegacyNamespace.objects.create(name="geerlingguy")
+        self.nginx = LegacyRole.objects.create(namespace=self.legacy_ns, name="nginx")
+        self.apache = LegacyRole.objects.create(namespace=self.legacy_ns, name="apache")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.web = LegacyRoleTag.objects.create(name="web")
+            self.db = LegacyRoleTag.objects.create(name="db")
+
+    def test_tag_create(self):
+        assert _counts("role") == {"web": 0, "db": 0}
+
+    def test_add_and_remove_tags(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.nginx.tags.add(self.web, self.db)
+            self.apache.tags.add(self.web)
+        assert _counts("role") == {"web": 2, "db": 1}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.nginx.tags.remove(self.web)
+        assert _counts("role") == {"web": 1, "db": 1}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.nginx.tags.clear()
+        assert _counts("role") == {"web": 1, "db": 0}
+
+    def test_role_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.nginx.tags.add(self.web)
+            self.apache.tags.add(self.web)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.nginx.delete()
+        assert _counts("role") == {"web": 1, "db": 0}
+
+    def test_tag_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.web.legacyrole.add(self.nginx)
+        assert _counts("role") == {"web": 1, "db": 0}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.web.delete()
+        assert _counts("role") == {"db": 0}
+
+
+class TestCollectionTagCounts(TestCase):
+
+    def setUp(self):
+        self.repo = AnsibleRepository.objects.create(name="published")
+        self.namespace = Namespace.objects.create(name="community")
+        self.collection = Collection.objects.create(namespace="community", name="general")
+
+    def _index(self, version, tags, is_highest):
+        collection_version = CollectionVersion.objects.create(
+            namespace="community",
+            name="general",
+            collection=self.collection,
+            version=version,
+            sha256=uuid.uuid4().hex,
+            tags=tags,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            return CrossRepositoryCollectionVersionIndex.objects.create(
+                repository=self.repo,
+                collection_version=collection_version,
+                is_highest=is_highest,
+                is_signed=False,
+                is_deprecated=False,
+            )
+
+    def test_only_highest_versions_are_counted(self):
+        old = self._index("1.0.0", ["network", "cloud"], is_highest=True)
+        assert _counts("collection") == {"network": 1, "cloud": 1}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            old.is_highest = False
+            old.save()
+        self._index("2.0.0", ["network"], is_highest=True)
+        assert _counts("collection") == {"network": 1}
+
+    def test_rebuild(self):
+        self._index("1.0.0", ["network"], is_highest=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            LegacyRoleTag.objects.create(name="web")
+        TagCount.objects.all().delete()
+
+        assert rebuild_tag_counts(batch_size=1) == 2
+        assert _counts("collection") == {"network": 1}
+        assert _counts("role") == {"web": 0}
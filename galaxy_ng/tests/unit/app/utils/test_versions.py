@@ -0,0 +1,85 @@
+import uuid
+
+import pytest
+import semantic_version
+from django.test import TestCase
+from pulp_ansible.app.models import Collection, CollectionVersion
+
+from galaxy_ng.app.utils.versions import version_range_q
+
+VERSIONS = [
+    "0.9.0",
+    "1.0.0-alpha",
+    "1.0.0-alpha.1",
+    "1.0.0-alpha.beta",
+    "1.0.0-beta.2",
+    "1.0.0-beta.11",
+    "1.0.0-rc.1",
+    "1.0.0",
+    "1.2.0",
+    "1.2.3-10",
+    "1.2.3-9",
+    "1.2.3",
+    "1.10.0+build.5",
+    "2.0.0-rc.1",
+    "2.0.0",
+]
+
+
+class TestVersionRangeQ(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        collection = Collection.objects.create(namespace="community", name="general")
+        for version in VERSIONS:
+            CollectionVersion.objects.create(
+                namespace="community",
+                name="general",
+                collection=collection,
+                version=version,
+                sha256=uuid.uuid4().hex,
+            )
+
+    def assertMatchesSimpleSpec(self, spec):
+        expected = {
+            version for version in VERSIONS
+            if semantic_version.SimpleSpec(spec).match(semantic_version.Version(version))
+        }
+        filtered = set(
+            CollectionVersion.objects.filter(version_range_q(spec)).values_list(
+                "version", flat=True
+            )
+        )
+        self.assertEqual(filtered, expected, spec)
+
+    def test_ranges(self):
+        for spec in (
+            ">=1.2,<2",
+            ">1.0.0",
+            "<=1.2.3",
+            "==1.2.3",
+            "!=1.0.0",
+            "^1.0.0",
+            "~1.2",
+            "~=1.2",
+            "1.*",
+            "*",
+            "==1.10.0+build.5",
+        ):
+            self.assertMatchesSimpleSpec(spec)
+
+    def test_prerelease_ranges(self):
+        for spec in (
+            "<1.0.0",
+            "<1.0.0-",
+            ">1.0.0-alpha.1",
+            ">=1.0.0-beta.2",
+            "<1.0.0-beta.11",
+            ">1.2.3-9",
+            "!=1.0.0-rc.1",
+        ):
+            self.assertMatchesSimpleSpec(spec)
+
+    def test_invalid_range(self):
+        with pytest.raises(ValueError, match="Invalid simple block"):
+            version_range_q("not_a_semver_version")
@@ -0,0 +1,18 @@
+"""Opt-in benchmarks of the unit test suite.
+
+Benchmarks seed large synthetic datasets, so they are skipped unless the
+``GALAXY_RUN_BENCHMARKS`` environment variable is set::
+
+    GALAXY_RUN_BENCHMARKS=1 pytest galaxy_ng/tests/unit -k benchmark -o log_cli=true
+
+Their measurements are logged at the INFO level.
+"""
+
+import os
+
+import pytest
+
+benchmark = pytest.mark.skipif(
+    not os.environ.get("GALAXY_RUN_BENCHMARKS"),
+    reason="benchmarks only run when GALAXY_RUN_BENCHMARKS is set",
+)